@@ -1,10 +1,18 @@
-from dash import Dash, html, dcc, dash_table, Input, Output, State
+from dash import Dash, html, dcc, dash_table, Input, Output, State, Patch
 import dash_bootstrap_components as dbc  # 添加这行
 import os  # 添加这行
 import json  # 添加这行
 from src.data_processor import DataProcessor
 from src.chart_factory import ChartFactory
-from src.config import COLORS
+from src.config import COLORS, DATA_REFRESH_INTERVAL, FIGURE_CACHE_MAX_BYTES, CHART_RENDER_MODE
+from src.config import PRICE_SOURCE, PRICE_TTL, PRICE_REFRESH_INTERVAL, PRICE_WAIT_TIMEOUT
+from src.drawdown import annual_return
+from src.figure_cache import FigureCache
+from src.figure_json import pack_figure
+from src.price_service import PriceService, XueqiuPriceSource, FakePriceSource
+from src.holdings import HoldingsRepository
+from src.stock_names import StockNameIndex
+from src.reconciliation import HoldingsReconciler
 import pandas as pd
 import plotly.graph_objects as go
 import dash
@@ -22,6 +30,21 @@ app = Dash(
 # 初始化数据处理器和图表工厂    
 data_processor = DataProcessor('portfolio_market_value.csv')
 chart_factory = ChartFactory(data_processor)
+# 随日期变化的图表按 (图表, 日期, 数据版本号) 缓存，数据刷新后自动失效
+figure_cache = FigureCache(FIGURE_CACHE_MAX_BYTES)
+# 股票行情由后台线程刷新，回调只读取缓存
+price_service = PriceService(
+    FakePriceSource() if PRICE_SOURCE == 'fake' else XueqiuPriceSource(get_stock_prices, 'cookies.txt'),
+    ttl=PRICE_TTL,
+    refresh_interval=PRICE_REFRESH_INTERVAL,
+    wait_timeout=PRICE_WAIT_TIMEOUT
+)
+# holdings/*.txt 只在文件变化后重新解析
+holdings_repository = HoldingsRepository(os.path.join(os.path.dirname(__file__), 'holdings'))
+# 股票代码 -> 名称，holdings.tsv 变化后重新读取
+stock_names = StockNameIndex('holdings.tsv', holdings_repository, price_service)
+# 账户持仓与实际持仓的对账结果，holdings.tsv 或 holdings/*.txt 变化后重新计算
+holdings_reconciler = HoldingsReconciler('holdings.tsv', holdings_repository)
 
 # 定义统一的选项卡样式
 tab_style = {
@@ -42,530 +65,684 @@ selected_tab_style = {
     'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
 }
 
+# 布局中图表的占位图表，回调填充之前显示；只创建一次，每次生成布局时共用
+placeholder_figure = chart_factory.empty_figure().to_plotly_json()
+
 # 创建布局
-app.layout = html.Div([
-    html.Div([
+def serve_layout():
+    """每次打开页面时按当前数据生成布局，使日期范围、顶部指标和 kpi-store 包含服务运行期间读入的新数据"""
+    return html.Div([
         html.Div([
-            # 添加隐形组件
-            html.Div(style={'width': '200px', 'display': 'inline-block'}),  # 根据日期选择器的宽度调整此值
+            html.Div([
+                # 添加隐形组件
+                html.Div(style={'width': '200px', 'display': 'inline-block'}),  # 根据日期选择器的宽度调整此值
             
-            html.H1('风险投资驾驶舱', 
-                id='dashboard-title',
-                style={
-                    'textAlign': 'center',
-                    'color': COLORS['text'],
-                    'padding': '20px',
-                    'margin': '0',
-                    'backgroundColor': COLORS['background'],
-                    'flexGrow': 1
-                }
-            ),
-            dcc.DatePickerSingle(
-                id='date-picker',
-                min_date_allowed=data_processor.df['Date'].min(),
-                initial_visible_month=data_processor.df['Date'].max(),
-                date=data_processor.df['Date'].max(),
-                style={
-                    'backgroundColor': COLORS['background'],
-                    'color': COLORS['text'],  # 日期选择器文字颜色改为白色
-                    'border': 'none',  # 去掉边框
-                    'padding': '10px',
-                    'margin': '5px',
-                    'borderRadius': '5px',
-                    'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
-                }
-            ),
+                html.H1('风险投资驾驶舱', 
+                    id='dashboard-title',
+                    style={
+                        'textAlign': 'center',
+                        'color': COLORS['text'],
+                        'padding': '20px',
+                        'margin': '0',
+                        'backgroundColor': COLORS['background'],
+                        'flexGrow': 1
+                    }
+                ),
+                dcc.DatePickerSingle(
+                    id='date-picker',
+                    min_date_allowed=data_processor.df['Date'].min(),
+                    initial_visible_month=data_processor.df['Date'].max(),
+                    date=data_processor.df['Date'].max(),
+                    style={
+                        'backgroundColor': COLORS['background'],
+                        'color': COLORS['text'],  # 日期选择器文字颜色改为白色
+                        'border': 'none',  # 去掉边框
+                        'padding': '10px',
+                        'margin': '5px',
+                        'borderRadius': '5px',
+                        'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
+                    }
+                ),
+            ], style={
+                'display': 'flex',
+                'alignItems': 'center',  # 垂直居中对齐
+                'justifyContent': 'space-between',  # 左右对齐
+                'width': '100%',
+                'backgroundColor': COLORS['background'],
+            }),
         ], style={
             'display': 'flex',
             'alignItems': 'center',  # 垂直居中对齐
-            'justifyContent': 'space-between',  # 左右对齐
+            'justifyContent': 'flex-start',  # 左对齐
             'width': '100%',
             'backgroundColor': COLORS['background'],
         }),
-    ], style={
-        'display': 'flex',
-        'alignItems': 'center',  # 垂直居中对齐
-        'justifyContent': 'flex-start',  # 左对齐
-        'width': '100%',
-        'backgroundColor': COLORS['background'],
-    }),
-    html.Div([
         html.Div([
             html.Div([
-                html.H3('当日盈亏金额', 
-                    id='profit-loss-header',
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center', 
-                        'cursor': 'pointer',
-                        'fontSize': '16px'  # 添加字体大小
-                    }
-                ),
-                html.P(
-                    id='daily-profit-loss',
-                    children=f"{data_processor.daily_profit_loss:.2f}元" if data_processor.daily_profit_loss is not None else "N/A",
-                    style={
-                        'color': 'red' if data_processor.daily_profit_loss > 0 else 'green' if data_processor.daily_profit_loss < 0 else COLORS['text'],
-                        'textAlign': 'center',
-                        'cursor': 'pointer',
-                        'fontSize': '14px'  # 添加字体大小
-                    }
-                ),
-            ], style={'width': '17%', 'display': 'inline-block'}),
+                html.Div([
+                    html.H3('当日盈亏金额', 
+                        id='profit-loss-header',
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center', 
+                            'cursor': 'pointer',
+                            'fontSize': '16px'  # 添加字体大小
+                        }
+                    ),
+                    html.P(
+                        id='daily-profit-loss',
+                        children=f"{data_processor.daily_profit_loss:.2f}元" if data_processor.daily_profit_loss is not None else "N/A",
+                        style={
+                            'color': 'red' if data_processor.daily_profit_loss > 0 else 'green' if data_processor.daily_profit_loss < 0 else COLORS['text'],
+                            'textAlign': 'center',
+                            'cursor': 'pointer',
+                            'fontSize': '14px'  # 添加字体大小
+                        }
+                    ),
+                ], style={'width': '17%', 'display': 'inline-block'}),
             
-            html.Div([
-                html.H3('当日收益率', 
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center',
-                        'fontSize': '16px'  # 添加字体大小
-                    }
-                ),
-                html.P(
-                    id='daily-return',
-                    children=f"{data_processor.daily_return:.2%}" if data_processor.daily_return is not None else "N/A",
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center',
-                        'fontSize': '14px'  # 添加字体大小
-                    }
-                )
-            ], style={'width': '8%', 'display': 'inline-block'}),
+                html.Div([
+                    html.H3('当日收益率', 
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '16px'  # 添加字体大小
+                        }
+                    ),
+                    html.P(
+                        id='daily-return',
+                        children=f"{data_processor.daily_return:.2%}" if data_processor.daily_return is not None else "N/A",
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '14px'  # 添加字体大小
+                        }
+                    )
+                ], style={'width': '8%', 'display': 'inline-block'}),
 
-            html.Div([
-                html.H3('当前净值', 
-                    id='net-value-header',
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center', 
-                        'cursor': 'pointer',
-                        'fontSize': '16px'  # 添加字体大小
-                    }
-                ),
-                html.P(
-                    id='daily-net-value',
-                    children=f"{data_processor.daily_net_value.values[0]:.4f}" if not data_processor.daily_net_value.empty else "N/A",
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center', 
-                        'cursor': 'pointer',
-                        'fontSize': '14px'  # 添加字体大小
-                    }
-                )
-            ], style={'width': '52%', 'display': 'inline-block'}),
+                html.Div([
+                    html.H3('当前净值', 
+                        id='net-value-header',
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center', 
+                            'cursor': 'pointer',
+                            'fontSize': '16px'  # 添加字体大小
+                        }
+                    ),
+                    html.P(
+                        id='daily-net-value',
+                        children=f"{data_processor.daily_net_value.values[0]:.4f}" if not data_processor.daily_net_value.empty else "N/A",
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center', 
+                            'cursor': 'pointer',
+                            'fontSize': '14px'  # 添加字体大小
+                        }
+                    )
+                ], style={'width': '52%', 'display': 'inline-block'}),
             
-            html.Div([
-                html.H3('最大回撤', 
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center',
-                        'fontSize': '16px'  # 添加字体大小
-                    }
-                ),
-                html.P(
-                    children=f"{data_processor.max_drawdown:.2%}", 
-                    style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center',
-                        'fontSize': '14px'  # 添加字体大小
-                    }
-                ),
-            ], style={'width': '8%', 'display': 'inline-block'}),
+                html.Div([
+                    html.H3('最大回撤', 
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '16px'  # 添加字体大小
+                        }
+                    ),
+                    html.P(
+                        children=f"{data_processor.max_drawdown:.2%}", 
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '14px'  # 添加字体大小
+                        }
+                    ),
+                ], style={'width': '8%', 'display': 'inline-block'}),
             
+                html.Div([
+                    html.H3('当前回撤', 
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '16px'  # 添加字体大小
+                        }
+                    ),
+                    html.P(
+                        children=f"{data_processor.current_drawdown:.2%}",
+                        style={
+                            'color': COLORS['text'], 
+                            'textAlign': 'center',
+                            'fontSize': '14px'  # 添加字体大小
+                        }
+                    )
+                ], style={'width': '15%', 'display': 'inline-block'})
+            ], style={
+                'width': '100%',
+                'display': 'flex',
+                'alignItems': 'center',
+                'borderBottom': 'none'  # 去掉上面的灰色线条
+            })
+        ], style={
+            'width': '100%',
+            'backgroundColor': COLORS['background'],
+            'padding': '0px',
+            'margin': '0px',
+            'borderRadius': '5px',
+            'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 
+            'display': 'flex',  # 添加 flex 布局
+            'justifyContent': 'flex-start'  # 将内容推到最左边
+        }),
+    
+        # 第一行：三列布局
+        html.Div([
             html.Div([
-                html.H3('当前回撤', 
+                html.H3('当日收益率红黑榜', 
                     style={
                         'color': COLORS['text'], 
                         'textAlign': 'center',
-                        'fontSize': '16px'  # 添加字体大小
+                        'fontSize': '16px',  # 减小标题字体大小
+                        'margin': '0px',  # 减小标题边距
+                        'padding': '5px 0'  # 只保留上下padding
                     }
                 ),
-                html.P(
-                    children=f"{data_processor.current_drawdown:.2%}",
+                dcc.Graph(
+                    id='returns-chart', 
+                    figure=placeholder_figure,  # 初始图表由 update_charts 生成
+                    config={'displayModeBar': False},
                     style={
-                        'color': COLORS['text'], 
-                        'textAlign': 'center',
-                        'fontSize': '14px'  # 添加字体大小
+                        'height': '300px',
+                        'margin': '0px',  # 去掉图表边距
+                        'padding': '0px'  # 去掉图表内边距
                     }
                 )
-            ], style={'width': '15%', 'display': 'inline-block'})
-        ], style={
-            'width': '100%',
-            'display': 'flex',
-            'alignItems': 'center',
-            'borderBottom': 'none'  # 去掉上面的灰色线条
-        })
-    ], style={
-        'width': '100%',
-        'backgroundColor': COLORS['background'],
-        'padding': '0px',
-        'margin': '0px',
-        'borderRadius': '5px',
-        'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 
-        'display': 'flex',  # 添加 flex 布局
-        'justifyContent': 'flex-start'  # 将内容推到最左边
-    }),
-    
-    # 第一行：三列布局
-    html.Div([
-        html.Div([
-            html.H3('当日收益率红黑榜', 
-                style={
-                    'color': COLORS['text'], 
-                    'textAlign': 'center',
-                    'fontSize': '16px',  # 减小标题字体大小
-                    'margin': '0px',  # 减小标题边距
-                    'padding': '5px 0'  # 只保留上下padding
-                }
-            ),
-            dcc.Graph(
-                id='returns-chart', 
-                figure=chart_factory.fig_returns, 
-                config={'displayModeBar': False},
-                style={
-                    'height': '300px',
-                    'margin': '0px',  # 去掉图表边距
-                    'padding': '0px'  # 去掉图表内边距
-                }
-            )
-        ], style={
-            'width': '35%',
-            'display': 'inline-block',
-            'backgroundColor': COLORS['background'],
-            'padding': '0px',  # 减小内边距
-            'margin': '0px 5px 0px 0px',  # 只保留右边距
-            'borderRadius': '5px',
-            'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
-        }),
+            ], style={
+                'width': '35%',
+                'display': 'inline-block',
+                'backgroundColor': COLORS['background'],
+                'padding': '0px',  # 减小内边距
+                'margin': '0px 5px 0px 0px',  # 只保留右边距
+                'borderRadius': '5px',
+                'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
+            }),
         
-        html.Div([
-            dcc.Tabs([
-                dcc.Tab(
-                    label='总净值趋势',
-                    children=[
-                        dcc.Graph(
-                            id='total-nav-chart',  # 添加ID
-                            figure=chart_factory.fig_total, 
-                            config={'displayModeBar': False},
-                            style={
-                                'height': '300px',
-                                'margin': '0px',  # 去掉图表边距
-                                'padding': '0px'  # 去掉图表内边距
-                            }
-                        )
-                    ],
-                    style=tab_style,
-                    selected_style=selected_tab_style
-                ),
-                dcc.Tab(
-                    label='策略净值趋势',
-                    children=[
-                        dcc.Graph(
-                            figure=chart_factory.fig_nav, 
-                            config={'displayModeBar': False},
-                            style={
-                                'height': '300px',
-                                'margin': '0px',
-                                'padding': '0px'
-                            }
-                        )
-                    ],
-                    style=tab_style,
-                    selected_style=selected_tab_style
-                ),
-                dcc.Tab(
-                    label='风格净值趋势',
-                    children=[
-                        dcc.Graph(
-                            figure=chart_factory.fig_style_nav, 
-                            config={'displayModeBar': False},
-                            style={
-                                'height': '300px',
-                                'margin': '0px',
-                                'padding': '0px'
-                            }
-                        )
-                    ],
-                    style=tab_style,
-                    selected_style=selected_tab_style
-                ),
-            ])
-        ], style={
-            'width': '64%',
-            'display': 'inline-block',
-            'backgroundColor': COLORS['background'],
-            'padding': '0px',  # 减小内边距
-            'margin': '0px',  # 去掉所有外边距
-            'borderRadius': '5px',
-            'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
-        })
-    ], style={
-        'backgroundColor': '#161a1d',
-        'padding': '0px',  # 减小上下间距
-        'textAlign': 'center',
-        'display': 'flex',
-        'justifyContent': 'flex-start',
-        'alignItems': 'stretch',
-        'gap': '5px',  # 保持元素之间的间距
-        'margin': '0px'  # 去掉外边距
-    }),
-    
-    # 第二行：两列布局（饼图和回撤分析）
-    html.Div([
-        html.Div(
-            dcc.Tabs(
-                id='pie-tabs',
-                children=[
+            html.Div([
+                dcc.Tabs([
                     dcc.Tab(
-                        label='策略配比',
+                        label='总净值趋势',
                         children=[
                             dcc.Graph(
-                                id='fig-pie', 
-                                figure=chart_factory.create_style_pie_chart(), 
+                                id='total-nav-chart',  # 添加ID
+                                figure=placeholder_figure,  # 初始图表由 update_total_chart 生成
                                 config={'displayModeBar': False},
-                                style={'height': '450px'}  # 调整饼图高度与表格一致
+                                style={
+                                    'height': '300px',
+                                    'margin': '0px',  # 去掉图表边距
+                                    'padding': '0px'  # 去掉图表内边距
+                                }
                             )
                         ],
                         style=tab_style,
                         selected_style=selected_tab_style
                     ),
                     dcc.Tab(
-                        label='风格配比',
+                        label='策略净值趋势',
                         children=[
                             dcc.Graph(
-                                id='style-pie', 
-                                figure=chart_factory.create_style_pie_chart(), 
+                                id='nav-chart',
+                                figure=placeholder_figure,  # 初始图表由 update_nav_chart_zoom 生成
                                 config={'displayModeBar': False},
-                                style={'height': '450px'}  # 调整饼图高度与表格一致
+                                style={
+                                    'height': '300px',
+                                    'margin': '0px',
+                                    'padding': '0px'
+                                }
                             )
                         ],
                         style=tab_style,
                         selected_style=selected_tab_style
                     ),
                     dcc.Tab(
-                        label='持仓占比',
+                        label='风格净值趋势',
                         children=[
                             dcc.Graph(
-                                id='style-position-pie', 
-                                figure=chart_factory.create_style_position_pie_chart(), 
+                                id='style-nav-chart',
+                                figure=placeholder_figure,  # 初始图表由 update_style_nav_chart_zoom 生成
                                 config={'displayModeBar': False},
-                                style={'height': '450px'}  # 调整饼图高度与表格一致
+                                style={
+                                    'height': '300px',
+                                    'margin': '0px',
+                                    'padding': '0px'
+                                }
                             )
                         ],
                         style=tab_style,
                         selected_style=selected_tab_style
-                    )
-                ]
+                    ),
+                ])
+            ], style={
+                'width': '64%',
+                'display': 'inline-block',
+                'backgroundColor': COLORS['background'],
+                'padding': '0px',  # 减小内边距
+                'margin': '0px',  # 去掉所有外边距
+                'borderRadius': '5px',
+                'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)' 
+            })
+        ], style={
+            'backgroundColor': '#161a1d',
+            'padding': '0px',  # 减小上下间距
+            'textAlign': 'center',
+            'display': 'flex',
+            'justifyContent': 'flex-start',
+            'alignItems': 'stretch',
+            'gap': '5px',  # 保持元素之间的间距
+            'margin': '0px'  # 去掉外边距
+        }),
+    
+        # 第二行：两列布局（饼图和回撤分析）
+        html.Div([
+            html.Div(
+                dcc.Tabs(
+                    id='pie-tabs',
+                    value='strategy-pie-tab',
+                    children=[
+                        dcc.Tab(
+                            label='策略配比',
+                            value='strategy-pie-tab',
+                            children=[
+                                dcc.Graph(
+                                    id='fig-pie', 
+                                    figure=placeholder_figure,  # 初始图表由 update_pie_chart 生成
+                                    config={'displayModeBar': False},
+                                    style={'height': '450px'}  # 调整饼图高度与表格一致
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                        dcc.Tab(
+                            label='风格配比',
+                            value='style-pie-tab',
+                            children=[
+                                dcc.Graph(
+                                    id='style-pie', 
+                                    figure=placeholder_figure,  # 选项卡显示时由 update_style_pie_chart 生成
+                                    config={'displayModeBar': False},
+                                    style={'height': '450px'}  # 调整饼图高度与表格一致
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                        dcc.Tab(
+                            label='持仓占比',
+                            value='style-position-pie-tab',
+                            children=[
+                                dcc.Graph(
+                                    id='style-position-pie', 
+                                    figure=placeholder_figure,  # 选项卡显示时由 update_style_position_pie_chart 生成
+                                    config={'displayModeBar': False},
+                                    style={'height': '450px'}  # 调整饼图高度与表格一致
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        )
+                    ]
+                ),
+                style={'width': '35%', 'display': 'inline-block', 'verticalAlign': 'top', 'margin': '0px 5px 0px 0px'}  # 调整外边距
             ),
-            style={'width': '35%', 'display': 'inline-block', 'verticalAlign': 'top', 'margin': '0px 5px 0px 0px'}  # 调整外边距
-        ),
         
-        html.Div(
-            dcc.Tabs(
-                id='drawdown-tabs',
-                children=[
-                    dcc.Tab(
-                        label='策略绩效分析',
-                        children=[
-                            dash_table.DataTable(
-                                id='strategy-drawdown-table',
-                                data=data_processor.display_df.to_dict('records'),
-                                columns=[
-                                    {'name': '策略', 'id': '策略'},
-                                    {'name': '总市值', 'id': '总市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                                    {'name': '持仓市值', 'id': '持仓市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                                    {'name': '仓位', 'id': '仓位', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '年化收益率', 'id': '年化收益率', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '最大回撤', 'id': '最大回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '当前回撤', 'id': '当前回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}}
-                                ],
-                                style_data_conditional=[
-                                    {
-                                        'if': {'row_index': 'odd'},
-                                        'backgroundColor': '#252e3f'
-                                    },
-                                    {
-                                        'if': {
-                                            'filter_query': '{当前回撤} < -0.1',
-                                            'column_id': '当前回撤'
+            html.Div(
+                dcc.Tabs(
+                    id='drawdown-tabs',
+                    value='strategy-drawdown-tab',
+                    children=[
+                        dcc.Tab(
+                            label='策略绩效分析',
+                            value='strategy-drawdown-tab',
+                            children=[
+                                dash_table.DataTable(
+                                    id='strategy-drawdown-table',
+                                    data=data_processor.display_df.to_dict('records'),
+                                    columns=[
+                                        {'name': '策略', 'id': '策略'},
+                                        {'name': '总市值', 'id': '总市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                                        {'name': '持仓市值', 'id': '持仓市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                                        {'name': '仓位', 'id': '仓位', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '年化收益率', 'id': '年化收益率', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '最大回撤', 'id': '最大回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '当前回撤', 'id': '当前回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}}
+                                    ],
+                                    style_data_conditional=[
+                                        {
+                                            'if': {'row_index': 'odd'},
+                                            'backgroundColor': '#252e3f'
                                         },
-                                        'color': 'red'
-                                    },
-                                    {
-                                        'if': {
-                                            'filter_query': '{最大回撤} < -0.15',
-                                            'column_id': '最大回撤'
+                                        {
+                                            'if': {
+                                                'filter_query': '{当前回撤} < -0.1',
+                                                'column_id': '当前回撤'
+                                            },
+                                            'color': 'red'
                                         },
-                                        'color': 'red'
-                                    },
-                                    {
-                                        'if': {
-                                            'filter_query': '{仓位} > 0.95',
-                                            'column_id': '仓位'
+                                        {
+                                            'if': {
+                                                'filter_query': '{最大回撤} < -0.15',
+                                                'column_id': '最大回撤'
+                                            },
+                                            'color': 'red'
                                         },
-                                        'color': 'red'
-                                    }
-                                ],
-                                style_table={
-                                    'height': '450px',
-                                    'overflowY': 'auto'
-                                },
-                                style_cell={
-                                    'backgroundColor': COLORS['background'],
-                                    'color': COLORS['text'],
-                                    'border': f'1px solid {COLORS["grid"]}',
-                                    'padding': '10px',
-                                    'textAlign': 'left'
-                                },
-                                style_header={
-                                    'backgroundColor': COLORS['grid'],
-                                    'fontWeight': 'bold',
-                                    'border': f'1px solid {COLORS["grid"]}'
-                                },
-                                sort_action='native'  # 添加排序功能
-                            )
-                        ],
-                        style=tab_style,
-                        selected_style=selected_tab_style
-                    ),
-                    dcc.Tab(
-                        label='风格绩效分析',
-                        children=[
-                            dash_table.DataTable(
-                                id='style-drawdown-table',
-                                data=data_processor.get_style_drawdowns().to_dict('records'),
-                                columns=[
-                                    {'name': '风格', 'id': '风格'},
-                                    {'name': '总市值', 'id': '总市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                                    {'name': '持仓市值', 'id': '持仓市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                                    {'name': '配置比例', 'id': '配置比例', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '年化收益率', 'id': '年化收益率', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '最大回撤', 'id': '最大回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}},
-                                    {'name': '当前回撤', 'id': '当前回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}}
-                                ],
-                                style_data_conditional=[
-                                    {
-                                        'if': {'row_index': 'odd'},
-                                        'backgroundColor': '#252e3f'
+                                        {
+                                            'if': {
+                                                'filter_query': '{仓位} > 0.95',
+                                                'column_id': '仓位'
+                                            },
+                                            'color': 'red'
+                                        }
+                                    ],
+                                    style_table={
+                                        'height': '450px',
+                                        'overflowY': 'auto'
                                     },
-                                    {
-                                        'if': {
-                                            'filter_query': '{当前回撤} < -0.1',
-                                            'column_id': '当前回撤'
-                                        },
-                                        'color': 'red'
+                                    style_cell={
+                                        'backgroundColor': COLORS['background'],
+                                        'color': COLORS['text'],
+                                        'border': f'1px solid {COLORS["grid"]}',
+                                        'padding': '10px',
+                                        'textAlign': 'left'
                                     },
-                                    {
-                                        'if': {
-                                            'filter_query': '{最大回撤} < -0.15',
-                                            'column_id': '最大回撤'
-                                        },
-                                        'color': 'red'
+                                    style_header={
+                                        'backgroundColor': COLORS['grid'],
+                                        'fontWeight': 'bold',
+                                        'border': f'1px solid {COLORS["grid"]}'
                                     },
-                                    {
-                                        'if': {
-                                            'filter_query': '{配置比例} > 0.3',
-                                            'column_id': '配置比例'
+                                    sort_action='native'  # 添加排序功能
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                        dcc.Tab(
+                            label='风格绩效分析',
+                            value='style-drawdown-tab',
+                            children=[
+                                dash_table.DataTable(
+                                    id='style-drawdown-table',
+                                    data=data_processor.get_style_drawdowns().to_dict('records'),
+                                    columns=[
+                                        {'name': '风格', 'id': '风格'},
+                                        {'name': '总市值', 'id': '总市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                                        {'name': '持仓市值', 'id': '持仓市值', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                                        {'name': '配置比例', 'id': '配置比例', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '年化收益率', 'id': '年化收益率', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '最大回撤', 'id': '最大回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}},
+                                        {'name': '当前回撤', 'id': '当前回撤', 'type': 'numeric', 'format': {'specifier': '.2%'}}
+                                    ],
+                                    style_data_conditional=[
+                                        {
+                                            'if': {'row_index': 'odd'},
+                                            'backgroundColor': '#252e3f'
                                         },
-                                        'color': 'red'
-                                    }
-                                ],
-                                style_table={
-                                    'height': '450px',
-                                    'overflowY': 'auto'
-                                },
-                                style_cell={
-                                    'backgroundColor': COLORS['background'],
-                                    'color': COLORS['text'],
-                                    'border': f'1px solid {COLORS["grid"]}',
-                                    'padding': '10px',
-                                    'textAlign': 'left'
-                                },
-                                style_header={
-                                    'backgroundColor': COLORS['grid'],
-                                    'fontWeight': 'bold',
-                                    'border': f'1px solid {COLORS["grid"]}'
-                                },
-                                sort_action='native'  # 添加排序功能
-                            )
-                        ],
-                        style=tab_style,
-                        selected_style=selected_tab_style
-                    ),
-                    dcc.Tab(
-                        label='账户持仓明细',
-                        children=[
-                            dash_table.DataTable(
-                                id='holdings-table',
-                                data=[],  # 初始为空，通过回调更新
-                                columns=[
-                                    {'name': '证券代码', 'id': '股票代码'},
-                                    {'name': '证券名称', 'id': '股票名称'},  
-                                    {'name': '持仓数量', 'id': '持仓数量', 'type': 'numeric'},
-                                    {'name': '当前价', 'id': '当前价', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                                    {'name': '持股市值', 'id': '持股市值', 'type': 'numeric', 'format': {'specifier': ',.3f'}},
-                                    {'name': '当日涨幅', 'id': '当日涨幅', 'type': 'numeric', 'format': {'specifier': '.2%'}}
-                                ],
-                                style_table={
-                                    'height': '450px',
-                                    'overflowY': 'auto'
-                                },
-                                style_cell={
-                                    'backgroundColor': COLORS['background'],
-                                    'color': COLORS['text'],
-                                    'border': f'1px solid {COLORS["grid"]}',
-                                    'padding': '10px',
-                                    'textAlign': 'left'
-                                },
-                                style_header={
-                                    'backgroundColor': COLORS['grid'],
-                                    'fontWeight': 'bold',
-                                    'border': f'1px solid {COLORS["grid"]}'
-                                },
-                                style_data_conditional=[
-                                    {
-                                        'if': {'row_index': 'odd'},
-                                        'backgroundColor': '#252e3f'
+                                        {
+                                            'if': {
+                                                'filter_query': '{当前回撤} < -0.1',
+                                                'column_id': '当前回撤'
+                                            },
+                                            'color': 'red'
+                                        },
+                                        {
+                                            'if': {
+                                                'filter_query': '{最大回撤} < -0.15',
+                                                'column_id': '最大回撤'
+                                            },
+                                            'color': 'red'
+                                        },
+                                        {
+                                            'if': {
+                                                'filter_query': '{配置比例} > 0.3',
+                                                'column_id': '配置比例'
+                                            },
+                                            'color': 'red'
+                                        }
+                                    ],
+                                    style_table={
+                                        'height': '450px',
+                                        'overflowY': 'auto'
+                                    },
+                                    style_cell={
+                                        'backgroundColor': COLORS['background'],
+                                        'color': COLORS['text'],
+                                        'border': f'1px solid {COLORS["grid"]}',
+                                        'padding': '10px',
+                                        'textAlign': 'left'
+                                    },
+                                    style_header={
+                                        'backgroundColor': COLORS['grid'],
+                                        'fontWeight': 'bold',
+                                        'border': f'1px solid {COLORS["grid"]}'
+                                    },
+                                    sort_action='native'  # 添加排序功能
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                        dcc.Tab(
+                            label='账户持仓明细',
+                            value='holdings-tab',
+                            children=[
+                                dash_table.DataTable(
+                                    id='holdings-table',
+                                    data=[],  # 初始为空，通过回调更新
+                                    columns=[
+                                        {'name': '证券代码', 'id': '股票代码'},
+                                        {'name': '证券名称', 'id': '股票名称'},  
+                                        {'name': '持仓数量', 'id': '持仓数量', 'type': 'numeric'},
+                                        {'name': '当前价', 'id': '当前价', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                                        {'name': '持股市值', 'id': '持股市值', 'type': 'numeric', 'format': {'specifier': ',.3f'}},
+                                        {'name': '当日涨幅', 'id': '当日涨幅', 'type': 'numeric', 'format': {'specifier': '.2%'}}
+                                    ],
+                                    style_table={
+                                        'height': '450px',
+                                        'overflowY': 'auto'
+                                    },
+                                    style_cell={
+                                        'backgroundColor': COLORS['background'],
+                                        'color': COLORS['text'],
+                                        'border': f'1px solid {COLORS["grid"]}',
+                                        'padding': '10px',
+                                        'textAlign': 'left'
                                     },
-                                    {
-                                        'if': {
-                                            'filter_query': '{当日涨幅} > 0',
-                                            'column_id': '当日涨幅'
+                                    style_header={
+                                        'backgroundColor': COLORS['grid'],
+                                        'fontWeight': 'bold',
+                                        'border': f'1px solid {COLORS["grid"]}'
+                                    },
+                                    style_data_conditional=[
+                                        {
+                                            'if': {'row_index': 'odd'},
+                                            'backgroundColor': '#252e3f'
+                                        },
+                                        {
+                                            'if': {
+                                                'filter_query': '{当日涨幅} > 0',
+                                                'column_id': '当日涨幅'
+                                            },
+                                            'color': 'red'
                                         },
-                                        'color': 'red'
+                                        {
+                                            'if': {
+                                                'filter_query': '{当日涨幅} < 0',
+                                                'column_id': '当日涨幅'
+                                            },
+                                            'color': 'green'
+                                        }
+                                    ],
+                                    sort_action='native'  # 添加排序功能
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                        # 新增持仓对比Tab
+                        dcc.Tab(
+                            label='持仓对比',
+                            value='holdings-compare-tab',
+                            children=[
+                                dash_table.DataTable(
+                                    id='holdings-compare-table',
+                                    data=[],  # 初始为空，通过回调更新
+                                    columns=[
+                                        {'name': '股票代码', 'id': '股票代码'},
+                                        {'name': '股票名称', 'id': '股票名称'},  # 添加股票名称列
+                                        {'name': '账户持仓', 'id': '账户持仓', 'type': 'numeric'},
+                                        {'name': '实际持仓', 'id': '实际持仓', 'type': 'numeric'},
+                                        {'name': '差异', 'id': '差异', 'type': 'numeric'}
+                                    ],
+                                    style_table={
+                                        'height': '450px',
+                                        'overflowY': 'auto'
+                                    },
+                                    style_cell={
+                                        'backgroundColor': COLORS['background'],
+                                        'color': COLORS['text'],
+                                        'border': f'1px solid {COLORS["grid"]}',
+                                        'padding': '10px',
+                                        'textAlign': 'left'
+                                    },
+                                    style_header={
+                                        'backgroundColor': COLORS['grid'],
+                                        'fontWeight': 'bold',
+                                        'border': f'1px solid {COLORS["grid"]}'
                                     },
-                                    {
-                                        'if': {
-                                            'filter_query': '{当日涨幅} < 0',
-                                            'column_id': '当日涨幅'
+                                    style_data_conditional=[
+                                        {
+                                            'if': {'row_index': 'odd'},
+                                            'backgroundColor': '#252e3f'
                                         },
-                                        'color': 'green'
-                                    }
-                                ],
-                                sort_action='native'  # 添加排序功能
-                            )
-                        ],
-                        style=tab_style,
-                        selected_style=selected_tab_style
-                    ),
-                    # 新增持仓对比Tab
-                    dcc.Tab(
-                        label='持仓对比',
-                        children=[
+                                        {
+                                            'if': {
+                                                'filter_query': '{差异} != 0',
+                                                'column_id': '差异'
+                                            },
+                                            'color': 'red'
+                                        }
+                                    ]
+                                )
+                            ],
+                            style=tab_style,
+                            selected_style=selected_tab_style
+                        ),
+                    ]
+                ),
+                style={'width': '64%', 'display': 'inline-block', 'backgroundColor': COLORS['background'], 'padding': '5px', 'margin': '0px', 'borderRadius': '5px', 'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 'verticalAlign': 'top'}
+            )
+        ], style={
+            'backgroundColor': '#161a1d',
+            'padding': '0px',  # 减小上下间距
+            'textAlign': 'center',
+            'display': 'flex',
+            'justifyContent': 'flex-start',
+            'alignItems': 'stretch',
+            'gap': '5px',
+            'marginTop': '5px'  # 减小与上面一行的间距
+        }),
+
+        # 定时增量读取数据文件中新追加的交易日
+        dcc.Interval(id='data-refresh-interval', interval=DATA_REFRESH_INTERVAL),
+        # 页面当前显示的数据版本号，落后于服务器时由 refresh_data 发送最新数据
+        dcc.Store(id='data-version', data=data_processor.version),
+    
+        # 按日期排列的当日收益率、盈亏金额和净值，顶部指标由浏览器端回调直接读取
+        dcc.Store(id='kpi-store', data=data_processor.nav_store.kpi_arrays()),
+    
+        # 隐藏选项卡中的内容只在选项卡显示时计算，这里记录各内容最后一次计算时的日期和数据版本，
+        # 与当前不一致说明内容已过期，切换到该选项卡时重新计算
+        dcc.Store(id='style-pie-key'),
+        dcc.Store(id='style-position-pie-key'),
+        dcc.Store(id='style-drawdown-table-key'),
+        dcc.Store(id='holdings-table-key'),
+        dcc.Store(id='holdings-compare-table-key'),
+
+        # 浏览器窗口宽度，决定净值趋势图降采样后的点数
+        dcc.Store(id='screen-width'),
+
+        # 添加弹出框组件
+        dbc.Modal(  # 修改这里
+            id='daily-details-modal',
+            children=[
+                dbc.ModalHeader("策略盈亏详情"),
+                dbc.ModalBody(
+                    dash_table.DataTable(
+                        id='daily-details-table',
+                        style_table={'height': '400px', 'overflowY': 'auto'},
+                        style_cell={
+                            'backgroundColor': COLORS['background'],
+                            'color': COLORS['text'],
+                            'border': f'1px solid {COLORS["grid"]}',
+                            'padding': '10px',
+                            'textAlign': 'left'
+                        },
+                        style_header={
+                            'backgroundColor': COLORS['grid'],
+                            'fontWeight': 'bold'
+                        },
+                        style_data_conditional=[{
+                            'if': {'row_index': 'odd'},
+                            'backgroundColor': '#252e3f'
+                        }]
+                    )
+                )
+            ],
+            centered=True,
+            style={'backgroundColor': COLORS['background']}
+        ),
+    
+        dbc.Modal(  # 这里也要修改
+            id='nav-contribution-modal',
+            children=[
+                dbc.ModalHeader("策略净值贡献"),
+                dbc.ModalBody(
+                    dash_table.DataTable(
+                        id='nav-contribution-table',
+                        style_table={'height': '400px', 'overflowY': 'auto'},
+                        style_cell={
+                            'backgroundColor': COLORS['background'],
+                            'color': COLORS['text'],
+                            'border': f'1px solid {COLORS["grid"]}',
+                            'padding': '10px',
+                            'textAlign': 'left'
+                        },
+                        style_header={
+                            'backgroundColor': COLORS['grid'],
+                            'fontWeight': 'bold'
+                        },
+                        style_data_conditional=[{
+                            'if': {'row_index': 'odd'},
+                            'backgroundColor': '#252e3f'
+                        }]
+                    )
+                )
+            ],
+            centered=True,
+            style={'backgroundColor': COLORS['background']}
+        ),
+
+        # 新增风格策略详情模态框
+        dbc.Modal(
+            id='style-details-modal',
+            children=[
+                dbc.ModalHeader(id='style-details-header'),
+                dbc.ModalBody([
+                    # 添加两列布局
+                    dbc.Row([
+                        # 左侧表格
+                        dbc.Col(
                             dash_table.DataTable(
-                                id='holdings-compare-table',
-                                data=[],  # 初始为空，通过回调更新
-                                columns=[
-                                    {'name': '股票代码', 'id': '股票代码'},
-                                    {'name': '股票名称', 'id': '股票名称'},  # 添加股票名称列
-                                    {'name': '账户持仓', 'id': '账户持仓', 'type': 'numeric'},
-                                    {'name': '实际持仓', 'id': '实际持仓', 'type': 'numeric'},
-                                    {'name': '差异', 'id': '差异', 'type': 'numeric'}
-                                ],
-                                style_table={
-                                    'height': '450px',
-                                    'overflowY': 'auto'
-                                },
+                                id='style-details-table',
+                                style_table={'height': '400px', 'overflowY': 'auto'},
                                 style_cell={
                                     'backgroundColor': COLORS['background'],
                                     'color': COLORS['text'],
@@ -575,342 +752,287 @@ app.layout = html.Div([
                                 },
                                 style_header={
                                     'backgroundColor': COLORS['grid'],
-                                    'fontWeight': 'bold',
-                                    'border': f'1px solid {COLORS["grid"]}'
+                                    'fontWeight': 'bold'
                                 },
-                                style_data_conditional=[
-                                    {
-                                        'if': {'row_index': 'odd'},
-                                        'backgroundColor': '#252e3f'
-                                    },
-                                    {
-                                        'if': {
-                                            'filter_query': '{差异} != 0',
-                                            'column_id': '差异'
-                                        },
-                                        'color': 'red'
-                                    }
-                                ]
-                            )
-                        ],
-                        style=tab_style,
-                        selected_style=selected_tab_style
-                    ),
-                ]
-            ),
-            style={'width': '64%', 'display': 'inline-block', 'backgroundColor': COLORS['background'], 'padding': '5px', 'margin': '0px', 'borderRadius': '5px', 'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 'verticalAlign': 'top'}
-        )
-    ], style={
-        'backgroundColor': '#161a1d',
-        'padding': '0px',  # 减小上下间距
-        'textAlign': 'center',
-        'display': 'flex',
-        'justifyContent': 'flex-start',
-        'alignItems': 'stretch',
-        'gap': '5px',
-        'marginTop': '5px'  # 减小与上面一行的间距
-    }),
-
-    # 添加弹出框组件
-    dbc.Modal(  # 修改这里
-        id='daily-details-modal',
-        children=[
-            dbc.ModalHeader("策略盈亏详情"),
-            dbc.ModalBody(
-                dash_table.DataTable(
-                    id='daily-details-table',
-                    style_table={'height': '400px', 'overflowY': 'auto'},
-                    style_cell={
-                        'backgroundColor': COLORS['background'],
-                        'color': COLORS['text'],
-                        'border': f'1px solid {COLORS["grid"]}',
-                        'padding': '10px',
-                        'textAlign': 'left'
-                    },
-                    style_header={
-                        'backgroundColor': COLORS['grid'],
-                        'fontWeight': 'bold'
-                    },
-                    style_data_conditional=[{
-                        'if': {'row_index': 'odd'},
-                        'backgroundColor': '#252e3f'
-                    }]
-                )
-            )
-        ],
-        centered=True,
-        style={'backgroundColor': COLORS['background']}
-    ),
-    
-    dbc.Modal(  # 这里也要修改
-        id='nav-contribution-modal',
-        children=[
-            dbc.ModalHeader("策略净值贡献"),
-            dbc.ModalBody(
-                dash_table.DataTable(
-                    id='nav-contribution-table',
-                    style_table={'height': '400px', 'overflowY': 'auto'},
-                    style_cell={
-                        'backgroundColor': COLORS['background'],
-                        'color': COLORS['text'],
-                        'border': f'1px solid {COLORS["grid"]}',
-                        'padding': '10px',
-                        'textAlign': 'left'
-                    },
-                    style_header={
-                        'backgroundColor': COLORS['grid'],
-                        'fontWeight': 'bold'
-                    },
-                    style_data_conditional=[{
-                        'if': {'row_index': 'odd'},
-                        'backgroundColor': '#252e3f'
-                    }]
-                )
-            )
-        ],
-        centered=True,
-        style={'backgroundColor': COLORS['background']}
-    ),
-
-    # 新增风格策略详情模态框
-    dbc.Modal(
-        id='style-details-modal',
-        children=[
-            dbc.ModalHeader(id='style-details-header'),
-            dbc.ModalBody([
-                # 添加两列布局
-                dbc.Row([
-                    # 左侧表格
-                    dbc.Col(
-                        dash_table.DataTable(
-                            id='style-details-table',
-                            style_table={'height': '400px', 'overflowY': 'auto'},
-                            style_cell={
-                                'backgroundColor': COLORS['background'],
-                                'color': COLORS['text'],
-                                'border': f'1px solid {COLORS["grid"]}',
-                                'padding': '10px',
-                                'textAlign': 'left'
-                            },
-                            style_header={
-                                'backgroundColor': COLORS['grid'],
-                                'fontWeight': 'bold'
-                            },
-                            style_data_conditional=[{
-                                'if': {'row_index': 'odd'},
-                                'backgroundColor': '#252e3f'
-                            }],
-                            sort_action='native'  # 启用排序功能
-                        ),
-                        width=8
-                    ),
-                    # 右侧饼图
-                    dbc.Col(
-                        dcc.Graph(
-                            id='style-details-pie',
-                            config={'displayModeBar': False},
-                            style={'height': '400px'}
+                                style_data_conditional=[{
+                                    'if': {'row_index': 'odd'},
+                                    'backgroundColor': '#252e3f'
+                                }],
+                                sort_action='native'  # 启用排序功能
+                            ),
+                            width=8
                         ),
-                        width=4
-                    )
+                        # 右侧饼图
+                        dbc.Col(
+                            dcc.Graph(
+                                id='style-details-pie',
+                                config={'displayModeBar': False},
+                                style={'height': '400px'}
+                            ),
+                            width=4
+                        )
+                    ])
                 ])
-            ])
-        ],
-        centered=True,
-        size='xl',  # 使用更大的模态框
-        style={'backgroundColor': COLORS['background']}
-    ),
+            ],
+            centered=True,
+            size='xl',  # 使用更大的模态框
+            style={'backgroundColor': COLORS['background']}
+        ),
 
-    # 新增策略持仓明细模态框
-    dbc.Modal(
-        [
-            dbc.ModalHeader(dbc.ModalTitle("策略持仓明细")),
-            dbc.ModalBody([
-                dash_table.DataTable(
-                    id='strategy-holdings-table',
-                    columns=[
-                        {'name': '证券代码', 'id': 'code'},
-                        {'name': '证券名称', 'id': 'name'},
-                        {'name': '持仓数量', 'id': 'amount', 'type': 'numeric'},
-                        {'name': '持仓市值', 'id': 'value', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
-                        {'name': '当前价', 'id': 'price', 'type': 'numeric', 'format': {'specifier': '.3f'}},
-                        {'name': '当日涨幅', 'id': 'day_change', 'type': 'numeric', 'format': {'specifier': '.2%'}}
-                    ],
-                    style_table={'height': '400px', 'overflowY': 'auto'},
-                    style_cell={
-                        'backgroundColor': COLORS['background'],
-                        'color': COLORS['text'],
-                        'border': f'1px solid {COLORS["grid"]}',
-                        'padding': '10px',
-                        'textAlign': 'left'
-                    },
-                    style_header={
-                        'backgroundColor': COLORS['grid'],
-                        'fontWeight': 'bold',
-                        'border': f'1px solid {COLORS["grid"]}'
-                    },
-                    style_data_conditional=[
-                        {
-                            'if': {'row_index': 'odd'},
-                            'backgroundColor': '#252e3f'
+        # 新增策略持仓明细模态框
+        dbc.Modal(
+            [
+                dbc.ModalHeader(dbc.ModalTitle("策略持仓明细")),
+                dbc.ModalBody([
+                    dash_table.DataTable(
+                        id='strategy-holdings-table',
+                        columns=[
+                            {'name': '证券代码', 'id': 'code'},
+                            {'name': '证券名称', 'id': 'name'},
+                            {'name': '持仓数量', 'id': 'amount', 'type': 'numeric'},
+                            {'name': '持仓市值', 'id': 'value', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
+                            {'name': '当前价', 'id': 'price', 'type': 'numeric', 'format': {'specifier': '.3f'}},
+                            {'name': '当日涨幅', 'id': 'day_change', 'type': 'numeric', 'format': {'specifier': '.2%'}}
+                        ],
+                        style_table={'height': '400px', 'overflowY': 'auto'},
+                        style_cell={
+                            'backgroundColor': COLORS['background'],
+                            'color': COLORS['text'],
+                            'border': f'1px solid {COLORS["grid"]}',
+                            'padding': '10px',
+                            'textAlign': 'left'
                         },
-                        {
-                            'if': {
-                                'filter_query': '{profit_ratio} > 0',
-                                'column_id': 'profit_ratio'
-                            },
-                            'color': 'red'
+                        style_header={
+                            'backgroundColor': COLORS['grid'],
+                            'fontWeight': 'bold',
+                            'border': f'1px solid {COLORS["grid"]}'
                         },
-                        {
-                            'if': {
-                                'filter_query': '{profit_ratio} < 0',
-                                'column_id': 'profit_ratio'
+                        style_data_conditional=[
+                            {
+                                'if': {'row_index': 'odd'},
+                                'backgroundColor': '#252e3f'
                             },
-                            'color': 'green'
-                        },
-                        {
-                            'if': {
-                                'filter_query': '{day_change} > 0',
-                                'column_id': 'day_change'
+                            {
+                                'if': {
+                                    'filter_query': '{profit_ratio} > 0',
+                                    'column_id': 'profit_ratio'
+                                },
+                                'color': 'red'
                             },
-                            'color': 'red'
-                        },
-                        {
-                            'if': {
-                                'filter_query': '{day_change} < 0',
-                                'column_id': 'day_change'
+                            {
+                                'if': {
+                                    'filter_query': '{profit_ratio} < 0',
+                                    'column_id': 'profit_ratio'
+                                },
+                                'color': 'green'
                             },
-                            'color': 'green'
-                        }
-                    ],
-                    sort_action='native'  # 添加排序功能
-                )
-            ]),
-            dbc.ModalFooter(
-                dbc.Button("关闭", id="close-strategy-holdings", className="ms-auto")
-            ),
-        ],
-        id="strategy-holdings-modal",
-        size="lg",
-    ),
-], style={
-    'backgroundColor': '#161a1d',
-    'minHeight': '100vh',
-    'margin': '0'
-})
+                            {
+                                'if': {
+                                    'filter_query': '{day_change} > 0',
+                                    'column_id': 'day_change'
+                                },
+                                'color': 'red'
+                            },
+                            {
+                                'if': {
+                                    'filter_query': '{day_change} < 0',
+                                    'column_id': 'day_change'
+                                },
+                                'color': 'green'
+                            }
+                        ],
+                        sort_action='native'  # 添加排序功能
+                    )
+                ]),
+                dbc.ModalFooter(
+                    dbc.Button("关闭", id="close-strategy-holdings", className="ms-auto")
+                ),
+            ],
+            id="strategy-holdings-modal",
+            size="lg",
+        ),
+    ], style={
+        'backgroundColor': '#161a1d',
+        'minHeight': '100vh',
+        'margin': '0'
+    })
+
+app.layout = serve_layout
+
+def render_key(*parts) -> str:
+    """隐藏选项卡中内容的版本标识，任一部分变化时内容需要重新计算"""
+    return '|'.join(str(part) for part in parts)
+
+def is_stale(active_tab, tab, rendered_key, key) -> bool:
+    """选项卡 tab 正在显示且内容不是按 key 计算的"""
+    return active_tab == tab and rendered_key != key
 
 # 回调函数
 @app.callback(
-    [Output('returns-chart', 'figure'),
-     Output('daily-return', 'children'),
-     Output('daily-net-value', 'children'),
-     Output('daily-profit-loss', 'children')],
+    [Output('date-picker', 'date'),
+     Output('strategy-drawdown-table', 'data'),
+     Output('kpi-store', 'data'),
+     Output('total-nav-chart', 'figure', allow_duplicate=True),
+     Output('data-version', 'data')],
+    Input('data-refresh-interval', 'n_intervals'),
+    State('data-version', 'data'),
+    prevent_initial_call=True
+)
+def refresh_data(n_intervals, client_version):
+    # 只读取数据文件新追加的部分；新数据可能由其他页面的刷新读入，
+    # 因此按页面的数据版本号判断是否需要更新，而不是看这次调用是否读到了新行
+    data_processor.refresh()
+    if client_version == data_processor.version:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    # 跳转到最新日期；总净值趋势图重新发送完整数据，之后切换日期只调整坐标轴范围
+    return (data_processor.date_index.last(), data_processor.display_df.to_dict('records'),
+            data_processor.nav_store.kpi_arrays(), pack_figure(chart_factory.fig_total),
+            data_processor.version)
+
+app.clientside_callback(
+    """
+    function(id) {
+        return window.innerWidth;
+    }
+    """,
+    Output('screen-width', 'data'),
+    Input('screen-width', 'id')
+)
+
+def zoomed_x_range(relayout_data):
+    """从 relayoutData 中取出缩放后的 x 轴范围；双击还原时返回 'autorange'，与 x 轴无关时返回 None"""
+    if not relayout_data:
+        return None
+    if relayout_data.get('xaxis.autorange'):
+        return 'autorange'
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    if 'xaxis.range' in relayout_data:
+        return tuple(relayout_data['xaxis.range'])
+    return None
+
+def zoom_nav_chart(name, relayout_data, width):
+    """页面加载后按窗口宽度发送图表；缩放后按可见范围内的完整数据重新降采样，还原时发送全范围的降采样图表"""
+    if dash.ctx.triggered_id in (None, 'screen-width'):
+        return chart_factory.render_nav_chart(name, width)
+    if CHART_RENDER_MODE != 'webgl':
+        return dash.no_update
+    x_range = zoomed_x_range(relayout_data)
+    if x_range is None:
+        return dash.no_update
+    if x_range == 'autorange':
+        return chart_factory.render_nav_chart(name, width)
+    fig = chart_factory.render_nav_chart(name, width, x_range)
+    if 'yaxis.range[0]' in relayout_data and 'yaxis.range[1]' in relayout_data:
+        # 框选缩放时保留 y 轴范围，只缩放 x 轴时 y 轴按可见数据自动调整
+        fig['layout']['yaxis'] = {**fig['layout'].get('yaxis', {}), 'autorange': False,
+                                  'range': [relayout_data['yaxis.range[0]'], relayout_data['yaxis.range[1]']]}
+    return fig
+
+@app.callback(
+    Output('nav-chart', 'figure'),
+    [Input('nav-chart', 'relayoutData'),
+     Input('screen-width', 'data')]
+)
+def update_nav_chart_zoom(relayout_data, width):
+    return zoom_nav_chart('fig_nav', relayout_data, width)
+
+@app.callback(
+    Output('style-nav-chart', 'figure'),
+    [Input('style-nav-chart', 'relayoutData'),
+     Input('screen-width', 'data')]
+)
+def update_style_nav_chart_zoom(relayout_data, width):
+    return zoom_nav_chart('fig_style_nav', relayout_data, width)
+
+@app.callback(
+    Output('returns-chart', 'figure'),
     [Input('date-picker', 'date')]
 )
 def update_charts(selected_date):
     if selected_date:
         selected_date = pd.to_datetime(selected_date)
         
-        # 获取选定日期数据
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
-        if selected_data.empty:
-            return chart_factory.fig_returns, "N/A", "N/A", "N/A"
-        
-        # 计算当日收益率
-        daily_return = (
-            selected_data['MarketValue_close'] * selected_data['收益率']
-        ).sum() / selected_data['MarketValue_close'].sum()
-        
-        # 更新收益率排名图（使用别名）
-        selected_data = selected_data.copy()  # 创建副本再修改
-        selected_data.loc[:, 'Strategy_Alias'] = selected_data['Strategy'].map(data_processor.get_strategy_alias)
-        returns_sorted = selected_data.sort_values('收益率', ascending=False)
-        top_5 = returns_sorted.head()
-        bottom_5 = returns_sorted.tail()
-        
-        fig_returns = go.Figure()
-        fig_returns.add_trace(go.Bar(
-            x=top_5['Strategy_Alias'],
-            y=top_5['收益率'],
-            marker_color='#ff0000',
-            text=[f"{val:.2%}" for val in top_5['收益率']],
-            textposition='auto'
-        ))
-        fig_returns.add_trace(go.Bar(
-            x=bottom_5['Strategy_Alias'],
-            y=bottom_5['收益率'],
-            marker_color='#00ff00',
-            text=[f"{val:.2%}" for val in bottom_5['收益率']],
-            textposition='auto'
-        ))
-        
-        # 更新布局以去掉 X 轴和 Y 轴标签
-        fig_returns.update_layout(
-            **chart_factory.CHART_LAYOUT,
-            showlegend=False,
-            xaxis_title='',
-            yaxis_title=''
-        )
-        
-        # 计算净值，添加 include_groups=False 参数来修复废弃警告
-        historical_data = data_processor.df[data_processor.df['Date'] <= selected_date]
-        daily_returns = historical_data.groupby('Date', group_keys=False).apply(
-            lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum(),
-            include_groups=False
-        )
-        nav = (1 + daily_returns).cumprod().iloc[-1]
-        
-        # 计算当日盈亏金额
-        daily_profit_loss = (selected_data['MarketValue_close'] * selected_data['收益率']).sum().round(2)
-        
-        # 更新净值趋势图的布局以去掉 X 轴和 Y 轴标签
-        chart_factory.fig_style_nav.update_layout(
-            xaxis_title='',  # 去掉 X 轴标签
-            yaxis_title=''   # 去掉 Y 轴标签
-        )
-        
-        chart_factory.fig_nav.update_layout(
-            xaxis_title='',  # 去掉 X 轴标签
-            yaxis_title=''   # 去掉 Y 轴标签
-        )
-        
-        chart_factory.fig_total.update_layout(
-            xaxis_title='',  # 去掉 X 轴标签
-            yaxis_title=''   # 去掉 Y 轴标签
-        )
+        fig_returns = figure_cache.get('returns-chart', selected_date, data_processor.version,
+                                       lambda: build_returns_chart(selected_date))
+        if fig_returns is None:
+            return chart_factory.fig_returns
         
-        return fig_returns, f"{daily_return:.2%}", f"{nav:.4f}", f"{daily_profit_loss:.2f}元"
+        return fig_returns
+    
+    return chart_factory.fig_returns
+
+def build_returns_chart(selected_date):
+    """选定日期收益率最高和最低 5 个策略的柱状图，没有该日数据时返回 None"""
+    # 获取选定日期的快照（收益率排名）
+    snapshot = data_processor.snapshot(selected_date)
+    if snapshot is None:
+        return None
+    
+    # 更新收益率排名图（使用别名）
+    top_5 = snapshot.top_5
+    bottom_5 = snapshot.bottom_5
+    
+    fig_returns = go.Figure()
+    fig_returns.add_trace(go.Bar(
+        x=top_5['Strategy_Alias'],
+        y=top_5['收益率'],
+        marker_color='#ff0000',
+        texttemplate='%{y:.2%}',  # 由浏览器格式化数值，不在服务器端生成文字列表
+        textposition='auto',
+        hovertemplate='%{x}: %{y:.2%}<extra></extra>'
+    ))
+    fig_returns.add_trace(go.Bar(
+        x=bottom_5['Strategy_Alias'],
+        y=bottom_5['收益率'],
+        marker_color='#00ff00',
+        texttemplate='%{y:.2%}',
+        textposition='auto',
+        hovertemplate='%{x}: %{y:.2%}<extra></extra>'
+    ))
+    
+    # 更新布局以去掉 X 轴和 Y 轴标签
+    fig_returns.update_layout(
+        **chart_factory.CHART_LAYOUT,
+        showlegend=False,
+        xaxis_title='',
+        yaxis_title=''
+    )
     
-    return chart_factory.fig_returns, "N/A", "N/A", "N/A"
+    return fig_returns
 
 @app.callback(
-    Output('style-pie', 'figure'),
-    Input('date-picker', 'date')
+    [Output('style-pie', 'figure'),
+     Output('style-pie-key', 'data')],
+    [Input('date-picker', 'date'),
+     Input('pie-tabs', 'value')],
+    State('style-pie-key', 'data')
 )
-def update_style_pie_chart(selected_date):
+def update_style_pie_chart(selected_date, active_tab, rendered_key):
+    key = render_key(selected_date, data_processor.version)
+    if not is_stale(active_tab, 'style-pie-tab', rendered_key, key):
+        return dash.no_update, dash.no_update
+    return build_style_pie_chart(selected_date), key
+
+def build_style_pie_chart(selected_date):
     if (selected_date):
         selected_date = pd.to_datetime(selected_date)
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
-        if not selected_data.empty:
-            style_market_value = {}
-            for strategy_name, strategy_info in chart_factory.STRATEGY_STYLES.items():
-                if 'styles' in strategy_info:
-                    strategy_data = selected_data[selected_data['Strategy'] == strategy_name]
-                    if not strategy_data.empty:
-                        market_value = strategy_data['MarketValue_close'].sum()
-                        if strategy_info['styles'][0] in style_market_value:
-                            style_market_value[strategy_info['styles'][0]] += market_value
-                        else:
-                            style_market_value[strategy_info['styles'][0]] = market_value
-            style_df = pd.DataFrame(list(style_market_value.items()), columns=['Style', 'MarketValue'])
-            fig_style_pie = chart_factory.create_pie_chart(
-                style_df,
-                values='MarketValue',
-                names='Style'
-            )
+        # 按第一风格汇总的总市值
+        fig_style_pie = figure_cache.get(
+            'style-pie', selected_date, data_processor.version,
+            lambda: build_snapshot_pie(selected_date, 'style_market_value', values='MarketValue', names='Style')
+        )
+        if fig_style_pie is not None:
             return fig_style_pie
     return chart_factory.fig_pie
 
+def build_snapshot_pie(selected_date, attribute, values, names):
+    """用选定日期快照中的 attribute 数据构建饼图，没有该日数据时返回 None"""
+    snapshot = data_processor.snapshot(selected_date)
+    if snapshot is None:
+        return None
+    return chart_factory.create_pie_chart(getattr(snapshot, attribute), values=values, names=names)
+
 # 新增回调函数，用于根据日期选择器更新市值占比饼图
 @app.callback(
     Output('fig-pie', 'figure'),
@@ -919,66 +1041,63 @@ def update_style_pie_chart(selected_date):
 def update_pie_chart(selected_date):
     if selected_date:
         selected_date = pd.to_datetime(selected_date)
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
-        if not selected_data.empty:
-            selected_data = selected_data.copy()  # 创建副本再修改
-            selected_data.loc[:, 'Strategy_Alias'] = selected_data['Strategy'].map(data_processor.get_strategy_alias)
-            fig_pie = chart_factory.create_pie_chart(
-                selected_data,
-                values='MarketValue_close',
-                names='Strategy_Alias'
-            )
+        fig_pie = figure_cache.get(
+            'fig-pie', selected_date, data_processor.version,
+            lambda: build_snapshot_pie(selected_date, 'rows', values='MarketValue_close', names='Strategy_Alias')
+        )
+        if fig_pie is not None:
             return fig_pie
     return chart_factory.fig_pie
 
-@app.callback(
-    Output('daily-profit-loss', 'style'),
-    Input('date-picker', 'date')
-)
-def update_profit_loss_style(selected_date):
-    if selected_date:
-        selected_date = pd.to_datetime(selected_date)
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
+# 顶部指标的文字和颜色在浏览器端根据 kpi-store 计算，切换日期不需要请求服务器
+app.clientside_callback(
+    """
+    function(selectedDate, kpi) {
+        var textColor = %s;
+        var profitLossStyle = {'color': textColor, 'textAlign': 'center', 'cursor': 'pointer', 'fontSize': '14px'};
+        var returnStyle = {'color': textColor, 'textAlign': 'center'};
+        var empty = ['N/A', 'N/A', 'N/A', profitLossStyle, returnStyle];
+        if (!selectedDate || !kpi || !kpi.dates.length) {
+            return empty;
+        }
         
-        if not selected_data.empty:
-            daily_profit_loss = (selected_data['MarketValue_close'] * selected_data['收益率']).sum()
-            
-            return {
-                'color': 'red' if daily_profit_loss > 0 else 'green' if daily_profit_loss < 0 else COLORS['text'],
-                'textAlign': 'center',
-                'cursor': 'pointer',  # 添加鼠标指针样式
-                'fontSize': '14px'  # 保持字体大小一致
-            }
-    
-    return {
-        'color': COLORS['text'],
-        'textAlign': 'center',
-        'cursor': 'pointer',  # 添加鼠标指针样式
-        'fontSize': '14px'  # 保持字体大小一致
+        // 日期字符串按时间顺序排列，二分查找选中日期
+        var date = String(selectedDate).slice(0, 10);
+        var lo = 0, hi = kpi.dates.length - 1, i = -1;
+        while (lo <= hi) {
+            var mid = (lo + hi) >> 1;
+            if (kpi.dates[mid] === date) { i = mid; break; }
+            if (kpi.dates[mid] < date) { lo = mid + 1; } else { hi = mid - 1; }
+        }
+        if (i < 0) {
+            return empty;
+        }
+        
+        // 正数为红色，负数为绿色，为零时使用默认颜色
+        function color(value) {
+            return value > 0 ? 'red' : value < 0 ? 'green' : textColor;
+        }
+        function format(value, digits, scale, suffix) {
+            return value === null ? 'N/A' : (value * scale).toFixed(digits) + suffix;
+        }
+        var dailyReturn = kpi.returns[i], profitLoss = kpi.profit_loss[i], nav = kpi.nav[i];
+        return [
+            format(dailyReturn, 2, 100, '%%'),
+            format(nav, 4, 1, ''),
+            format(profitLoss, 2, 1, '元'),
+            Object.assign({}, profitLossStyle, {'color': color(profitLoss)}),
+            Object.assign({}, returnStyle, {'color': color(dailyReturn)})
+        ];
     }
-
-@app.callback(
-    Output('daily-return', 'style'),
-    Input('date-picker', 'date')
+    """ % json.dumps(COLORS['text']),
+    [Output('daily-return', 'children'),
+     Output('daily-net-value', 'children'),
+     Output('daily-profit-loss', 'children'),
+     Output('daily-profit-loss', 'style'),
+     Output('daily-return', 'style')],
+    [Input('date-picker', 'date'),
+     Input('kpi-store', 'data')]
 )
-def update_return_style(selected_date):
-    if selected_date:
-        selected_date = pd.to_datetime(selected_date)
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
-        
-        if not selected_data.empty:
-            daily_return = (
-                selected_data['MarketValue_close'] * selected_data['收益率']
-            ).sum() / selected_data['MarketValue_close'].sum()
-            
-            if daily_return > 0:
-                return {'color': 'red', 'textAlign': 'center'}  # 正数为红色
-            elif daily_return < 0:
-                return {'color': 'green', 'textAlign': 'center'}  # 负数为绿色
-            else:
-                return {'color': COLORS['text'], 'textAlign': 'center'}  # 为零时使用默认颜色
-    
-    return {'color': COLORS['text'], 'textAlign': 'center'}  # 初始状态使用默认颜色
 
 # 添加回调函数
 @app.callback(
@@ -1023,9 +1142,10 @@ def toggle_daily_details_modal(header_clicks, value_clicks, selected_date):
      Output('nav-contribution-table', 'columns')],
     [Input('net-value-header', 'n_clicks'),
      Input('daily-net-value', 'n_clicks')],
+    State('date-picker', 'date'),
     prevent_initial_call=True
 )
-def toggle_nav_contribution_modal(header_clicks, value_clicks):
+def toggle_nav_contribution_modal(header_clicks, value_clicks, selected_date):
     if header_clicks is None and value_clicks is None:
         return False, [], []
     
@@ -1033,7 +1153,8 @@ def toggle_nav_contribution_modal(header_clicks, value_clicks):
     if not ctx.triggered:
         return False, [], []
         
-    df = data_processor.get_nav_contribution()
+    # 贡献度截至日期选择器选中的日期
+    df = data_processor.get_nav_contribution(selected_date)
     columns = [
         {'name': '策略', 'id': '策略'},
         {'name': '净值贡献', 'id': '净值贡献', 'type': 'numeric', 'format': {'specifier': '.2%'}}
@@ -1042,10 +1163,19 @@ def toggle_nav_contribution_modal(header_clicks, value_clicks):
     return True, df.to_dict('records'), columns
     
 @app.callback(
-    Output('style-drawdown-table', 'data'),
-    Input('date-picker', 'date')
+    [Output('style-drawdown-table', 'data'),
+     Output('style-drawdown-table-key', 'data')],
+    [Input('date-picker', 'date'),
+     Input('drawdown-tabs', 'value')],
+    State('style-drawdown-table-key', 'data')
 )
-def update_style_drawdown_table(selected_date):
+def update_style_drawdown_table(selected_date, active_tab, rendered_key):
+    key = render_key(selected_date, data_processor.version)
+    if not is_stale(active_tab, 'style-drawdown-tab', rendered_key, key):
+        return dash.no_update, dash.no_update
+    return build_style_drawdown_rows(selected_date), key
+
+def build_style_drawdown_rows(selected_date):
     if selected_date:
         df = data_processor.get_style_drawdowns()
         # 计算总市值和持仓市值的总和
@@ -1065,69 +1195,57 @@ def update_style_drawdown_table(selected_date):
     return []
 
 @app.callback(
-    Output('style-position-pie', 'figure'),
-    Input('date-picker', 'date')
+    [Output('style-position-pie', 'figure'),
+     Output('style-position-pie-key', 'data')],
+    [Input('date-picker', 'date'),
+     Input('pie-tabs', 'value')],
+    State('style-position-pie-key', 'data')
 )
-def update_style_position_pie_chart(selected_date):
+def update_style_position_pie_chart(selected_date, active_tab, rendered_key):
+    key = render_key(selected_date, data_processor.version)
+    if not is_stale(active_tab, 'style-position-pie-tab', rendered_key, key):
+        return dash.no_update, dash.no_update
+    return build_style_position_pie_chart(selected_date), key
+
+def build_style_position_pie_chart(selected_date):
     if selected_date:
         selected_date = pd.to_datetime(selected_date)
-        selected_data = data_processor.df[data_processor.df['Date'] == selected_date]
-        if not selected_data.empty:
-            style_market_value = {}
-            for strategy_name, strategy_info in chart_factory.STRATEGY_STYLES.items():
-                if 'styles' in strategy_info:
-                    strategy_data = selected_data[selected_data['Strategy'] == strategy_name]
-                    if not strategy_data.empty:
-                        # 使用 PositionValue 计算持仓市值
-                        position_value = strategy_data['PositionValue'].sum()
-                        if strategy_info['styles'][0] in style_market_value:
-                            style_market_value[strategy_info['styles'][0]] += position_value
-                        else:
-                            style_market_value[strategy_info['styles'][0]] = position_value
-            style_df = pd.DataFrame(list(style_market_value.items()), columns=['Style', 'MarketValue'])
-            fig_style_position_pie = chart_factory.create_pie_chart(
-                style_df,
-                values='MarketValue',
-                names='Style'
-            )
+        # 按第一风格汇总的持仓市值（PositionValue）
+        fig_style_position_pie = figure_cache.get(
+            'style-position-pie', selected_date, data_processor.version,
+            lambda: build_snapshot_pie(selected_date, 'style_position_value', values='MarketValue', names='Style')
+        )
+        if fig_style_position_pie is not None:
             return fig_style_position_pie
     return chart_factory.create_pie_chart(pd.DataFrame(columns=['Style', 'MarketValue']), values='MarketValue', names='Style')
 
 # 新增回调函数处理持仓数据
 @app.callback(
-    Output('holdings-table', 'data'),
-    Input('date-picker', 'date')
+    [Output('holdings-table', 'data'),
+     Output('holdings-table-key', 'data')],
+    [Input('date-picker', 'date'),
+     Input('drawdown-tabs', 'value')],
+    State('holdings-table-key', 'data')
 )
-def update_holdings_table(selected_date):
+def update_holdings_table(selected_date, active_tab, rendered_key):
+    # 持仓文件变化或后台刷新过行情后内容过期
+    holdings_repository.refresh()
+    key = render_key(selected_date, holdings_repository.version, price_service.fetches)
+    if not is_stale(active_tab, 'holdings-tab', rendered_key, key):
+        return dash.no_update, dash.no_update
+    rows = build_holdings_rows()
+    # 首次获取行情也会改变 fetches，按获取后的状态记录
+    return rows, render_key(selected_date, holdings_repository.version, price_service.fetches)
+
+def build_holdings_rows():
 #    import json
 #    from portfolio import get_stock_prices
     
-    # 获取项目根目录下的 holdings 文件夹中的所有 txt 文件
-    holdings_dir = os.path.join(os.path.dirname(__file__), 'holdings')
-    holdings_files = [f for f in os.listdir(holdings_dir) if f.endswith('.txt')]
-    
-    # 合并持仓数据
-    holdings = {}
-    code2name = {}  # 用于存储股票代码到名称的映射
-    
-    for file in holdings_files:
-        with open(os.path.join(holdings_dir, file), 'r', encoding='utf-8') as f:
-            account_data = json.load(f)
-            for account in account_data.values():
-                if 'holding' in account:
-                    for stock_code, quantity in account['holding'].items():
-                        code = stock_code  # 保持完整的股票代码格式（包含.SZ/.SH）
-                        if code in holdings:
-                            holdings[code] += quantity
-                        else:
-                            holdings[code] = quantity
+    # 合并持仓数据（保持完整的股票代码格式，包含.SZ/.SH）
+    holdings = holdings_repository.quantities()
 
     # 获取所有股票的价格
-    with open(r'cookies.txt', 'r') as f:
-        cookies = json.load(f)
-        cookie = cookies['xueqiu']  # 获取雪球的cookie
-    
-    prices = get_stock_prices(list(holdings.keys()), cookie)
+    prices = price_service.get(holdings.keys())
 
     # 计算市值并创建排序后的数据
     holdings_data = []
@@ -1149,60 +1267,18 @@ def update_holdings_table(selected_date):
 
 # 新增回调函数：持仓对比
 @app.callback(
-    Output('holdings-compare-table', 'data'),
-    Input('date-picker', 'date')
+    [Output('holdings-compare-table', 'data'),
+     Output('holdings-compare-table-key', 'data')],
+    [Input('date-picker', 'date'),
+     Input('drawdown-tabs', 'value')],
+    State('holdings-compare-table-key', 'data')
 )
-def update_holdings_compare_table(selected_date):
-#    import json
-    import re
-    # 账户持仓明细
-    holdings_dir = os.path.join(os.path.dirname(__file__), 'holdings')
-    holdings_files = [f for f in os.listdir(holdings_dir) if f.endswith('.txt')]
-    holdings = {}
-    code2name = {}
-    for file in holdings_files:
-        with open(os.path.join(holdings_dir, file), 'r', encoding='utf-8') as f:
-            account_data = json.load(f)
-            for account in account_data.values():
-                if 'holding' in account:
-                    for stock_code, quantity in account['holding'].items():
-                        code = str(stock_code).split('.')[0]
-                        if code in holdings:
-                            holdings[code] += quantity
-                        else:
-                            holdings[code] = quantity
-                        # 记录名称
-                        if 'holding_name' in account and stock_code in account['holding_name']:
-                            code2name[code] = account['holding_name'][stock_code]
-    # 读取holdings.tsv，建立证券代码到证券名称的映射
-    code_name_map = {}
-    actual_df = pd.read_csv('holdings.tsv', sep='\t', dtype=str)
-    if '证券代码' in actual_df.columns and '证券名称' in actual_df.columns:
-        for _, row in actual_df.iterrows():
-            code = str(row['证券代码']).split('.')[0]
-            name = row['证券名称']
-            code_name_map[code] = name
-
-    actual_df['证券代码'] = actual_df['证券代码'].astype(str).str.split('.').str[0]
-    actual_df['当前拥股'] = actual_df['当前拥股'].astype(str).str.replace(r'[^\d]', '', regex=True).astype(int)
-    actual_map = dict(zip(actual_df['证券代码'], actual_df['当前拥股']))
-    # 合并所有股票代码
-    all_codes = set(holdings.keys()) | set(actual_map.keys())
-    result = []
-    for code in sorted(all_codes):
-        account_qty = holdings.get(code, 0)
-        actual_qty = actual_map.get(code, 0)
-        diff = account_qty - actual_qty
-        result.append({
-            '股票代码': code,
-            '股票名称': code_name_map.get(code, code2name.get(code, '')),
-            '账户持仓': account_qty,
-            '实际持仓': actual_qty,
-            '差异': diff
-        })
-    # 只显示有差异的
-    result = [row for row in result if row['差异'] != 0]
-    return result
+def update_holdings_compare_table(selected_date, active_tab, rendered_key):
+    key = render_key(selected_date, *holdings_reconciler.key())
+    if not is_stale(active_tab, 'holdings-compare-tab', rendered_key, key):
+        return dash.no_update, dash.no_update
+    # 账户持仓与 holdings.tsv 实际持仓的差异，两边文件都未变化时直接返回缓存的结果
+    return holdings_reconciler.differences(), key
 
 # 新增风格详情回调函数
 @app.callback(
@@ -1231,55 +1307,30 @@ def show_style_details(active_cell, derived_virtual_data):
     strategies_data = []
     total_value = 0
 
-    # 获取属于这个风格的所有策略原始名称
-    style_strategies = []
-    
-    if style == '三年以内':
-        # 使用当前日期
-        current_date = pd.Timestamp.now()
-        # 读取 cubevalue.txt 获取创建时间信息
-        with open('cubevalue.txt', 'r') as f:
-            cubevalue = json.load(f)
-        
-        # 查找三年内的雪球策略
-        for strategy_name, info in data_processor.STRATEGY_STYLES.items():
-            if 'styles' in info and '雪球' in info['styles']:
-                if strategy_name in cubevalue and 'create_time' in cubevalue[strategy_name]:
-                    create_time = pd.Timestamp(cubevalue[strategy_name]['create_time'])
-                    days_diff = (current_date - create_time).days
-                    if days_diff <= 1095:  # 3年 * 365天
-                        style_strategies.append(strategy_name)
-    else:
-        # 对于其他风格，从 STRATEGY_STYLES 中查找
-        style_strategies = [k for k, v in data_processor.STRATEGY_STYLES.items() 
-                          if 'styles' in v and style in v['styles']]
+    # 获取属于这个风格的所有策略原始名称（三年以内为创建不满三年的雪球策略）
+    style_strategies = data_processor.style_index.members(style)
     
     # 从原始数据中获取策略数据
-    latest_date = data_processor.df['Date'].max()
-    latest_data = data_processor.df[data_processor.df['Date'] == latest_date]
+    latest_data = data_processor.rows_on(data_processor.date_index.last())
+    
+    # 净值和回撤直接取自全部策略一次性计算的结果
+    stats = data_processor.strategy_drawdowns
+    annual_returns = annual_return(stats)
     
     for strategy_name in style_strategies:
-        strategy_data = data_processor.df[data_processor.df['Strategy'] == strategy_name]
-        if not strategy_data.empty:
+        if strategy_name in stats.index:
             latest_strategy_data = latest_data[latest_data['Strategy'] == strategy_name]
             if not latest_strategy_data.empty:
                 latest_strategy_data = latest_strategy_data.iloc[0]
                 
-                # 计算年化收益率和回撤
-                strategy_nav = (1 + strategy_data['收益率']).cumprod()
-                max_dd, curr_dd = data_processor.calculate_drawdown(strategy_nav)
-                total_days = (strategy_data['Date'].max() - strategy_data['Date'].min()).days
-                total_return = strategy_nav.iloc[-1] - 1
-                annual_return = (1 + total_return) ** (365 / total_days) - 1 if total_days > 0 else 0.0
-                
                 strategies_data.append({
                     '策略': data_processor.get_strategy_alias(strategy_name),  # 显示别名
                     '总市值': latest_strategy_data['MarketValue_close'],
                     '持仓市值': latest_strategy_data['PositionValue'],
                     '仓位': latest_strategy_data['PositionValue'] / latest_strategy_data['MarketValue_close'] if latest_strategy_data['MarketValue_close'] > 0 else 0,
-                    '年化收益率': annual_return,
-                    '最大回撤': max_dd,
-                    '当前回撤': curr_dd
+                    '年化收益率': annual_returns[strategy_name],
+                    '最大回撤': stats.at[strategy_name, 'max_drawdown'],
+                    '当前回撤': stats.at[strategy_name, 'current_drawdown']
                 })
                 total_value += latest_strategy_data['MarketValue_close']
     
@@ -1344,229 +1395,67 @@ def show_strategy_holdings(active_cell, close_clicks, derived_virtual_data):
         actual_strategy_name = strategy_alias
     
     # 从xueqiu.txt、guoren.txt等文件中读取策略持仓数据
-    holdings_data = []
-    
-    # 根据策略名称判断应该从哪个文件读取数据
-    if actual_strategy_name.startswith('ZH'):
-        # 雪球策略
-        try:
-            with open('holdings/xueqiu.txt', 'r', encoding='utf-8') as f:
-                xueqiu_data = json.load(f)
-                if actual_strategy_name in xueqiu_data:
-                    strategy_holdings = xueqiu_data[actual_strategy_name].get('holding', {})
-                    for code, amount in strategy_holdings.items():
-                        holdings_data.append({
-                            'code': code,
-                            'name': get_stock_name(code),
-                            'amount': amount,
-                            'value': 0,
-                            'cost': 0,
-                            'price': 0,
-                            'profit_ratio': 0,
-                            'day_change': 0
-                        })
-        except Exception as e:
-            print(f"Error reading xueqiu.txt: {e}")
-    elif actual_strategy_name.startswith('8844.R.'):
-        # 果仁策略
-        try:
-            with open('holdings/guoren.txt', 'r', encoding='utf-8') as f:
-                guoren_data = json.load(f)
-                if actual_strategy_name in guoren_data:
-                    strategy_holdings = guoren_data[actual_strategy_name].get('holding', {})
-                    for code, amount in strategy_holdings.items():
-                        holdings_data.append({
-                            'code': code,
-                            'name': get_stock_name(code),
-                            'amount': amount,
-                            'value': 0,
-                            'cost': 0,
-                            'price': 0,
-                            'profit_ratio': 0,
-                            'day_change': 0
-                        })
-        except Exception as e:
-            print(f"Error reading guoren.txt: {e}")
-    elif actual_strategy_name in ['etfdl', 'etfdl2', 'etfdl3', 'ylxy']:
-        # ETF动量策略和月历效应
-        try:
-            with open(f'holdings/{actual_strategy_name}.txt', 'r', encoding='utf-8') as f:
-                strategy_data = json.load(f)
-                if actual_strategy_name in strategy_data:
-                    strategy_holdings = strategy_data[actual_strategy_name].get('holding', {})
-                    for code, amount in strategy_holdings.items():
-                        holdings_data.append({
-                            'code': code,
-                            'name': get_stock_name(code),
-                            'amount': amount,
-                            'value': 0,
-                            'cost': 0,
-                            'price': 0,
-                            'profit_ratio': 0,
-                            'day_change': 0
-                        })
-        except Exception as e:
-            print(f"Error reading {actual_strategy_name}.txt: {e}")
-    else:
-        # 聚宽策略
-        try:
-            with open('holdings/joinquant.txt', 'r', encoding='utf-8') as f:
-                joinquant_data = json.load(f)
-                if actual_strategy_name in joinquant_data:
-                    strategy_holdings = joinquant_data[actual_strategy_name].get('holding', {})
-                    for code, amount in strategy_holdings.items():
-                        holdings_data.append({
-                            'code': code,
-                            'name': get_stock_name(code),
-                            'amount': amount,
-                            'value': 0,
-                            'cost': 0,
-                            'price': 0,
-                            'profit_ratio': 0,
-                            'day_change': 0
-                        })
-        except Exception as e:
-            print(f"Error reading joinquant.txt: {e}")
+    strategy_holdings = holdings_repository.holdings_of(actual_strategy_name)
     
     # 获取所有股票的实时价格和涨跌幅
-    if holdings_data:
+    prices = {}
+    if strategy_holdings:
         try:
-            with open(r'cookies.txt', 'r') as f:
-                cookies = json.load(f)
-                cookie = cookies['xueqiu']  # 获取雪球的cookie
-            
-            # 获取所有股票代码
-            stock_codes = [item['code'] for item in holdings_data]
-            prices = get_stock_prices(stock_codes, cookie)
-            
-            # 更新持仓数据
-            for item in holdings_data:
-                stock_data = prices.get(item['code'], {})
-                last_price = stock_data.get('lastPrice', 0)
-                change_percent = stock_data.get('changePercent', 0) / 100 if stock_data.get('changePercent') is not None else 0
-                
-                item['price'] = last_price
-                item['value'] = round(item['amount'] * last_price, 2)
-                item['day_change'] = change_percent
+            prices = price_service.get(strategy_holdings.keys())
         except Exception as e:
             print(f"Error fetching stock prices: {e}")
+    
+    # 一次查出所有股票名称（holdings.tsv、holding_name、行情中的名称）
+    names = stock_names.lookup(strategy_holdings.keys())
+    
+    holdings_data = []
+    for code, amount in strategy_holdings.items():
+        stock_data = prices.get(code, {})
+        last_price = stock_data.get('lastPrice', 0)
+        change_percent = stock_data.get('changePercent', 0) / 100 if stock_data.get('changePercent') is not None else 0
+        holdings_data.append({
+            'code': code,
+            'name': names[code],
+            'amount': amount,
+            'value': round(amount * last_price, 2),
+            'cost': 0,
+            'price': last_price,
+            'profit_ratio': 0,
+            'day_change': change_percent
+        })
         
     return True, holdings_data
 
 def get_stock_name(code):
-    """从holdings.tsv中获取股票名称"""
-    try:
-        with open('holdings.tsv', 'r', encoding='utf-8') as f:
-            for line in f:
-                fields = line.strip().split('\t')
-                if len(fields) > 7 and fields[7] == code.split('.')[0]:
-                    return fields[8]
-    except Exception as e:
-        print(f"Error reading holdings.tsv: {e}")
-    return code
+    """获取股票名称，多个代码请使用 stock_names.lookup 一次查出"""
+    return stock_names.name(code)
 
-# 修改回调函数的Output参数
+# 总净值趋势图在页面加载时发送一次包含完整历史的图表，之后切换日期只发送调整坐标轴范围的 Patch
 @app.callback(
     Output('total-nav-chart', 'figure'),
     [Input('date-picker', 'date')]
 )
 def update_total_chart(selected_date):
-    if selected_date:
-        selected_date = pd.to_datetime(selected_date)
-        
-        # 筛选选定日期之前的数据
-        historical_data = data_processor.df[data_processor.df['Date'] <= selected_date]
-        if historical_data.empty:
-            return chart_factory.fig_total
-        
-        # 计算每日总收益率
-        daily_returns = historical_data.groupby('Date', group_keys=False).apply(
-            lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum(),
-            include_groups=False
-        )
-        
-        # 计算总收益率（净值-1），确保Date只作为列而非索引
-        total_nav = pd.DataFrame({
-            'Date': daily_returns.index,
-            '总收益率': (1 + daily_returns).cumprod() - 1  # 转换为收益率格式（净值-1）
-        }).reset_index(drop=True)  # 重置索引，确保Date只是列而非索引
-        
-        # 创建总收益率趋势图
-        fig_total = px.line(total_nav, x='Date', y='总收益率')
-        
-        # 设置总收益率的悬停模板
-        for trace in fig_total.data:
-            trace.hovertemplate = '总收益率: %{y:.2%}<extra></extra>'  # 百分比格式
-        
-        # 更新布局
-        fig_total.update_layout(
-            **chart_factory.CHART_LAYOUT,
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            xaxis_title='',
-            yaxis_title=''
-        )
-        
-        # 获取沪深300数据
-        csi300_data = data_processor.get_csi300_data(end_date=selected_date)
-        
-        if not csi300_data.empty:
-            # 计算沪深300收益率（净值-1）
-            csi300_data = csi300_data.copy()
-            csi300_data['收益率'] = csi300_data['净值'] - 1
-            
-            # 添加沪深300收益率线
-            fig_total.add_trace(go.Scatter(
-                x=csi300_data['Date'],
-                y=csi300_data['收益率'],
-                name='沪深300',
-                line=dict(
-                    color='#808080',  # 灰色
-                    width=2,
-                    dash='dash'  # 虚线
-                ),
-                mode='lines',
-                hovertemplate='%{x|%Y-%m-%d}<br>沪深300: %{y:.2%}<extra></extra>'  # 百分比格式
-            ))
-            
-            # 添加超额收益线
-            common_dates = set(total_nav['Date']).intersection(set(csi300_data['Date']))
-            if common_dates:
-                # 筛选共同日期的数据，并创建副本避免修改原始数据
-                filtered_total = total_nav[total_nav['Date'].isin(common_dates)].copy().sort_values('Date')
-                filtered_csi300 = csi300_data[csi300_data['Date'].isin(common_dates)].copy().sort_values('Date')
-                
-                # 创建包含超额收益的数据框，使用values避免索引问题
-                excess_return_df = pd.DataFrame({
-                    'Date': filtered_total['Date'].values,
-                    '超额收益': filtered_total['总收益率'].values - filtered_csi300['收益率'].values
-                })
-                
-                # 添加超额收益线
-                fig_total.add_trace(go.Scatter(
-                    x=excess_return_df['Date'],
-                    y=excess_return_df['超额收益'],
-                    name='超额收益',
-                    line=dict(
-                        color='#00ff00',  # 绿色
-                        width=2
-                    ),
-                    mode='lines',
-                    hovertemplate='%{x|%Y-%m-%d}<br>超额收益: %{y:.2%}<extra></extra>'  # 百分比格式
-                ))
-            
-            # 设置交互模式为x轴统一显示
-            fig_total.update_layout(hovermode='x unified')
-        
-        return fig_total
+    if dash.ctx.triggered_id is None:
+        figure = pack_figure(chart_factory.fig_total)
+    else:
+        figure = Patch()
+    ranges = chart_factory.total_chart_range(pd.to_datetime(selected_date)) if selected_date else None
+    if ranges is None:
+        # 没有选定日期之前的数据时显示全部历史
+        figure['layout']['xaxis'].update({'range': None, 'autorange': True})
+        figure['layout']['yaxis'].update({'range': None, 'autorange': True})
+        return figure
     
-    return chart_factory.fig_total
+    x_range, y_range = ranges
+    figure['layout']['xaxis'].update({'range': x_range, 'autorange': False})
+    figure['layout']['yaxis'].update({'range': y_range, 'autorange': False})
+    return figure
+
+# 页面和回调不等待图表创建，收到第一个请求后在后台线程中创建所有图表，数据更新后同样如此
+@app.server.before_request
+def warmup_charts():
+    chart_factory.warmup()
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""对比净值贡献的两种计算方式：逐策略循环 vs 一次算出所有日期的累计贡献矩阵
+
+    python -m benchmarks.bench_contribution --strategies 500 --years 10
+
+矩阵构建一次后，任意日期的查询只取一行；这里分别给出首次构建和缓存命中后的耗时。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from .synthetic import write_market_value_csv
+
+
+def legacy_contribution(df: pd.DataFrame) -> pd.Series:
+    """原 get_nav_contribution 的逐策略实现，返回 策略 -> 净值贡献"""
+    contributions = {}
+    total_market_value = df.groupby('Date')['MarketValue_close'].sum()
+    for strategy in df['Strategy'].unique():
+        strategy_data = df[df['Strategy'] == strategy].copy()
+        strategy_data['weight'] = strategy_data['MarketValue_close'] / \
+                                total_market_value[strategy_data['Date']].values
+        strategy_data['weighted_return'] = strategy_data['weight'] * strategy_data['收益率']
+        contributions[strategy] = (1 + strategy_data['weighted_return']).cumprod().iloc[-1] - 1
+    return pd.Series(contributions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--samples', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行")
+        dp = DataProcessor(path, cache_dir=None)
+
+    start = time.perf_counter()
+    actual = dp.get_nav_contribution()
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    dates = rng.choice(dp.nav_store.dates, args.samples)
+    start = time.perf_counter()
+    for date in dates:
+        dp.get_nav_contribution(date)
+    hit_seconds = (time.perf_counter() - start) / len(dates)
+
+    start = time.perf_counter()
+    expected = legacy_contribution(dp.df)
+    legacy_seconds = time.perf_counter() - start
+
+    expected = expected.rename(index=dp.get_strategy_alias)
+    assert np.allclose(actual.set_index('策略')['净值贡献'], expected[actual['策略']])
+    print(f"原循环 {legacy_seconds:.3f}s, 矩阵首次构建 {build_seconds * 1000:.1f}ms, "
+          f"按日期查询 {hit_seconds * 1000:.2f}ms, 输出一致")
+
+
+if __name__ == '__main__':
+    main()
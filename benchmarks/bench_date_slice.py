@@ -0,0 +1,63 @@
+"""对比按日期取当天记录的两种方式：布尔掩码扫描整张表 vs 日期行索引切片
+
+    python -m benchmarks.bench_date_slice --strategies 500 --years 10
+
+在随机抽取的交易日上分别调用 rows_on、get_daily_details 和
+calculate_daily_profit_loss，并与原 df[df['Date'] == date] 的结果比对。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from .synthetic import write_market_value_csv
+
+
+def timeit(func, dates, repeat: int) -> float:
+    """每次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for date in dates:
+            func(date)
+    return (time.perf_counter() - start) / (repeat * len(dates)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--samples', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行")
+        dp = DataProcessor(path, cache_dir=None)
+
+    df = dp.df
+    rng = np.random.default_rng(0)
+    dates = [pd.Timestamp(d) for d in rng.choice(dp.date_index.dates, args.samples)]
+    for date in dates:
+        pd.testing.assert_frame_equal(dp.rows_on(date), df[df['Date'] == date])
+    print(f"{len(df)} 条记录, {len(dp.date_index)} 个交易日, 抽样 {len(dates)} 天, 结果一致")
+
+    # 把 rows_on 替换为原来的布尔掩码写法，其余计算保持不变
+    legacy = DataProcessor.__new__(DataProcessor)
+    legacy.__dict__.update(dp.__dict__)
+    legacy.rows_on = lambda date: df[df['Date'] == pd.Timestamp(date)]
+
+    for name in ('rows_on', 'calculate_daily_profit_loss', 'get_daily_details'):
+        legacy_us = timeit(getattr(legacy, name), dates, args.repeat)
+        indexed_us = timeit(getattr(dp, name), dates, args.repeat)
+        print(f"{name}: 布尔掩码 {legacy_us:.0f}us, 日期索引 {indexed_us:.0f}us, "
+              f"加速 {legacy_us / indexed_us:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""对比一次性矩阵回撤引擎与原逐策略循环实现
+
+    python -m benchmarks.bench_drawdown --strategies 500 --years 10
+
+原实现对每个策略分别筛选、累乘并计算 expanding().max()，
+这里对全部策略各跑一遍并校验两者的最大回撤、当前回撤一致。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from src.drawdown import drawdown_summary
+from src.panel import StrategyPanel
+from .synthetic import write_market_value_csv
+
+
+def legacy_drawdowns(df: pd.DataFrame) -> pd.DataFrame:
+    """原 update_drawdown_analysis 中逐策略计算回撤的实现"""
+    rows = []
+    for strategy in df['Strategy'].unique():
+        strategy_data = df[df['Strategy'] == strategy]
+        nav = (1 + strategy_data['收益率']).cumprod()
+        peak = nav.expanding(min_periods=1).max()
+        drawdown = (nav - peak) / peak
+        rows.append({
+            'Strategy': strategy,
+            'max_drawdown': drawdown.min(),
+            'current_drawdown': drawdown.iloc[-1]
+        })
+    return pd.DataFrame(rows).set_index('Strategy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行")
+        df = DataProcessor(path, cache_dir=None).df
+
+    start = time.perf_counter()
+    panel = StrategyPanel()
+    panel.update(df)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = drawdown_summary(panel.returns, panel.dates, panel.strategies)
+    engine_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = legacy_drawdowns(df)
+    legacy_seconds = time.perf_counter() - start
+
+    actual = stats.loc[expected.index]
+    assert np.allclose(actual['max_drawdown'], expected['max_drawdown'])
+    assert np.allclose(actual['current_drawdown'], expected['current_drawdown'])
+    print(f"构建矩阵 {panel.returns.shape}: {build_seconds * 1000:.1f}ms")
+    print(f"矩阵引擎 {engine_seconds * 1000:.1f}ms, 原循环 {legacy_seconds:.3f}s, "
+          f"加速 {legacy_seconds / engine_seconds:.0f}x, 输出一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""对比向量化盘前/盘后对齐引擎与原逐行循环实现
+
+    python -m benchmarks.bench_ingest --strategies 500 --years 10
+
+原循环实现的耗时随行数平方增长，完整数据集上需要数小时，
+因此只在前 ``--legacy-days`` 个交易日上运行，并校验两者输出一致。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from .synthetic import write_market_value_csv
+
+
+def legacy_pivot(pre_open: pd.DataFrame, close: pd.DataFrame) -> pd.DataFrame:
+    """原 _load_and_process_data 中逐日期、逐策略拼接的实现"""
+    result = pd.DataFrame()
+    for date in pre_open['Date'].unique():
+        date_pre = pre_open[pre_open['Date'] == date]
+        date_close = close[close['Date'] == date]
+        
+        for strategy in date_pre['Strategy'].unique():
+            pre_value = date_pre[date_pre['Strategy'] == strategy]['MarketValue'].iloc[0]
+            try:
+                close_value = date_close[date_close['Strategy'] == strategy]['MarketValue'].iloc[0]
+                position_value = date_close[date_close['Strategy'] == strategy]['PositionValue'].iloc[0]
+                daily_return = (close_value - pre_value) / pre_value if pre_value != 0 else 0
+                
+                result = pd.concat([result, pd.DataFrame({
+                    'Date': [date],
+                    'Strategy': [strategy],
+                    'MarketValue_pre': [pre_value],
+                    'MarketValue_close': [close_value],
+                    'PositionValue': [position_value],
+                    '收益率': [daily_return]
+                })])
+            except IndexError:
+                print(f"警告: {date} 的策略 {strategy} 缺少盘后数据")
+    
+    result = result.reset_index(drop=True)
+    result['净值'] = result.groupby('Strategy')['收益率'].transform(
+        lambda x: (1 + x).cumprod()
+    )
+    return result
+
+
+def vectorized_pivot(pre_open: pd.DataFrame, close: pd.DataFrame) -> pd.DataFrame:
+    result, _ = DataProcessor._pivot_pre_close(pre_open, close)
+    result['净值'] = (1 + result['收益率']).groupby(result['Strategy']).cumprod()
+    return result
+
+
+def read_raw(path):
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df[df['Time'] == 'pre_open'], df[df['Time'] == 'close']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--legacy-days', type=int, default=20)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行")
+        pre_open, close = read_raw(path)
+    
+    start = time.perf_counter()
+    full = vectorized_pivot(pre_open, close)
+    vectorized_seconds = time.perf_counter() - start
+    print(f"向量化引擎(全量): {vectorized_seconds:.3f}s, {len(full)} 条记录")
+    
+    legacy_dates = pre_open['Date'].drop_duplicates().iloc[:args.legacy_days]
+    sub_pre = pre_open[pre_open['Date'].isin(legacy_dates)]
+    sub_close = close[close['Date'].isin(legacy_dates)]
+    
+    start = time.perf_counter()
+    expected = legacy_pivot(sub_pre, sub_close)
+    legacy_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    actual = vectorized_pivot(sub_pre, sub_close)
+    subset_seconds = time.perf_counter() - start
+    
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    print(f"前 {len(legacy_dates)} 个交易日 ({len(expected)} 条记录): "
+          f"原循环 {legacy_seconds:.3f}s, 向量化 {subset_seconds:.4f}s, "
+          f"加速 {legacy_seconds / subset_seconds:.0f}x, 输出一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""分块读取与整文件读取的峰值内存对比（tracemalloc）
+
+    python -m benchmarks.bench_ingest_memory --strategies 500 --years 10
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from .synthetic import write_market_value_csv
+
+
+def whole_file_load(path):
+    """整文件读取：所有列先以默认（object）类型读入，再转换和对齐"""
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['MarketValue'] = pd.to_numeric(df['MarketValue'], errors='coerce')
+    df['PositionValue'] = pd.to_numeric(df['PositionValue'], errors='coerce')
+    pre_open = df[df['Time'] == 'pre_open'].copy()
+    close = df[df['Time'] == 'close'].copy()
+    result, _ = DataProcessor._pivot_pre_close(pre_open, close)
+    result['净值'] = (1 + result['收益率']).groupby(result['Strategy']).cumprod()
+    return result
+
+
+def chunked_load(path):
+    """DataProcessor 当前的分块读取实现"""
+    processor = DataProcessor.__new__(DataProcessor)
+    with redirect_stdout(None):
+        return processor._load_and_process_data(path)
+
+
+def measure(func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+        
+        for name, func in [('整文件读取', whole_file_load), ('分块读取', chunked_load)]:
+            result, seconds, peak = measure(func, path)
+            final = result.memory_usage(deep=True).sum()
+            print(f"{name}: {seconds:.2f}s, 峰值内存 {peak / 1e6:.1f} MB, "
+                  f"结果 {final / 1e6:.1f} MB, 峰值/结果 {peak / final:.1f}x")
+            del result
+
+
+if __name__ == '__main__':
+    main()
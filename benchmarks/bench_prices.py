@@ -0,0 +1,61 @@
+"""对比在回调中直接调用行情接口与通过 PriceService 读取缓存行情的耗时
+
+    python -m benchmarks.bench_prices --codes 300 --latency 0.2 --threads 8
+
+行情源为带固定延迟的 FakePriceSource；并发部分模拟同一次日期变化触发的多个回调
+同时请求同一批股票代码，统计行情源实际被调用的次数。
+"""
+import argparse
+import threading
+import time
+
+from src.price_service import FakePriceSource, PriceService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--codes', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.2, help='行情源每次请求的延迟（秒）')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--samples', type=int, default=20)
+    args = parser.parse_args()
+
+    codes = [f'{600000 + n:06d}.SH' for n in range(args.codes)]
+
+    source = FakePriceSource(args.latency)
+    start = time.perf_counter()
+    for _ in range(args.samples):
+        source(codes)
+    direct_seconds = (time.perf_counter() - start) / args.samples
+
+    service = PriceService(FakePriceSource(args.latency), ttl=60, refresh_interval=30)
+    start = time.perf_counter()
+    service.get(codes)
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.samples):
+        service.get(codes)
+    warm_seconds = (time.perf_counter() - start) / args.samples
+    service.stop()
+
+    concurrent_source = FakePriceSource(args.latency)
+    service = PriceService(concurrent_source, ttl=60, refresh_interval=30)
+    threads = [threading.Thread(target=service.get, args=(codes,)) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    concurrent_seconds = time.perf_counter() - start
+    service.stop()
+
+    print(f"{args.codes} 个代码, 行情源延迟 {args.latency * 1000:.0f} ms")
+    print(f"直接调用行情源:       {direct_seconds * 1000:8.1f} ms/次")
+    print(f"PriceService 首次获取: {cold_seconds * 1000:8.1f} ms")
+    print(f"PriceService 命中缓存: {warm_seconds * 1000:8.3f} ms/次")
+    print(f"{args.threads} 个线程并发首次获取: {concurrent_seconds * 1000:8.1f} ms, "
+          f"行情源调用 {concurrent_source.calls} 次")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""增量读取（DataProcessor.refresh）与全量加载的耗时对比和结果校验
+
+    python -m benchmarks.bench_refresh --strategies 500 --years 10
+
+先写入除最后 ``--days`` 个交易日以外的数据并全量加载，再逐日追加并调用 refresh，
+最后与对完整文件全量加载的结果比较。``--zero-day`` 把追加前最后一天所有策略的收盘市值置零，
+使组合当天没有有效收益率（净值为 NaN），校验之后追加的日期从最后一个有效净值继续累计。
+``--missing-close`` 随机删去追加日期中若干条盘后记录，校验未配对盘前记录的清理。
+``--unterminated`` 使文件末尾的行始终没有换行符，校验全量加载读取该行、下次刷新重新读取时不重复添加。
+``--split`` 把每天的盘前和盘后记录分两次追加并各刷新一次，校验只有盘前记录的刷新。
+``--new-strategy`` 使一个策略在追加的日期中才第一次出现；``--backfill`` 在最后补写一个更早的交易日，
+校验新增策略列和重写已有日期时重建的矩阵和回撤状态。
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from src.nav_store import NavStore
+from src.panel import StrategyPanel
+from .synthetic import write_cubevalue, write_market_value_csv
+
+
+def check_same(actual: DataProcessor, expected: DataProcessor):
+    """增量读取后的明细、组合净值序列、各策略和风格的指标以及等待盘后数据的盘前记录与全量加载一致"""
+    pd.testing.assert_frame_equal(actual.df, expected.df)
+    pending = [p._pending_pre[['Date', 'Strategy']].astype(str).reset_index(drop=True) for p in (actual, expected)]
+    pd.testing.assert_frame_equal(*pending)
+    for name in NavStore.FIELDS:
+        a, b = getattr(actual.nav_store, name), getattr(expected.nav_store, name)
+        if a.dtype.kind == 'M':
+            assert np.array_equal(a, b), name
+        else:
+            assert np.allclose(a, b, equal_nan=True), name
+    for name in StrategyPanel.FIELDS:
+        a, b = getattr(actual.panel, name), getattr(expected.panel, name)
+        assert np.array_equal(a, b, equal_nan=a.dtype.kind == 'f'), name
+    for name in ('market_value', 'position_value', 'order'):
+        assert np.array_equal(getattr(actual.style_allocation, name), getattr(expected.style_allocation, name),
+                              equal_nan=True), name
+    pd.testing.assert_frame_equal(actual.strategy_drawdowns, expected.strategy_drawdowns)
+    pd.testing.assert_frame_equal(actual.first_style_drawdowns, expected.first_style_drawdowns)
+    pd.testing.assert_frame_equal(actual.style_nav, expected.style_nav)
+    pd.testing.assert_frame_equal(actual.display_df, expected.display_df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--zero-day', action='store_true')
+    parser.add_argument('--split', action='store_true')
+    parser.add_argument('--missing-close', type=int, default=0)
+    parser.add_argument('--unterminated', action='store_true')
+    parser.add_argument('--new-strategy', action='store_true')
+    parser.add_argument('--backfill', action='store_true')
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # DataProcessor 从当前目录读取 cubevalue.txt
+        os.chdir(tmp)
+        try:
+            write_cubevalue('cubevalue.txt')
+            write_market_value_csv('full.csv', args.strategies, args.years)
+            raw = pd.read_csv('full.csv')
+            dates = raw['Date'].unique()
+            appended = dates[-args.days:]
+            if args.zero_day:
+                raw.loc[(raw['Date'] == dates[-args.days - 1]) & (raw['Time'] == 'close'), 'MarketValue'] = 0.0
+            if args.missing_close:
+                close = raw.index[raw['Date'].isin(appended) & (raw['Time'] == 'close')]
+                raw = raw.drop(np.random.default_rng(0).choice(close, args.missing_close, replace=False))
+            if args.new_strategy:
+                newcomer = raw['Strategy'].unique()[-1]
+                raw = raw[(raw['Strategy'] != newcomer) | raw['Date'].isin(appended)]
+            withheld = dates[-args.days - 3:-args.days - 2] if args.backfill else []
+
+            path = 'portfolio_market_value.csv'
+
+            def append(rows, header=False):
+                text = rows.to_csv(index=False, header=header)
+                if args.unterminated:
+                    # 补上前一次末尾的换行符，这次写入的最后一行不带换行符
+                    text = ('' if header else '\n') + text.rstrip('\n')
+                with open(path, 'w' if header else 'a') as f:
+                    f.write(text)
+
+            initial = raw[~raw['Date'].isin(appended) & ~raw['Date'].isin(withheld)]
+            append(initial, header=True)
+            with redirect_stdout(None):
+                processor = DataProcessor(path, cache_dir=None)
+            # 全量加载读取了全部记录，包括末尾没有换行符的行
+            assert len(processor.df) == (initial.groupby(['Date', 'Strategy'])['Time'].nunique() == 2).sum()
+            timings = []
+            for date in appended:
+                day = raw[raw['Date'] == date]
+                if args.split:
+                    # 先只追加盘前记录，此时没有可对齐的新记录（上一次末尾没有换行符的行除外）
+                    append(day[day['Time'] == 'pre_open'])
+                    with redirect_stdout(None):
+                        count = processor.refresh()
+                    assert count == 0 or args.unterminated
+                    day = day[day['Time'] != 'pre_open']
+                append(day)
+                start = time.perf_counter()
+                with redirect_stdout(None):
+                    processor.refresh()
+                timings.append(time.perf_counter() - start)
+            if args.backfill:
+                append(raw[raw['Date'].isin(withheld)])
+                with redirect_stdout(None):
+                    processor.refresh()
+            if args.unterminated:
+                # 写完最后一行，增量读取到的内容与全量加载相同
+                with open(path, 'a') as f:
+                    f.write('\n')
+                with redirect_stdout(None):
+                    processor.refresh()
+
+            start = time.perf_counter()
+            with redirect_stdout(None):
+                full = DataProcessor(path, cache_dir=None)
+            full_seconds = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    check_same(processor, full)
+    print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, 逐日追加 {args.days} 个交易日"
+          f"{', 追加前一天收盘市值为零' if args.zero_day else ''}"
+          f"{', 盘前盘后分两次追加' if args.split else ''}"
+          f"{f', 缺少 {args.missing_close} 条盘后记录' if args.missing_close else ''}"
+          f"{', 末尾的行没有换行符' if args.unterminated else ''}"
+          f"{', 追加日期中出现新策略' if args.new_strategy else ''}"
+          f"{', 最后补写更早的交易日' if args.backfill else ''}")
+    print(f"全量加载: {full_seconds:.3f}s")
+    print(f"增量读取: 每天 {statistics.median(timings):.3f}s, 结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""对比图表序列化方式的耗时和数据量：Plotly 默认的 JSON 编码 vs typed array 编码（src/figure_json.py）
+
+    python -m benchmarks.bench_serialization --strategies 500 --years 10
+
+对 fig_nav（完整数据和降采样后的 Scattergl 版本）和 fig_total 分别测量 Dash 发送回调结果时
+的序列化耗时、JSON 字节数和 gzip 压缩后的字节数。安装了 orjson 时额外测量 orjson 编码。
+"""
+import argparse
+import base64
+import contextlib
+import gzip
+import io
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import plotly.io as pio
+from dash._utils import to_json
+
+from src import config
+from src.downsample import downsample_figure
+from src.figure_json import pack_figure
+from .synthetic import write_workspace
+
+try:
+    import orjson  # noqa: F401
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def timed(func, repeat: int):
+    """返回 (结果, 中位数耗时秒)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def check_round_trip(figure, packed: dict):
+    """typed array 解码后与原图表的 y 值一致"""
+    original = figure.data if hasattr(figure, 'data') else figure['data']
+    for trace, packed_trace in zip(original, packed['data']):
+        y = np.asarray(trace['y'], dtype=float)
+        spec = packed_trace['y']
+        if isinstance(spec, dict):
+            decoded = np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.float64)
+            assert np.array_equal(decoded, y, equal_nan=True), trace['name']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    original_styles = dict(config.STRATEGY_STYLES)
+    with tempfile.TemporaryDirectory() as workspace:
+        styles = write_workspace(workspace, args.strategies, args.years, n_holdings=5)
+        config.STRATEGY_STYLES.clear()
+        config.STRATEGY_STYLES.update(styles)
+        os.chdir(workspace)
+        try:
+            from src.chart_factory import ChartFactory
+            from src.data_processor import DataProcessor
+            with contextlib.redirect_stdout(io.StringIO()):
+                chart_factory = ChartFactory(DataProcessor('portfolio_market_value.csv', cache_dir=None))
+        finally:
+            os.chdir(cwd)
+            config.STRATEGY_STYLES.clear()
+            config.STRATEGY_STYLES.update(original_styles)
+
+    threshold = int(config.DOWNSAMPLE_DEFAULT_WIDTH * config.DOWNSAMPLE_POINTS_PER_PIXEL)
+    figures = {
+        'fig_nav': chart_factory.fig_nav,
+        'fig_nav[webgl]': downsample_figure(chart_factory.fig_nav, threshold),
+        'fig_total': chart_factory.fig_total,
+    }
+    paths = {
+        'plotly': lambda fig: to_json(fig),
+        'typed array': lambda fig: to_json(pack_figure(fig)),
+    }
+    if HAS_ORJSON:
+        paths['plotly+orjson'] = lambda fig: pio.to_json(fig, validate=False, engine='orjson')
+        paths['typed array+orjson'] = lambda fig: pio.to_json(pack_figure(fig), validate=False, engine='orjson')
+
+    print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, orjson: {'已安装' if HAS_ORJSON else '未安装'}")
+    print(f"{'图表':<18}{'编码方式':<22}{'耗时(ms)':>10}{'JSON(KB)':>12}{'gzip(KB)':>12}")
+    for name, figure in figures.items():
+        check_round_trip(figure, pack_figure(figure))
+        for path, encode in paths.items():
+            text, seconds = timed(lambda: encode(figure), args.repeat)
+            data = text.encode('utf-8')
+            print(f"{name:<18}{path:<22}{seconds * 1000:>10.1f}{len(data) / 1024:>12.1f}"
+                  f"{len(gzip.compress(data, 6)) / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""DataProcessor 冷启动与缓存热启动耗时对比
+
+    python -m benchmarks.bench_startup --strategies 500 --years 10
+
+- 无缓存: 不使用磁盘缓存，完整解析和计算
+- 冷启动: 缓存不存在，完整计算后写入缓存
+- 热启动: 源文件未变化，直接从缓存加载
+"""
+import argparse
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from .synthetic import write_cubevalue, write_market_value_csv
+
+
+def timed_init(path, cache_dir):
+    start = time.perf_counter()
+    with redirect_stdout(None):
+        processor = DataProcessor(path, cache_dir=cache_dir)
+    return time.perf_counter() - start, processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    args = parser.parse_args()
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # DataProcessor 从当前目录读取 cubevalue.txt
+        os.chdir(tmp)
+        try:
+            path = os.path.join(tmp, 'portfolio_market_value.csv')
+            rows = write_market_value_csv(path, args.strategies, args.years)
+            write_cubevalue(os.path.join(tmp, 'cubevalue.txt'))
+            print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行, "
+                  f"{os.path.getsize(path) / 1e6:.1f} MB")
+            cache_dir = os.path.join(tmp, '.cache')
+            
+            plain_seconds, _ = timed_init(path, None)
+            cold_seconds, cold = timed_init(path, cache_dir)
+            warm_seconds, warm = timed_init(path, cache_dir)
+        finally:
+            os.chdir(cwd)
+    
+    pd.testing.assert_frame_equal(warm.df, cold.df)
+    pd.testing.assert_series_equal(warm.daily_net_value, cold.daily_net_value, check_names=False)
+    pd.testing.assert_frame_equal(warm.csi300_data, cold.csi300_data, check_index_type=True)
+    pd.testing.assert_frame_equal(warm.display_df, cold.display_df, check_index_type=True)
+    pd.testing.assert_frame_equal(warm._pending_pre, cold._pending_pre, check_index_type=True)
+    print(f"无缓存: {plain_seconds:.3f}s")
+    print(f"冷启动(写缓存): {cold_seconds:.3f}s")
+    print(f"热启动(读缓存): {warm_seconds:.3f}s, 加速 {cold_seconds / warm_seconds:.1f}x, 结果一致")
+
+
+if __name__ == '__main__':
+    main()
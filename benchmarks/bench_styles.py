@@ -0,0 +1,86 @@
+"""对比风格净值的两种计算方式：逐风格筛选拼接后 groupby.apply vs 归属矩阵乘法
+
+    python -m benchmarks.bench_styles --strategies 500 --years 10
+
+合成策略随机分配 1~3 个风格，校验两者得到的风格净值一致。
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from src.drawdown import drawdown_matrices
+from src.styles import StyleIndex, style_returns
+from .synthetic import write_market_value_csv
+
+STYLES = ['ETF', '小市值', '白马股', '机会主义', '雪球', '果仁', '红利', '可转债']
+
+
+def legacy_style_nav(df: pd.DataFrame, strategy_styles: dict) -> pd.DataFrame:
+    """原 ChartFactory.init_figures 中计算风格净值的实现"""
+    style_data = []
+    all_styles = set()
+    for v in strategy_styles.values():
+        if 'styles' in v:
+            all_styles.update(v['styles'])
+    for style in all_styles:
+        style_strategies = [k for k, v in strategy_styles.items()
+                            if 'styles' in v and style in v['styles']]
+        if style_strategies:
+            style_data_temp = df[df['Strategy'].isin(style_strategies)].copy()
+            style_data_temp['风格'] = style
+            style_data.append(style_data_temp)
+
+    style_df = pd.concat(style_data)
+    style_grouped = style_df.groupby(['Date', '风格']).apply(
+        lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
+    ).reset_index(name='收益率')
+    style_grouped['净值'] = style_grouped.groupby('风格')['收益率'].transform(
+        lambda x: (1 + x).cumprod()
+    )
+    return style_grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strategies', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'portfolio_market_value.csv')
+        rows = write_market_value_csv(path, args.strategies, args.years)
+        print(f"合成数据: {args.strategies} 个策略 x {args.years} 年, {rows} 行")
+        dp = DataProcessor(path, cache_dir=None)
+
+    rng = np.random.default_rng(0)
+    strategy_styles = {
+        name: {'styles': list(rng.choice(STYLES, rng.integers(1, 4), replace=False))}
+        for name in dp.panel.strategies
+    }
+
+    start = time.perf_counter()
+    index = StyleIndex(strategy_styles)
+    incidence = StyleIndex.incidence(dp.panel.strategies, index.strategies_of)
+    returns, _ = style_returns(dp.panel.returns, dp.panel.market_value, incidence)
+    nav, _, _ = drawdown_matrices(returns)
+    matrix_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = legacy_style_nav(dp.df, strategy_styles)
+    legacy_seconds = time.perf_counter() - start
+
+    actual = pd.DataFrame(nav, index=pd.DatetimeIndex(dp.panel.dates, name='Date'),
+                          columns=list(index.strategies_of))
+    expected = expected.pivot(index='Date', columns='风格', values='净值')[actual.columns]
+    assert np.allclose(actual.to_numpy(), expected.to_numpy(), equal_nan=True)
+    print(f"{len(actual.columns)} 个风格: 矩阵乘法 {matrix_seconds * 1000:.1f}ms, "
+          f"原实现 {legacy_seconds:.3f}s, 加速 {legacy_seconds / matrix_seconds:.0f}x, 输出一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""在合成数据上测量数据处理、图表构建和 app.py 中每个回调函数的耗时
+
+    python -m benchmarks.run --strategies 100 --years 5 --holdings 30 --output results.json
+    python -m benchmarks.run --compare before.json after.json
+
+在临时目录中生成全部数据文件后切换到该目录运行，回调函数直接作为普通函数调用。
+默认使用 synthetic_stock_prices 作为行情源（--online 时使用 portfolio.get_stock_prices），
+使结果可重复。结果写入 JSON 文件，--compare 对比两次运行的结果。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(func, repeat: int) -> dict:
+    """运行 func repeat 次，返回每次耗时的统计（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'repeat': repeat,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings)
+    }
+
+
+def check_loaded(data_processor, path: str, output: str = ''):
+    """确认合成数据已完整加载
+
+    DataProcessor 读取失败时只打印错误并使用空数据，之后测得的是空数据上的耗时；
+    这里比较交易日数与数据文件一致，不一致时抛出异常并附上加载时的输出。
+    """
+    expected = pd.read_csv(path, usecols=['Date'])['Date'].nunique()
+    loaded = len(data_processor.nav_store)
+    if data_processor.df.empty or loaded != expected:
+        raise RuntimeError(f"合成数据未能完整加载: 应有 {expected} 个交易日，实际加载 {loaded} 个\n{output}")
+
+
+@contextlib.contextmanager
+def triggered_by(prop_id: str = None):
+    """模拟 Dash 回调上下文，使依赖 callback_context.triggered 的回调可以直接调用；prop_id 为 None 时模拟页面加载时的首次调用"""
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+
+    triggered_inputs = [] if prop_id is None else [{'prop_id': prop_id, 'value': 1}]
+    token = context_value.set(AttributeDict(triggered_inputs=triggered_inputs))
+    try:
+        yield
+    finally:
+        context_value.reset(token)
+
+
+def callback_cases(app, latest: str, middle: str) -> dict:
+    """app.py 中每个回调函数及其调用参数"""
+    style_rows, _ = app.update_style_drawdown_table(latest, 'style-drawdown-tab', None)
+    strategy_rows = app.data_processor.display_df.to_dict('records')
+
+    def with_context(prop_id, func, *args):
+        def call():
+            with triggered_by(prop_id):
+                func(*args)
+        return call
+
+    return {
+        'refresh_data': lambda: app.refresh_data(1, app.data_processor.version),
+        'update_charts': lambda: app.update_charts(latest),
+        'update_charts[middle]': lambda: app.update_charts(middle),
+        'update_style_pie_chart': lambda: app.update_style_pie_chart(latest, 'style-pie-tab', None),
+        'update_pie_chart': lambda: app.update_pie_chart(latest),
+        'kpi_store': app.data_processor.nav_store.kpi_arrays,
+        'toggle_daily_details_modal': with_context(
+            'profit-loss-header.n_clicks', app.toggle_daily_details_modal, 1, None, latest),
+        'toggle_nav_contribution_modal': with_context(
+            'net-value-header.n_clicks', app.toggle_nav_contribution_modal, 1, None, middle),
+        'update_style_drawdown_table': lambda: app.update_style_drawdown_table(latest, 'style-drawdown-tab', None),
+        'update_style_position_pie_chart': lambda: app.update_style_position_pie_chart(
+            latest, 'style-position-pie-tab', None),
+        'update_holdings_table': lambda: app.update_holdings_table(latest, 'holdings-tab', None),
+        'update_holdings_compare_table': lambda: app.update_holdings_compare_table(
+            latest, 'holdings-compare-tab', None),
+        # 选项卡未显示时回调只比较版本标识
+        'update_holdings_table[hidden]': lambda: app.update_holdings_table(latest, 'strategy-drawdown-tab', None),
+        'update_style_drawdown_table[hidden]': lambda: app.update_style_drawdown_table(
+            latest, 'strategy-drawdown-tab', None),
+        'show_style_details': lambda: app.show_style_details({'row': 0}, style_rows),
+        'show_strategy_holdings': with_context(
+            'strategy-drawdown-table.active_cell', app.show_strategy_holdings,
+            {'row': 0}, None, strategy_rows),
+        # 页面加载时按窗口宽度发送降采样的图表；缩放后按可见范围重新降采样；双击还原时使用已降采样的全范围图表
+        'update_nav_chart_zoom[initial]': with_context(
+            'screen-width.data', app.update_nav_chart_zoom, None, 1920),
+        'update_nav_chart_zoom': with_context(
+            'nav-chart.relayoutData', app.update_nav_chart_zoom,
+            {'xaxis.range[0]': middle, 'xaxis.range[1]': latest}, 1920),
+        'update_nav_chart_zoom[autorange]': with_context(
+            'nav-chart.relayoutData', app.update_nav_chart_zoom, {'xaxis.autorange': True}, 1920),
+        'update_style_nav_chart_zoom': with_context(
+            'style-nav-chart.relayoutData', app.update_style_nav_chart_zoom,
+            {'xaxis.range[0]': middle, 'xaxis.range[1]': latest}, 1920),
+        # 页面加载时发送完整图表，之后切换日期只发送坐标轴范围
+        'update_total_chart[initial]': with_context(None, app.update_total_chart, latest),
+        'update_total_chart': with_context('date-picker.date', app.update_total_chart, latest),
+        'update_total_chart[middle]': with_context('date-picker.date', app.update_total_chart, middle),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ''
+
+
+def run(args) -> dict:
+    from src import config
+
+    results = {}
+    cache_stats = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        styles = synthetic.write_workspace(workspace, args.strategies, args.years, args.holdings, args.seed)
+        # DataProcessor、ChartFactory 与 app 都引用 config.STRATEGY_STYLES，原地替换为合成策略的配置
+        original_styles = dict(config.STRATEGY_STYLES)
+        config.STRATEGY_STYLES.clear()
+        config.STRATEGY_STYLES.update(styles)
+        cwd = os.getcwd()
+        os.chdir(workspace)
+        try:
+            from src.data_processor import DataProcessor
+            from src.chart_factory import ChartFactory
+
+            path = 'portfolio_market_value.csv'
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                data_processor = DataProcessor(path, cache_dir=None)
+                chart_factory = ChartFactory(data_processor)
+            check_loaded(data_processor, path, output.getvalue())
+
+            results['DataProcessor.__init__'] = measure(lambda: DataProcessor(path, cache_dir=None), args.repeat)
+            results['DataProcessor.__init__[cold cache]'] = measure(
+                lambda: DataProcessor(path, cache_dir=tempfile.mkdtemp(dir=workspace)), args.repeat)
+            with contextlib.redirect_stdout(io.StringIO()):
+                DataProcessor(path, cache_dir='.cache')
+            results['DataProcessor.__init__[warm cache]'] = measure(
+                lambda: DataProcessor(path, cache_dir='.cache'), args.repeat)
+            results['ChartFactory.init_figures'] = measure(chart_factory.init_figures, args.repeat)
+            results['DataProcessor.get_style_drawdowns'] = measure(data_processor.get_style_drawdowns, args.repeat)
+            latest_date = data_processor.nav_store.dates[-1]
+            results['StyleAllocation.on'] = measure(
+                lambda: data_processor.style_allocation.on(latest_date), args.repeat)
+            results['ChartFactory.create_style_pie_chart'] = measure(chart_factory.create_style_pie_chart, args.repeat)
+
+            sys.path.insert(0, ROOT)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                import app
+            seconds = time.perf_counter() - start
+            check_loaded(app.data_processor, path, output.getvalue())
+            results['import app'] = {'repeat': 1, 'min': seconds, 'median': seconds, 'mean': seconds}
+            client = app.app.server.test_client()
+            results['app.GET /_dash-layout'] = measure(lambda: client.get('/_dash-layout'), args.repeat)
+            # 持仓仓库按 app.py 所在目录查找 holdings/，指向合成数据目录
+            app.holdings_repository.directory = os.path.join(workspace, 'holdings')
+            if not args.online:
+                app.price_service.source = synthetic.synthetic_stock_prices
+
+            dates = app.data_processor.nav_store.dates
+            latest = str(pd.Timestamp(dates[-1]).date())
+            middle = str(pd.Timestamp(dates[len(dates) // 2]).date())
+            for name, func in callback_cases(app, latest, middle).items():
+                results[f'app.{name}'] = measure(func, args.repeat)
+            cache_stats['figure_cache'] = app.figure_cache.stats()
+            cache_stats['price_service'] = app.price_service.stats()
+        finally:
+            os.chdir(cwd)
+            config.STRATEGY_STYLES.clear()
+            config.STRATEGY_STYLES.update(original_styles)
+
+    return {
+        'meta': {
+            'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'params': {
+                'strategies': args.strategies,
+                'years': args.years,
+                'holdings': args.holdings,
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'online': args.online
+            },
+            'caches': cache_stats
+        },
+        'results': results
+    }
+
+
+def compare(before_path: str, after_path: str):
+    """按名称对比两次运行的中位数耗时"""
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)['results']
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)['results']
+    print(f"{'名称':<45}{'之前(ms)':>12}{'之后(ms)':>12}{'倍数':>10}")
+    for name in sorted(set(before) | set(after)):
+        old = before.get(name, {}).get('median')
+        new = after.get(name, {}).get('median')
+        ratio = f"{old / new:.2f}x" if old and new else '-'
+        old_text = f"{old * 1000:.1f}" if old is not None else '-'
+        new_text = f"{new * 1000:.1f}" if new is not None else '-'
+        print(f"{name:<45}{old_text:>12}{new_text:>12}{ratio:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strategies', type=int, default=100)
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--holdings', type=int, default=30, help='每个策略的持仓股票数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--online', action='store_true', help='使用 portfolio.get_stock_prices 获取实时行情')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    for name, stats in report['results'].items():
+        print(f"{name:<45}{stats['median'] * 1000:>12.1f} ms")
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
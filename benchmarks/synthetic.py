@@ -0,0 +1,198 @@
+"""合成测试数据生成器"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.price_service import FakePriceSource
+
+STYLES = ['ETF', '小市值', '白马股', '机会主义', '红利', '可转债']
+
+# holdings.tsv 的列，与券商导出的持仓文件一致
+HOLDINGS_TSV_COLUMNS = [
+    '证券公司', '资金账号', '账号名称', '账号是否启用', '账号备注', '市场代码', '市场名称',
+    '证券代码', '证券名称', '当前拥股', '持仓成本', '成本价', '盈亏', '开仓均价', '市值',
+    '股东账号', '冻结数量', '可用数量', '在途股份', '盈亏比例', '最新价', '到期日',
+    '非流通股', 'ETF申赎可用量', '状态', '当日涨幅'
+]
+
+
+def write_market_value_csv(path, n_strategies=500, years=10, seed=0, strategies=None):
+    """生成 portfolio_market_value.csv 格式的盘前/盘后市值文件
+
+    每个交易日先写入所有策略的 pre_open 记录，再写入 close 记录，
+    与实际数据文件的追加顺序一致。strategies 为策略名列表，
+    默认为 S0000 起的编号。返回写入的行数。
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2015-01-05', periods=int(years * 244))
+    if strategies is None:
+        strategies = [f'S{i:04d}' for i in range(n_strategies)]
+    strategies = np.array(strategies)
+    n_strategies = len(strategies)
+    
+    n_days = len(dates)
+    daily_returns = rng.normal(0.0004, 0.012, size=(n_days, n_strategies))
+    initial = rng.uniform(1e4, 1e6, size=n_strategies)
+    close_values = np.round(initial * np.cumprod(1 + daily_returns, axis=0), 2)
+    pre_values = np.vstack([initial, close_values[:-1]])
+    position_values = np.round(close_values * rng.uniform(0, 1, size=(n_days, n_strategies)), 2)
+    
+    date_strings = np.repeat(dates.strftime('%Y-%m-%d').to_numpy(), n_strategies)
+    strategy_column = np.tile(strategies, n_days)
+    pre = pd.DataFrame({
+        'Date': date_strings,
+        'MarketValue': pre_values.ravel(),
+        'PositionValue': position_values.ravel(),
+        'Strategy': strategy_column,
+        'Time': 'pre_open'
+    })
+    close = pd.DataFrame({
+        'Date': date_strings,
+        'MarketValue': close_values.ravel(),
+        'PositionValue': position_values.ravel(),
+        'Strategy': strategy_column,
+        'Time': 'close'
+    })
+    # 按 日期 -> 盘前/盘后 交错排列
+    order = np.argsort(np.concatenate([
+        np.arange(n_days).repeat(n_strategies) * 2,
+        np.arange(n_days).repeat(n_strategies) * 2 + 1
+    ]), kind='stable')
+    frame = pd.concat([pre, close], ignore_index=True).iloc[order]
+    frame.to_csv(path, index=False)
+    return len(frame)
+
+
+def write_cubevalue(path, start='2014-11-26', years=11, seed=0, create_times=None):
+    """生成 cubevalue.txt 格式的基准净值文件
+
+    包含 CSI300 的净值序列，create_times 为 策略 -> 创建日期，
+    用于生成雪球组合的创建时间记录。
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=int(years * 244))
+    values = np.round(3000 * np.cumprod(1 + rng.normal(0.0002, 0.013, size=len(dates))), 3)
+    data = {
+        'CSI300': {
+            'market': 'cn',
+            'nav_series': dict(zip(dates.strftime('%Y-%m-%d'), values.tolist())),
+            'create_time': start,
+            'annualized_return': 0.0,
+            'max_drawdown': 0.0,
+            'max_days_to_new_high': 0
+        }
+    }
+    for strategy, create_time in (create_times or {}).items():
+        data[strategy] = {'market': 'cn', 'create_time': create_time}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def strategy_names(n_strategies):
+    """按 雪球 / 果仁 / 聚宽 轮流生成与实际命名规则一致的策略名"""
+    names = []
+    for i in range(n_strategies):
+        if i % 3 == 0:
+            names.append(f'ZH{i:07d}')
+        elif i % 3 == 1:
+            names.append(f'8844.R.{i:06d}')
+        else:
+            names.append(f'JQ{i:04d}')
+    return names
+
+
+def stock_universe(n_stocks):
+    """生成 n_stocks 只股票的 (带交易所后缀的代码, 名称)"""
+    stocks = []
+    for i in range(n_stocks):
+        if i % 2 == 0:
+            stocks.append((f'{600000 + i:06d}.SH', f'沪股{i:04d}'))
+        else:
+            stocks.append((f'{1 + i:06d}.SZ', f'深股{i:04d}'))
+    return stocks
+
+
+def strategy_styles(strategies, seed=0):
+    """为策略生成 STRATEGY_STYLES 格式的别名和风格配置"""
+    rng = np.random.default_rng(seed)
+    config = {}
+    for i, name in enumerate(strategies):
+        if name.startswith('ZH'):
+            styles = ['雪球']
+        elif name.startswith('8844.R.'):
+            styles = ['果仁']
+        else:
+            styles = []
+        styles += list(rng.choice(STYLES, rng.integers(1, 3), replace=False))
+        config[name] = {'alias': f'策略{i:04d}', 'styles': styles}
+    return config
+
+
+def write_holdings(directory, strategies, n_holdings=30, n_stocks=None, seed=0):
+    """生成 holdings/*.txt 各平台的策略持仓和账户实际持仓 holdings.tsv
+
+    每个策略从股票池中随机持有 n_holdings 只股票；实际持仓在策略持仓合计的基础上
+    随机改动一部分，使持仓对比有差异可显示。返回股票池。
+    """
+    rng = np.random.default_rng(seed)
+    stocks = stock_universe(n_stocks or max(n_holdings * 4, 100))
+    files = {'xueqiu.txt': {}, 'guoren.txt': {}, 'joinquant.txt': {}}
+    total = {}
+    for i, name in enumerate(strategies):
+        picks = rng.choice(len(stocks), min(n_holdings, len(stocks)), replace=False)
+        holding = {stocks[j][0]: int(rng.integers(1, 100)) * 100 for j in picks}
+        for code, amount in holding.items():
+            total[code] = total.get(code, 0) + amount
+        account = {'holding': holding, 'cash': round(float(rng.uniform(0, 1e4)), 2)}
+        if name.startswith('ZH'):
+            files['xueqiu.txt'][name] = {**account, 'rb_id': i}
+        elif name.startswith('8844.R.'):
+            files['guoren.txt'][name] = {**account, 'up_tim': '202504291450'}
+        else:
+            files['joinquant.txt'][name] = {**account, 'up_tim': '202504291530'}
+
+    holdings_dir = os.path.join(directory, 'holdings')
+    os.makedirs(holdings_dir, exist_ok=True)
+    for file_name, data in files.items():
+        with open(os.path.join(holdings_dir, file_name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    names = dict(stocks)
+    rows = []
+    for code, amount in total.items():
+        if rng.random() < 0.1:
+            amount += int(rng.integers(-5, 5)) * 100
+        row = dict.fromkeys(HOLDINGS_TSV_COLUMNS, '')
+        row.update({'证券代码': code.split('.')[0], '证券名称': names[code], '当前拥股': str(max(amount, 0))})
+        rows.append(row)
+    pd.DataFrame(rows, columns=HOLDINGS_TSV_COLUMNS).to_csv(
+        os.path.join(directory, 'holdings.tsv'), sep='\t', index=False
+    )
+    return stocks
+
+
+def write_workspace(directory, n_strategies=100, years=5, n_holdings=30, seed=0):
+    """在 directory 下生成运行 app.py 所需的全部数据文件
+
+    包括 portfolio_market_value.csv、cubevalue.txt、holdings/*.txt、
+    holdings.tsv 和 cookies.txt。返回与之对应的 STRATEGY_STYLES 配置。
+    """
+    strategies = strategy_names(n_strategies)
+    write_market_value_csv(os.path.join(directory, 'portfolio_market_value.csv'),
+                           years=years, seed=seed, strategies=strategies)
+    # 一半雪球组合创建不满三年，归入"三年以内"风格
+    recent = (pd.Timestamp.now() - pd.Timedelta(days=365)).strftime('%Y-%m-%d')
+    create_times = {name: recent if i % 2 else '2015-01-05'
+                    for i, name in enumerate(s for s in strategies if s.startswith('ZH'))}
+    write_cubevalue(os.path.join(directory, 'cubevalue.txt'), seed=seed, create_times=create_times)
+    write_holdings(directory, strategies, n_holdings, seed=seed)
+    with open(os.path.join(directory, 'cookies.txt'), 'w', encoding='utf-8') as f:
+        json.dump({'xueqiu': 'synthetic'}, f)
+    return strategy_styles(strategies, seed=seed)
+
+
+def synthetic_stock_prices(codes, cookie=None):
+    """与 portfolio.get_stock_prices 返回格式相同的确定性行情，用于离线基准测试"""
+    return FakePriceSource()(codes)
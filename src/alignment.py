@@ -0,0 +1,55 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .nav_store import to_datetime64
+
+
+def asof_indices(dates: np.ndarray, reference_dates: np.ndarray,
+                 tolerance: Optional[np.timedelta64] = None) -> np.ndarray:
+    """dates 中每个日期在 reference_dates（升序）中不晚于它的最近日期的位置
+
+    与 pandas.merge_asof(direction='backward') 相同；没有这样的日期，或相差超过 tolerance 时为 -1。
+    """
+    positions = np.searchsorted(reference_dates, dates, side='right') - 1
+    if tolerance is not None and len(reference_dates):
+        stale = dates - reference_dates[np.maximum(positions, 0)] > tolerance
+        positions[stale] = -1
+    return positions
+
+
+class AlignedSeries:
+    """组合净值与基准净值在组合的日期索引上对齐后的序列
+
+    基准的交易日历与组合不一致时，每个组合日期取不晚于它的最近一个基准日期的净值
+    （相差不超过 tolerance），没有对应基准值的日期为 NaN。
+    对齐和超额收益（组合净值 - 基准净值）在构造时一次算出，之后按日期范围只取切片。
+    """
+
+    def __init__(self, dates: np.ndarray, portfolio: np.ndarray,
+                 benchmark_dates: np.ndarray, benchmark_values: np.ndarray,
+                 tolerance: Optional[np.timedelta64] = None):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.portfolio = np.asarray(portfolio, dtype=float)
+        positions = asof_indices(self.dates, np.asarray(benchmark_dates, dtype='datetime64[ns]'), tolerance)
+        benchmark_values = np.asarray(benchmark_values, dtype=float)
+        self.benchmark = np.full(len(self.dates), np.nan)
+        matched = positions >= 0
+        self.benchmark[matched] = benchmark_values[positions[matched]]
+        self.excess = self.portfolio - self.benchmark
+        self.valid = ~np.isnan(self.benchmark)  # 有基准值的日期
+
+    def __len__(self):
+        return len(self.dates)
+
+    def window(self, start=None, end=None) -> slice:
+        """start 到 end（含）之间的日期所在的切片，None 表示不限"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, to_datetime64(start), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, to_datetime64(end), side='right'))
+        return slice(lo, hi)
+
+    def excess_series(self, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """start 到 end 之间有基准值的日期及其超额收益"""
+        window = self.window(start, end)
+        valid = self.valid[window]
+        return self.dates[window][valid], self.excess[window][valid]
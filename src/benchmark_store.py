@@ -0,0 +1,92 @@
+import json
+import os
+from typing import Dict, FrozenSet, Tuple
+
+import numpy as np
+import pandas as pd
+
+META_FIELDS = ('create_time', 'annualized_return', 'max_drawdown', 'max_days_to_new_high')
+
+
+class BenchmarkStore:
+    """cubevalue.txt 中各组合（含 CSI300 指数）的净值序列和元数据，文件只解析一次
+
+    - series(name): 按日期排序的 (datetime64 日期数组, 净值数组)
+    - metadata: 名称 -> create_time、annualized_return、max_drawdown、max_days_to_new_high 中存在的字段
+    - created_within(days): 创建不满 days 天的组合，缓存到成员下一次变化的时刻
+    文件被修改后调用 reload_if_changed() 重新解析。
+    """
+
+    def __init__(self, path: str = 'cubevalue.txt'):
+        self.path = path
+        self.metadata = {}
+        self._series = {}
+        self._cohorts = {}  # 天数 -> (组合名称集合, 计算时刻, 成员下一次变化的时刻)
+        self._stat = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        """文件的修改时间或大小变化时重新解析，返回是否重新解析"""
+        try:
+            stat = os.stat(self.path)
+            key = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            print(f"读取 {self.path} 时出错: {str(e)}")
+            key = None
+        if key == self._stat:
+            return False
+        self._stat = key
+        self._load()
+        return True
+
+    def _load(self):
+        self.metadata, self._series, self._cohorts = {}, {}, {}
+        if self._stat is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"读取 {self.path} 时出错: {str(e)}")
+            return
+
+        for name, info in data.items():
+            if not isinstance(info, dict):
+                continue
+            self.metadata[name] = {field: info[field] for field in META_FIELDS if field in info}
+            nav_series = info.get('nav_series')
+            if not nav_series:
+                continue
+            try:
+                dates = pd.to_datetime(list(nav_series.keys())).to_numpy()
+                values = np.asarray(list(nav_series.values()), dtype=float)
+            except Exception as e:
+                print(f"解析 {name} 的净值序列时出错: {str(e)}")
+                continue
+            order = np.argsort(dates, kind='stable')
+            self._series[name] = (dates[order], values[order])
+
+    def series(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """按日期排序的日期和净值数组，没有该组合时为空数组"""
+        return self._series.get(name, (np.array([], dtype='datetime64[ns]'), np.array([], dtype=float)))
+
+    def create_times(self) -> Dict[str, str]:
+        """组合 -> 创建时间"""
+        return {name: meta['create_time'] for name, meta in self.metadata.items() if 'create_time' in meta}
+
+    def created_within(self, days: int, now=None) -> FrozenSet[str]:
+        """创建时间距 now（默认为当前时间）不超过 days 天的组合，天数按 (now - 创建时间).days 计算
+
+        组合只在创建满 days + 1 天的时刻离开该集合，结果缓存到下一个这样的时刻为止。
+        """
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        cached = self._cohorts.get(days)
+        if cached is not None and cached[1] <= now < cached[2]:
+            return cached[0]
+        # (now - 创建时间).days <= days 等价于 now < 创建时间 + (days + 1) 天
+        expires = {name: pd.Timestamp(create_time) + pd.Timedelta(days=days + 1)
+                   for name, create_time in self.create_times().items()}
+        cohort = frozenset(name for name, expire in expires.items() if now < expire)
+        next_change = min((expire for expire in expires.values() if expire > now), default=pd.Timestamp.max)
+        self._cohorts[days] = (cohort, now, next_change)
+        return cohort
@@ -1,224 +1,346 @@
+import threading
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from .config import COLORS, CHART_LAYOUT, STRATEGY_STYLES  # 添加 STRATEGY_STYLES 导入
+from .config import CHART_RENDER_MODE, DOWNSAMPLE_DEFAULT_WIDTH, DOWNSAMPLE_POINTS_PER_PIXEL
+from .config import DOWNSAMPLE_WIDTH_BUCKETS, RENDERED_FIGURE_CACHE_SIZE
+from .downsample import downsample_figure
+from .figure_json import pack_figure
+from .lru import LRUCache
 
 class ChartFactory:
-    """图表工厂类，用于创建和管理所有图表"""
+    """图表工厂类，用于创建和管理所有图表
+
+    fig_returns、fig_pie、fig_style_nav、fig_nav 和 fig_total 在第一次访问时才创建，
+    并按数据版本号缓存，数据变化后再次访问时重新创建。warmup() 在后台线程中提前创建所有图表。
+    """
+    
+    FIGURES = ('fig_returns', 'fig_pie', 'fig_style_nav', 'fig_nav', 'fig_total')
     
     def __init__(self, data_processor=None):
-        """初始化图表工厂，创建所有初始图表"""
+        """初始化图表工厂，图表在第一次访问时创建"""
         self.data_processor = data_processor
         self.CHART_LAYOUT = CHART_LAYOUT
         self.STRATEGY_STYLES = STRATEGY_STYLES  # 保存为实例变量
         
-        # 创建初始图表
-        if data_processor is not None:
-            self.init_figures()
-        else:
+        self._figures = {}  # 图表名称 -> (数据版本号, 图表)
+        self._locks = {name: threading.Lock() for name in self.FIGURES}
+        self._total_extents = []
+        self._rendered = LRUCache(RENDERED_FIGURE_CACHE_SIZE)  # (图表名称, 点数, 数据版本号) -> (图表, 发送版本)
+        self._rendered_version = None
+        self._rendered_lock = threading.Lock()
+        self._warmup_version = None
+        self._warmup_started = False
+        self._warmup_lock = threading.Lock()
+        if data_processor is None:
             self.create_empty_figures()
     
+    def _data_version(self):
+        return self.data_processor.version if self.data_processor is not None else None
+    
+    def _figure(self, name: str) -> go.Figure:
+        """当前数据版本的图表，尚未创建时创建；同一图表同时只有一个线程在创建"""
+        with self._locks[name]:
+            version = self._data_version()
+            cached = self._figures.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            try:
+                fig = getattr(self, '_build_' + name)()
+            except Exception as e:
+                print(f"创建图表时出错: {str(e)}")
+                fig = self.empty_figure()
+                if name == 'fig_total':
+                    self._total_extents = []
+            self._figures[name] = (version, fig)
+            return fig
+    
+    fig_returns = property(lambda self: self._figure('fig_returns'))
+    fig_pie = property(lambda self: self._figure('fig_pie'))
+    fig_style_nav = property(lambda self: self._figure('fig_style_nav'))
+    fig_nav = property(lambda self: self._figure('fig_nav'))
+    fig_total = property(lambda self: self._figure('fig_total'))
+    
     def init_figures(self):
-        """初始化所有图表"""
-        try:
-            # 获取最新日期数据并创建完整的副本
-            latest_date = self.data_processor.df['Date'].max()
-            latest_data = self.data_processor.df[self.data_processor.df['Date'] == latest_date].copy()  # 创建完整副本
-            
-            # 1. 收益率排名图（使用别名）
-            latest_data.loc[:, 'Strategy_Alias'] = latest_data['Strategy'].map(self.data_processor.get_strategy_alias)
-            latest_returns = latest_data.sort_values('收益率', ascending=False)
-            top_5 = latest_returns.head()
-            bottom_5 = latest_returns.tail()
-            
-            self.fig_returns = go.Figure()
-            self.fig_returns.add_trace(go.Bar(
-                x=top_5['Strategy_Alias'],
-                y=top_5['收益率'],
-                marker_color='#ff0000'
-            ))
-            self.fig_returns.add_trace(go.Bar(
-                x=bottom_5['Strategy_Alias'],
-                y=bottom_5['收益率'],
-                marker_color='#00ff00'
-            ))
-            self.fig_returns.update_layout(**self.CHART_LAYOUT, showlegend=False)
-            
-            # 2. 市值占比饼图（使用别名）
-            self.fig_pie = self.create_pie_chart(
-                latest_data,
-                values='MarketValue_close',
-                names='Strategy_Alias'
-            )
-            
-            # 3. 风格净值趋势图
-            style_data = []
-            # 从 STRATEGY_STYLES 中获取风格列表
-            all_styles = set()
-            for v in self.STRATEGY_STYLES.values():
-                if 'styles' in v:
-                    all_styles.update(v['styles'])
-            for style in all_styles:
-                style_strategies = [k for k, v in self.STRATEGY_STYLES.items() 
-                                  if 'styles' in v and style in v['styles']]
-                if style_strategies:
-                    style_data_temp = self.data_processor.df[
-                        self.data_processor.df['Strategy'].isin(style_strategies)
-                    ].copy()
-                    style_data_temp['风格'] = style
-                    style_data.append(style_data_temp)
-            
-            if style_data:
-                style_df = pd.concat(style_data)
-                style_grouped = style_df.groupby(['Date', '风格']).apply(
-                    lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-                ).reset_index(name='收益率')
-                style_grouped['净值'] = style_grouped.groupby('风格')['收益率'].transform(
-                    lambda x: (1 + x).cumprod()
-                )
-                
-                self.fig_style_nav = px.line(
-                    style_grouped,
-                    x='Date',
-                    y='净值',
-                    color='风格'
-                )
-                # 设置每个风格线条的悬停模板，不显示日期
-                for trace in self.fig_style_nav.data:
-                    trace.hovertemplate = '%{fullData.name}: %{y:.4f}<extra></extra>'
-                
-                self.fig_style_nav.update_layout(**self.CHART_LAYOUT, showlegend=False)
-                # 设置风格净值趋势图的交互模式为x轴统一显示
-                self.fig_style_nav.update_layout(hovermode='x unified')
-            else:
-                self.fig_style_nav = go.Figure()
-                self.fig_style_nav.update_layout(**self.CHART_LAYOUT)
-            
-            # 4. 策略净值趋势图
-            nav_data = self.data_processor.df.copy()
-            nav_data['Strategy_Alias'] = nav_data['Strategy'].map(self.data_processor.get_strategy_alias)
-            self.fig_nav = px.line(
-                nav_data,
+        """立即重新创建所有图表"""
+        self._figures = {}
+        for name in self.FIGURES:
+            self._figure(name)
+    
+    def warmup(self) -> Optional[threading.Thread]:
+        """在后台线程中创建当前数据版本的所有图表和净值趋势图的发送版本，已在预热时不重复启动"""
+        with self._warmup_lock:
+            version = self._data_version()
+            if self._warmup_started and version == self._warmup_version:
+                return None
+            self._warmup_started = True
+            self._warmup_version = version
+            thread = threading.Thread(target=self._warmup, name='chart-warmup', daemon=True)
+            thread.start()
+            return thread
+    
+    def _warmup(self):
+        for name in self.FIGURES:
+            self._figure(name)
+        for name in ('fig_nav', 'fig_style_nav'):
+            self.render_nav_chart(name)
+    
+    def _build_fig_returns(self) -> go.Figure:
+        """最新日期收益率最高和最低 5 个策略的柱状图"""
+        # 获取最新日期数据并创建完整的副本
+        latest_data = self.data_processor.rows_on(self.data_processor.date_index.last()).copy()  # 创建完整副本
+        
+        # 使用别名
+        latest_data.loc[:, 'Strategy_Alias'] = latest_data['Strategy'].map(self.data_processor.get_strategy_alias)
+        latest_returns = latest_data.sort_values('收益率', ascending=False)
+        top_5 = latest_returns.head()
+        bottom_5 = latest_returns.tail()
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=top_5['Strategy_Alias'],
+            y=top_5['收益率'],
+            marker_color='#ff0000'
+        ))
+        fig.add_trace(go.Bar(
+            x=bottom_5['Strategy_Alias'],
+            y=bottom_5['收益率'],
+            marker_color='#00ff00'
+        ))
+        fig.update_layout(**self.CHART_LAYOUT, showlegend=False)
+        return fig
+    
+    def _build_fig_pie(self) -> go.Figure:
+        """最新日期的策略市值占比饼图"""
+        latest_data = self.data_processor.rows_on(self.data_processor.date_index.last()).copy()
+        latest_data.loc[:, 'Strategy_Alias'] = latest_data['Strategy'].map(self.data_processor.get_strategy_alias)
+        return self.create_pie_chart(
+            latest_data,
+            values='MarketValue_close',
+            names='Strategy_Alias'
+        )
+    
+    def _build_fig_style_nav(self) -> go.Figure:
+        """风格净值趋势图，含沪深300基准线"""
+        style_grouped = self.data_processor.get_style_nav()
+        style_data = not style_grouped.empty
+        
+        if style_data:
+            fig = px.line(
+                style_grouped,
                 x='Date',
                 y='净值',
-                color='Strategy_Alias'
+                color='风格'
             )
-            self.fig_nav.update_layout(**self.CHART_LAYOUT, showlegend=False)
+            # 设置每个风格线条的悬停模板，不显示日期
+            for trace in fig.data:
+                trace.hovertemplate = '%{fullData.name}: %{y:.4f}<extra></extra>'
             
-            # 5. 总净值趋势图
-            total_returns = self.data_processor.df.groupby('Date').apply(
-                lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-            )
-            total_nav = pd.DataFrame({
-                'Date': total_returns.index,
-                '总收益率': (1 + total_returns).cumprod() - 1  # 转换为收益率格式（净值-1）
-            }).reset_index(drop=True)  # 重置索引，确保Date只作为列存在
-            self.fig_total = px.line(total_nav, x='Date', y='总收益率')
-            # 设置总收益率的悬停模板，不显示日期
-            for trace in self.fig_total.data:
-                trace.hovertemplate = '总收益率: %{y:.2%}<extra></extra>'  # 更新为百分比格式
+            fig.update_layout(**self.CHART_LAYOUT, showlegend=False, xaxis_title='', yaxis_title='')
+            # 设置风格净值趋势图的交互模式为x轴统一显示
+            fig.update_layout(hovermode='x unified')
+        else:
+            fig = go.Figure()
+            fig.update_layout(**self.CHART_LAYOUT)
+        
+        # 添加沪深300基准线到风格净值趋势图
+        csi300_data = self.data_processor.get_csi300_data()
+        if style_data and not csi300_data.empty:
+            # 修改所有风格线条的悬停模板，不显示日期
+            for trace in fig.data:
+                trace.hovertemplate = '%{fullData.name}: %{y:.4f}<extra></extra>'
             
-            self.fig_total.update_layout(
-                **self.CHART_LAYOUT,
-                showlegend=True,  # 显示图例
-                legend=dict(
-                    orientation="h",  # 水平布局
-                    yanchor="bottom",
-                    y=1.02,  # 将图例放在图表上方
-                    xanchor="right",
-                    x=1
-                )
-            )
+            # 添加沪深300，显示日期
+            fig.add_trace(go.Scatter(
+                x=csi300_data['Date'],
+                y=csi300_data['净值'],
+                name='沪深300',
+                line=dict(
+                    color='#808080',  # 灰色
+                    width=2,
+                    dash='dash'  # 虚线
+                ),
+                mode='lines',
+                hovertemplate='%{x|%Y-%m-%d}<br>沪深300: %{y:.4f}<extra></extra>'
+            ))
+            # 设置交互模式为x轴统一显示
+            fig.update_layout(hovermode='x unified')
+        return fig
+    
+    def _build_fig_nav(self) -> go.Figure:
+        """所有策略的净值趋势图"""
+        nav_data = self.data_processor.df.copy()
+        nav_data['Strategy_Alias'] = nav_data['Strategy'].map(self.data_processor.get_strategy_alias)
+        fig = px.line(
+            nav_data,
+            x='Date',
+            y='净值',
+            color='Strategy_Alias'
+        )
+        fig.update_layout(**self.CHART_LAYOUT, showlegend=False, xaxis_title='', yaxis_title='')
+        return fig
+    
+    def _build_fig_total(self) -> go.Figure:
+        """组合总收益率趋势图，含沪深300和超额收益，同时记录各折线的范围供 total_chart_range 使用"""
+        nav_store = self.data_processor.nav_store
+        total_nav = pd.DataFrame({
+            'Date': nav_store.dates,
+            '总收益率': nav_store.nav - 1  # 转换为收益率格式（净值-1）
+        })
+        fig = px.line(total_nav, x='Date', y='总收益率')
+        # 设置总收益率的悬停模板，不显示日期
+        for trace in fig.data:
+            trace.hovertemplate = '总收益率: %{y:.2%}<extra></extra>'  # 更新为百分比格式
+        
+        fig.update_layout(
+            **self.CHART_LAYOUT,
+            showlegend=True,  # 显示图例
+            legend=dict(
+                orientation="h",  # 水平布局
+                yanchor="bottom",
+                y=1.02,  # 将图例放在图表上方
+                xanchor="right",
+                x=1
+            ),
+            xaxis_title='',
+            yaxis_title=''
+        )
+        
+        # 添加沪深300基准线到总净值趋势图
+        csi300_data = self.data_processor.get_csi300_data()
+        if not csi300_data.empty:
+            # 计算沪深300收益率（净值-1）
+            csi300_data = csi300_data.copy()
+            csi300_data['收益率'] = csi300_data['净值'] - 1
             
-            # 添加沪深300基准线到总净值趋势图
-            csi300_data = self.data_processor.get_csi300_data()
-            if not csi300_data.empty:
-                # 计算沪深300收益率（净值-1）
-                csi300_data = csi300_data.copy()
-                csi300_data['收益率'] = csi300_data['净值'] - 1
-                
-                # 添加沪深300收益率线，显示日期
-                self.fig_total.add_trace(go.Scatter(
-                    x=csi300_data['Date'],
-                    y=csi300_data['收益率'],
-                    name='沪深300',
-                    line=dict(
-                        color='#808080',  # 灰色
-                        width=2,
-                        dash='dash'  # 虚线
-                    ),
-                    mode='lines',
-                    hovertemplate='%{x|%Y-%m-%d}<br>沪深300: %{y:.2%}<extra></extra>'  # 更新为百分比格式
-                ))
-                
-                # 添加超额收益线 - 计算总收益率相对于沪深300的超额收益
-                # 首先确保日期匹配
-                common_dates = set(total_nav['Date']).intersection(set(csi300_data['Date']))
-                if common_dates:
-                    # 筛选共同日期的数据并复制出新的DataFrame，避免修改原始数据
-                    filtered_total = total_nav[total_nav['Date'].isin(common_dates)].copy().sort_values('Date')
-                    filtered_csi300 = csi300_data[csi300_data['Date'].isin(common_dates)].copy().sort_values('Date')
-                    
-                    # 创建包含超额收益的数据框，确保Date不是索引
-                    excess_return_df = pd.DataFrame({
-                        'Date': filtered_total['Date'].values,
-                        '超额收益': filtered_total['总收益率'].values - filtered_csi300['收益率'].values
-                    })
-                    
-                    # 添加超额收益线
-                    self.fig_total.add_trace(go.Scatter(
-                        x=excess_return_df['Date'],
-                        y=excess_return_df['超额收益'],
-                        name='超额收益',
-                        line=dict(
-                            color='#00ff00',  # 绿色
-                            width=2
-                        ),
-                        mode='lines',
-                        hovertemplate='%{x|%Y-%m-%d}<br>超额收益: %{y:.2%}<extra></extra>'  # 更新为百分比格式
-                    ))
-                
-                # 设置交互模式为x轴统一显示
-                self.fig_total.update_layout(hovermode='x unified')
+            # 添加沪深300收益率线，显示日期
+            fig.add_trace(go.Scatter(
+                x=csi300_data['Date'],
+                y=csi300_data['收益率'],
+                name='沪深300',
+                line=dict(
+                    color='#808080',  # 灰色
+                    width=2,
+                    dash='dash'  # 虚线
+                ),
+                mode='lines',
+                hovertemplate='%{x|%Y-%m-%d}<br>沪深300: %{y:.2%}<extra></extra>'  # 更新为百分比格式
+            ))
             
-            # 设置风格净值趋势图的交互模式为x轴统一显示
-            if style_data and not csi300_data.empty:
-                # 修改所有风格线条的悬停模板，不显示日期
-                for trace in self.fig_style_nav.data:
-                    trace.hovertemplate = '%{fullData.name}: %{y:.4f}<extra></extra>'
-                
-                # 添加沪深300，显示日期
-                self.fig_style_nav.add_trace(go.Scatter(
-                    x=csi300_data['Date'],
-                    y=csi300_data['净值'],
-                    name='沪深300',
+            # 添加超额收益线 - 总收益率相对于沪深300的超额收益，两者已按组合的交易日对齐
+            excess_dates, excess = self.data_processor.aligned_benchmark('CSI300').excess_series()
+            if len(excess_dates):
+                fig.add_trace(go.Scatter(
+                    x=excess_dates,
+                    y=excess,
+                    name='超额收益',
                     line=dict(
-                        color='#808080',  # 灰色
-                        width=2,
-                        dash='dash'  # 虚线
+                        color='#00ff00',  # 绿色
+                        width=2
                     ),
                     mode='lines',
-                    hovertemplate='%{x|%Y-%m-%d}<br>沪深300: %{y:.4f}<extra></extra>'
+                    hovertemplate='%{x|%Y-%m-%d}<br>超额收益: %{y:.2%}<extra></extra>'  # 更新为百分比格式
                 ))
-                # 设置交互模式为x轴统一显示
-                self.fig_style_nav.update_layout(hovermode='x unified')
             
-        except Exception as e:
-            print(f"创建图表时出错: {str(e)}")
-            self.create_empty_figures()
+            # 设置交互模式为x轴统一显示
+            fig.update_layout(hovermode='x unified')
+        self._total_extents = self._trace_extents(fig)
+        return fig
     
-    def create_empty_figures(self):
-        """创建空图表"""
-        self.fig_returns = go.Figure()
-        self.fig_pie = go.Figure()
-        self.fig_nav = go.Figure()
-        self.fig_style_nav = go.Figure()
-        self.fig_total = go.Figure()
+    @staticmethod
+    def _trace_extents(fig: go.Figure) -> list:
+        """每条折线的日期数组，以及 y 值从第一个点起的累计最小值和最大值"""
+        extents = []
+        for trace in fig.data:
+            x = pd.to_datetime(np.asarray(trace.x)).to_numpy()
+            y = np.asarray(trace.y, dtype=float)
+            extents.append((x, np.fmin.accumulate(y), np.fmax.accumulate(y)))
+        return extents
+    
+    def total_chart_range(self, date) -> Optional[Tuple[list, list]]:
+        """总净值趋势图只显示截至 date 的部分时 x 轴和 y 轴的范围
+
+        fig_total 包含完整的历史数据，切换日期时只需调整坐标轴范围。
+        y 轴按可见数据的最小值和最大值上下各留 5% 空白，与 Plotly 自动范围一致。
+        组合在 date 之前没有数据时返回 None。
+        """
+        self.fig_total  # 确保已按当前数据创建
+        date = np.datetime64(pd.Timestamp(date), 'ns')
+        first, last, low, high = [], [], [], []
+        for n, (x, cummin, cummax) in enumerate(self._total_extents):
+            stop = np.searchsorted(x, date, side='right')
+            if stop == 0:
+                if n == 0:
+                    return None
+                continue
+            first.append(x[0])
+            last.append(x[stop - 1])
+            low.append(cummin[stop - 1])
+            high.append(cummax[stop - 1])
+        if not first or np.all(np.isnan(low)):
+            return None
         
-        for fig in [self.fig_returns, self.fig_pie, self.fig_nav, 
-                   self.fig_style_nav, self.fig_total]:
-            fig.update_layout(**self.CHART_LAYOUT)
+        y_min, y_max = np.nanmin(low), np.nanmax(high)
+        pad = (y_max - y_min) * 0.05 or max(abs(y_max) * 0.05, 0.01)
+        x_min, x_max = pd.Timestamp(min(first)), pd.Timestamp(max(last))
+        if x_min == x_max:
+            # 只有一天的数据时前后各留一天
+            x_min, x_max = x_min - pd.Timedelta(days=1), x_max + pd.Timedelta(days=1)
+        x_range = [str(x_min.date()), str(x_max.date())]
+        return x_range, [float(y_min - pad), float(y_max + pad)]
+    
+    def render_nav_chart(self, name: str, width: Optional[int] = None, x_range: Optional[Tuple] = None):
+        """发送到浏览器的 fig_nav 或 fig_style_nav
+
+        CHART_RENDER_MODE 为 'webgl' 时转为 Scattergl，并按 LTTB 把每条线降采样到
+        约 width（浏览器窗口宽度，默认 DOWNSAMPLE_DEFAULT_WIDTH，向上取到 DOWNSAMPLE_WIDTH_BUCKETS 中的一档）
+        × DOWNSAMPLE_POINTS_PER_PIXEL 个点；x_range 为缩放后的日期范围，只对范围内的完整数据降采样。
+        其他模式发送完整的原图。返回的图表中数组均编码为 typed array。
+        """
+        fig = getattr(self, name)
+        if CHART_RENDER_MODE != 'webgl':
+            return self._rendered_figure((name, None), fig, lambda: pack_figure(fig))
+        threshold = self.downsample_threshold(width)
+        if x_range is not None:
+            return pack_figure(downsample_figure(fig, threshold, x_range))
+        return self._rendered_figure((name, threshold), fig, lambda: pack_figure(downsample_figure(fig, threshold)))
+    
+    @staticmethod
+    def downsample_threshold(width: Optional[int] = None) -> int:
+        """浏览器窗口宽度对应的降采样点数"""
+        width = width or DOWNSAMPLE_DEFAULT_WIDTH
+        bucket = next((b for b in DOWNSAMPLE_WIDTH_BUCKETS if b >= width), DOWNSAMPLE_WIDTH_BUCKETS[-1])
+        return max(int(bucket * DOWNSAMPLE_POINTS_PER_PIXEL), 3)
+    
+    def _rendered_figure(self, key: tuple, fig: go.Figure, render) -> dict:
+        """按 (key, 数据版本号) 缓存 render() 的结果，数据版本变化时清空，fig 重新创建后失效"""
+        version = self._data_version()
+        with self._rendered_lock:
+            if version != self._rendered_version:
+                self._rendered.clear()
+                self._rendered_version = version
+        key = key + (version,)
+        cached = self._rendered.get_or_compute(key, lambda: (fig, render()))
+        if cached[0] is not fig:
+            cached = (fig, render())
+            self._rendered.put(key, cached)
+        return cached[1]
+    
+    def empty_figure(self) -> go.Figure:
+        """空图表，也用作回调填充图表之前布局中的占位图表"""
+        fig = go.Figure()
+        fig.update_layout(**self.CHART_LAYOUT)
+        return fig
+    
+    def create_empty_figures(self):
+        """所有图表设为空图表"""
+        self._figures = {name: (self._data_version(), self.empty_figure()) for name in self.FIGURES}
+        self._total_extents = []
+        self._rendered.clear()
     
     def create_pie_chart(self, data: pd.DataFrame, values: str, names: str) -> go.Figure:
         """创建饼图"""
@@ -286,64 +408,20 @@ class ChartFactory:
         return fig
 
     def create_style_pie_chart(self):
-        # 1. 初始化一个字典来存储每种风格的总市值
-        style_market_value = {}
-
-        # 2. 遍历所有策略
-        for strategy_name, strategy_info in self.STRATEGY_STYLES.items():
-            if 'styles' in strategy_info and strategy_info['styles']:
-                # 获取该策略的第一种风格
-                key_style = strategy_info['styles'][0]
-                
-                # 筛选出与该风格相关的数据
-                filtered_data = self.data_processor.df[self.data_processor.df['Strategy'] == strategy_name]
-                
-                # 计算该风格的合计市值
-                total_market_value = filtered_data['MarketValue_close'].sum()
-                
-                # 将结果存储到字典中
-                style_market_value[key_style] = style_market_value.get(key_style, 0) + total_market_value
-
-        # 3. 创建饼图
-        fig = go.Figure(data=[go.Pie(
-            labels=list(style_market_value.keys()),
-            values=list(style_market_value.values()),
-            hole=0.4  # 如果需要，可以设置为环形图
-        )])
-        
-        # 更新布局以匹配策略市值占比饼图的样式
-        fig.update_layout(
-            title_text='',  # 去掉标题
-            showlegend=False,  # 去掉图例
-            margin=dict(l=0, r=0, t=0, b=0),  # 去掉外部边距
-            paper_bgcolor='rgba(0,0,0,0)',  # 设置背景透明
-            plot_bgcolor='rgba(0,0,0,0)'  # 设置绘图区域背景透明
-        )
-        
-        return fig
+        """按第一风格汇总全部日期总市值的饼图"""
+        market_value, _ = self.data_processor.style_allocation.totals()
+        return self._style_total_pie(market_value)
 
     def create_style_position_pie_chart(self):
-        # 1. 初始化一个字典来存储每种风格的总市值
-        style_position_value = {}
-
-        # 2. 遍历所有策略
-        for strategy_name, strategy_info in self.STRATEGY_STYLES.items():
-            if 'styles' in strategy_info and strategy_info['styles']:
-                # 获取该策略的第一种风格
-                key_style = strategy_info['styles'][0]
-                
-                # 筛选出与该风格相关的数据
-                filtered_data = self.data_processor.df[self.data_processor.df['Strategy'] == strategy_name]
-                # 计算该风格的合计市值
-                total_position_value = filtered_data['PositionValue'].sum()
-                
-                # 将结果存储到字典中
-                style_position_value[key_style] = style_position_value.get(key_style, 0) + total_position_value
+        """按第一风格汇总全部日期持仓市值的饼图"""
+        _, position_value = self.data_processor.style_allocation.totals()
+        return self._style_total_pie(position_value)
 
-        # 3. 创建饼图
+    @staticmethod
+    def _style_total_pie(values: pd.Series) -> go.Figure:
         fig = go.Figure(data=[go.Pie(
-            labels=list(style_position_value.keys()),
-            values=list(style_position_value.values()),
+            labels=list(values.index),
+            values=list(values.to_numpy()),
             hole=0.4  # 如果需要，可以设置为环形图
         )])
         
@@ -51,4 +51,29 @@ STRATEGY_STYLES: Dict[str, Dict[str, Any]] = {
         'styles': ['机会主义', '聚宽']
     }   
     # ... 其他策略配置 ...
-}
\ No newline at end of file
+}
+# 数据文件增量刷新间隔（毫秒）
+DATA_REFRESH_INTERVAL = 60 * 1000
+# 按日期缓存的 DaySnapshot 数量上限
+DAY_SNAPSHOT_CACHE_SIZE = 64
+# 已序列化图表缓存的总大小上限（字节）
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 行情源：'xueqiu' 通过 portfolio.get_stock_prices 获取实时行情，'fake' 使用离线的确定性行情
+PRICE_SOURCE = 'xueqiu'
+# 股票行情缓存有效期、后台刷新间隔和首次获取时的最长等待时间（秒）
+PRICE_TTL = 60
+PRICE_REFRESH_INTERVAL = 30
+PRICE_WAIT_TIMEOUT = 5
+# 策略净值趋势图和风格净值趋势图的渲染方式：'webgl' 使用 Scattergl 并在服务器端按 LTTB 降采样，
+# 'svg' 发送完整数据的 SVG 折线
+CHART_RENDER_MODE = 'webgl'
+# 降采样后每条线的点数 = 浏览器窗口宽度（像素）× DOWNSAMPLE_POINTS_PER_PIXEL，
+# 净值趋势图占窗口宽度的 64%，即图表的每个像素约一个点；浏览器尚未报告窗口宽度时按 DOWNSAMPLE_DEFAULT_WIDTH 计算
+DOWNSAMPLE_POINTS_PER_PIXEL = 0.64
+DOWNSAMPLE_DEFAULT_WIDTH = 1600
+# 窗口宽度先向上取到其中一档再计算点数，不同宽度的窗口共用同一个降采样结果；超过最大一档时按最大一档计算
+DOWNSAMPLE_WIDTH_BUCKETS = (1024, 1366, 1600, 1920, 2560, 3840)
+# 缓存的净值趋势图发送版本（图表 × 宽度档）数量上限
+RENDERED_FIGURE_CACHE_SIZE = 12
+# 组合与基准的交易日历不一致时，组合的每个交易日取之前最近一个基准交易日的净值，最多向前找的天数
+BENCHMARK_ASOF_TOLERANCE_DAYS = 7
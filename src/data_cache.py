@@ -0,0 +1,123 @@
+import hashlib
+import io
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT = 7  # 缓存内容结构变化时递增，使旧缓存失效
+
+
+def file_signature(path: str) -> Dict[str, object]:
+    """文件的大小、修改时间和内容哈希"""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+
+
+def cache_key(paths, extra=None) -> str:
+    """根据源文件签名和附加参数生成缓存键，任一源文件变化都会得到不同的键"""
+    signatures = [file_signature(p) if os.path.exists(p) else {'path': os.path.abspath(p)} for p in paths]
+    payload = json.dumps({'format': CACHE_FORMAT, 'sources': signatures, 'extra': extra},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FrameCache:
+    """以 npz 列式格式保存若干 DataFrame、数组和标量的磁盘缓存
+
+    每列和行索引单独存为一个 numpy 数组（字符串列存为定长 unicode 数组，
+    分类列存为编码和类别两个数组），读取时不需要 pickle，也不需要重新解析和计算，
+    恢复的 DataFrame 与写入时的列类型和行索引相同。
+    """
+
+    def __init__(self, cache_dir: str, name: str):
+        self.path = os.path.join(cache_dir, f"{name}.npz")
+
+    def load(self, key: str) -> Optional[dict]:
+        """读取缓存，键不匹配或文件损坏时返回 None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as bundle:
+                meta = json.loads(str(bundle['__meta__']))
+                if meta.get('key') != key:
+                    return None
+                frames = {}
+                for name, layout in meta['frames'].items():
+                    columns = layout['columns']
+                    index = layout['index']
+                    frames[name] = pd.DataFrame(
+                        {col: self._decode(bundle, f"frame/{name}/{i}", info) for i, (col, info) in enumerate(columns)},
+                        columns=[col for col, _ in columns],
+                        index=pd.Index(self._decode(bundle, f"frame/{name}/index", index), name=index['name'])
+                    )
+                arrays = {name: bundle[f"array/{name}"] for name in meta['arrays']}
+            return {'frames': frames, 'arrays': arrays, 'values': meta['values']}
+        except Exception as e:
+            print(f"读取缓存时出错: {str(e)}")
+            return None
+
+    def save(self, key: str, frames: Dict[str, pd.DataFrame],
+             arrays: Dict[str, np.ndarray] = None, values: dict = None):
+        """写入缓存，先写临时文件再替换，避免留下不完整的缓存"""
+        arrays = arrays or {}
+        bundle = {}
+        meta = {'key': key, 'frames': {}, 'arrays': list(arrays), 'values': values or {}}
+        for name, frame in frames.items():
+            columns = [(col, self._encode(bundle, f"frame/{name}/{i}", frame[col]))
+                       for i, col in enumerate(frame.columns)]
+            index = dict(self._encode(bundle, f"frame/{name}/index", frame.index), name=frame.index.name)
+            meta['frames'][name] = {'columns': columns, 'index': index}
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            # object 数组（如字符串列表）存为定长 unicode，读取时无需 pickle
+            bundle[f"array/{name}"] = array.astype(str) if array.dtype == object else array
+        bundle['__meta__'] = np.array(json.dumps(meta, ensure_ascii=False))
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            buffer = io.BytesIO()
+            np.savez(buffer, **bundle)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer.getvalue())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"写入缓存时出错: {str(e)}")
+
+    @staticmethod
+    def _encode(bundle: dict, name: str, values) -> dict:
+        """把一列或一个行索引存入 bundle[name]，返回恢复时需要的类型信息
+
+        RangeIndex 只记录起止和步长；分类类型存编码，类别另存为 name/categories。
+        """
+        if isinstance(values, pd.RangeIndex):
+            return {'dtype': 'range', 'start': values.start, 'stop': values.stop, 'step': values.step}
+        dtype = values.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            bundle[name] = values.array.codes
+            return {'dtype': 'category', 'ordered': bool(dtype.ordered),
+                    'categories': FrameCache._encode(bundle, f"{name}/categories", dtype.categories)}
+        bundle[name] = values.to_numpy() if dtype.kind in 'biufcmM' else values.to_numpy(dtype=str)
+        return {'dtype': str(dtype)}
+
+    @staticmethod
+    def _decode(bundle, name: str, info: dict):
+        """按 _encode 记录的类型信息恢复 bundle[name] 中的一列或一个行索引"""
+        if info['dtype'] == 'range':
+            return pd.RangeIndex(info['start'], info['stop'], info['step'])
+        if info['dtype'] == 'category':
+            categories = pd.Index(FrameCache._decode(bundle, f"{name}/categories", info['categories']))
+            return pd.Categorical.from_codes(bundle[name], dtype=pd.CategoricalDtype(categories, info['ordered']))
+        return pd.Series(bundle[name]).astype(info['dtype']).array
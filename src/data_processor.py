@@ -1,19 +1,81 @@
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from functools import lru_cache
-from .config import STRATEGY_STYLES
+from .config import STRATEGY_STYLES, DAY_SNAPSHOT_CACHE_SIZE, BENCHMARK_ASOF_TOLERANCE_DAYS
 import plotly.graph_objects as go
 import plotly.express as px
-import json
+import io
+import os
+import hashlib
+import threading
+from .data_cache import FrameCache, cache_key
+from .nav_store import NavStore
+from .date_index import DateIndex
+from .panel import StrategyPanel
+from .drawdown import DrawdownState, annual_return
+from .styles import StyleIndex, StyleAllocation, style_returns, THREE_YEAR_DAYS
+from .benchmark_store import BenchmarkStore
+from .alignment import AlignedSeries
+from .lru import LRUCache
+from .snapshot import DaySnapshot
+from .row_buffer import RowBuffer
+
+RAW_COLUMNS = ['Date', 'MarketValue', 'PositionValue', 'Strategy', 'Time']
+CSV_CHUNK_ROWS = 200000  # 分块读取数据文件时每块的行数
+PREFIX_CHECK_BYTES = 4096  # 增量读取前校验已读部分的开头和结尾各多少字节
 
 class DataProcessor:
-    def __init__(self, file_path):
-        """初始化数据处理器"""
+    def __init__(self, file_path, cache_dir='.cache'):
+        """初始化数据处理器
+        
+        cache_dir 为处理结果的磁盘缓存目录，源文件未变化时直接从缓存加载；
+        传入 None 则不使用缓存。
+        """
         self.STRATEGY_STYLES = STRATEGY_STYLES
+        self.file_path = file_path
+        self.strategy_aliases = {k: v.get('alias', k) for k, v in self.STRATEGY_STYLES.items()}
+        self.version = 0  # 数据版本号，每次数据变化时递增
+        self._contribution = None  # (数据版本号, 累计贡献矩阵, 各策略首个交易日的行号)
+        self._aligned = {}  # 基准名称 -> (数据版本号, AlignedSeries)
+        self._snapshots = LRUCache(DAY_SNAPSHOT_CACHE_SIZE)  # (日期, 数据版本号) -> DaySnapshot
+        self.benchmarks = BenchmarkStore('cubevalue.txt')  # 沪深300和各组合的净值序列、创建时间
+        self._style_cohort = None  # 计算风格指标时"三年以内"的雪球组合
+        self._strategy_state = DrawdownState()  # 各策略截至面板最后一行的净值和回撤
+        self._style_rows = None  # 风格指标已计算到的面板行数，None 表示需要全部重新计算
+        self._df_buffers = None  # (df, 列名 -> RowBuffer)，增量读取时 df 各列的预留空间
+        self._cache = None
+        self._digest = None  # 数据文件已读取部分的 sha256，增量读取时继续累积，用于缓存键
+        self._cache_lock = threading.Lock()  # 后台写缓存依次执行
+        self._cached_version = 0  # 已写入磁盘缓存的数据版本号
+        self._refresh_lock = threading.Lock()  # 多个页面的定时刷新依次执行
+        if cache_dir is not None:
+            name = 'data_processor_' + hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:12]
+            self._cache = FrameCache(cache_dir, name)
+        self._load()
+    
+    def _load(self):
+        """全量加载数据文件并计算所有指标"""
+        self.benchmarks.reload_if_changed()
+        key = None
+        if self._cache is not None:
+            try:
+                self._offset = self._complete_length(self.file_path, os.path.getsize(self.file_path))
+                self._hash_read_part()
+                key = self._cache_key()
+            except Exception as e:
+                print(f"计算缓存键时出错: {str(e)}")
+        hashed_offset = self._offset if key is not None else None
+        if key is not None and self._load_cache(key):
+            self.version += 1
+            return
+        
         try:
-            self.df = self._load_and_process_data(file_path)
-            self.strategy_aliases = {k: v.get('alias', k) for k, v in self.STRATEGY_STYLES.items()}
+            self._offset = 0  # 已读取到的文件字节位置
+            self._columns = list(RAW_COLUMNS)  # 数据文件表头中的列名，增量读取时按此解析
+            self._pending_pre = pd.DataFrame(columns=RAW_COLUMNS)  # 尚未等到盘后数据的盘前记录
+            self.df = self._load_and_process_data(self.file_path)
+            self._prefix = self._prefix_digest(self._offset)
             self.daily_profit_loss = None  # 新增 daily_profit_loss 属性
             self._calculate_daily_metrics()
             self.update_drawdown_analysis()  # 确保在初始化时调用该方法
@@ -21,64 +83,188 @@ class DataProcessor:
         except Exception as e:
             print(f"初始化数据处理器时出错: {str(e)}")
             self._init_empty_metrics()
+        self.version += 1
+        
+        if key is not None and not self.df.empty:
+            if self._offset != hashed_offset:
+                # 计算缓存键之后文件又追加了内容，按实际读取的部分重新计算
+                self._hash_read_part()
+                key = self._cache_key()
+            self._save_cache(key)
+    
+    def _hash_read_part(self):
+        """重新计算数据文件前 _offset 字节（已读取部分）的 sha256"""
+        digest = hashlib.sha256()
+        with open(self.file_path, 'rb') as f:
+            remaining = self._offset
+            while remaining > 0:
+                block = f.read(min(remaining, 1 << 20))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        self._digest = digest
+    
+    def _cache_key(self):
+        """数据文件已读取的部分、沪深300数据文件和策略配置共同决定缓存键
+        
+        已读取部分的哈希在增量读取时随新增内容累积，刷新时不需要重新读取整个数据文件。
+        """
+        if self._cache is None or self._digest is None:
+            return None
+        try:
+            source = {
+                'path': os.path.abspath(self.file_path),
+                'offset': self._offset,
+                'sha256': self._digest.hexdigest()
+            }
+            return cache_key(['cubevalue.txt'], extra={'source': source, 'styles': self.STRATEGY_STYLES})
+        except Exception as e:
+            print(f"计算缓存键时出错: {str(e)}")
+            return None
+    
+    def _load_cache(self, key) -> bool:
+        """从磁盘缓存恢复处理结果，缓存不可用时返回 False"""
+        cached = self._cache.load(key)
+        if cached is None:
+            return False
+        
+        frames, arrays, values = cached['frames'], cached['arrays'], cached['values']
+        self.df = frames['df']
+        self.csi300_data = frames['csi300_data']
+        self.display_df = frames['display_df']
+        self._pending_pre = frames['pending_pre']
+        self._last_nav = frames['last_nav'].set_index('Strategy')['净值']
+        self.nav_store = NavStore()
+        for name in NavStore.FIELDS:
+            setattr(self.nav_store, name, arrays[f'nav_store/{name}'])
+        self.panel = StrategyPanel()
+        for name in StrategyPanel.FIELDS:
+            setattr(self.panel, name, arrays[f'panel/{name}'])
+        self.panel.strategies = self.panel.strategies.astype(object)
+        self._offset = values['offset']
+        self._columns = values['columns']
+        self._prefix = values['prefix']
+        self.date_index = DateIndex()
+        self.date_index.build(self.df['Date'])
+        self._sync_daily_metrics()
+        print(f"从缓存加载数据，共 {len(self.df)} 条记录")
+        return True
+    
+    def _save_cache(self, key, background=False):
+        """把处理结果写入磁盘缓存
+        
+        background 为 True 时在后台线程中写入，调用方不等待写盘。写入的是调用时的结果
+        （数据更新时各属性整体替换，追加的行只写入已有视图之外的预留空间，不会原地修改）；
+        多次写入依次执行，旧版本不会覆盖新版本。
+        """
+        store = self.nav_store
+        version = self.version
+        payload = dict(
+            key=key,
+            frames={
+                'df': self.df,
+                'csi300_data': self.csi300_data,
+                'display_df': self.display_df,
+                'pending_pre': self._pending_pre,
+                'last_nav': self._last_nav.rename('净值').rename_axis('Strategy').reset_index()
+            },
+            arrays={
+                **{f'nav_store/{name}': getattr(store, name) for name in NavStore.FIELDS},
+                **{f'panel/{name}': getattr(self.panel, name) for name in StrategyPanel.FIELDS}
+            },
+            values={'offset': self._offset, 'columns': self._columns, 'prefix': self._prefix}
+        )
+        
+        def save():
+            with self._cache_lock:
+                if version < self._cached_version:
+                    return
+                self._cache.save(**payload)
+                self._cached_version = version
+        
+        if background:
+            threading.Thread(target=save, daemon=True).start()
+        else:
+            save()
     
     def _load_and_process_data(self, file_path: str) -> pd.DataFrame:
-        """加载数据并进行预处理"""
+        """加载数据并进行预处理
+        
+        按 CSV_CHUNK_ROWS 行分块读取，每块读入后立即与之前未配对的盘前记录一起对齐，
+        只保留紧凑的对齐结果，避免整个文件以 object 类型同时驻留内存。
+        """
         try:
             # 读取数据
             print(f"正在读取文件: {file_path}")
-            df = pd.read_csv(file_path, encoding='ansi')
-            print("列名:", df.columns.tolist())
-            
-            # 确保必要的列存在
-            required_columns = ['Date', 'MarketValue', 'PositionValue', 'Strategy', 'Time']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"缺少必要的列: {missing_columns}")
-            
-            # 数据类型转换
-            df['Date'] = pd.to_datetime(df['Date'])
-            df['MarketValue'] = pd.to_numeric(df['MarketValue'], errors='coerce')
-            df['PositionValue'] = pd.to_numeric(df['PositionValue'], errors='coerce')
+            # 与之前一样解析整个文件（包括末尾没有换行符的行），但只把完整的行记为已读取：
+            # 末尾的行可能还没写完，下次增量读取时重新读取，已有的 (Date, Strategy) 不会重复添加
+            self._offset = self._complete_length(file_path, os.path.getsize(file_path))
+            reader = pd.read_csv(
+                file_path,
+                encoding='ansi',
+                chunksize=CSV_CHUNK_ROWS,
+                dtype={'Strategy': 'category', 'Time': 'category'}
+            )
             
-            # 处理盘前盘后数据
-            pre_open = df[df['Time'] == 'pre_open'].copy()
-            close = df[df['Time'] == 'close'].copy()
+            parts = []
+            pending = None  # 尚未找到盘后数据的盘前记录
+            strategies = pd.Index([], dtype=object)  # 所有分块共用的策略类别
+            has_pre_open = has_close = False
+            for i, chunk in enumerate(reader):
+                if i == 0:
+                    print("列名:", chunk.columns.tolist())
+                    self._columns = chunk.columns.tolist()
+                    # 确保必要的列存在
+                    missing_columns = [col for col in RAW_COLUMNS if col not in chunk.columns]
+                    if missing_columns:
+                        raise ValueError(f"缺少必要的列: {missing_columns}")
+                
+                chunk = self._convert_raw_types(chunk[RAW_COLUMNS].copy())
+                strategies = strategies.append(chunk['Strategy'].cat.categories.difference(strategies))
+                chunk['Strategy'] = chunk['Strategy'].cat.set_categories(strategies)
+                
+                # 处理盘前盘后数据
+                pre_open = chunk[chunk['Time'] == 'pre_open']
+                close = chunk[chunk['Time'] == 'close']
+                has_pre_open |= not pre_open.empty
+                has_close |= not close.empty
+                if pending is not None and not pending.empty:
+                    pending = pending.assign(Strategy=pending['Strategy'].cat.set_categories(strategies))
+                    pre_open = pd.concat([pending, pre_open])
+                
+                # 计算日收益率
+                rows, pending = self._pivot_pre_close(pre_open, close)
+                parts.append(rows)
             
-            if pre_open.empty or close.empty:
+            if not has_pre_open or not has_close:
                 print("警告: 没有找到盘前或盘后数据")
                 return pd.DataFrame()
             
-            # 计算日收益率
-            result = pd.DataFrame()
-            for date in pre_open['Date'].unique():
-                date_pre = pre_open[pre_open['Date'] == date]
-                date_close = close[close['Date'] == date]
-                
-                for strategy in date_pre['Strategy'].unique():
-                    pre_value = date_pre[date_pre['Strategy'] == strategy]['MarketValue'].iloc[0]
-                    try:
-                        close_value = date_close[date_close['Strategy'] == strategy]['MarketValue'].iloc[0]
-                        position_value = date_close[date_close['Strategy'] == strategy]['PositionValue'].iloc[0]
-                        daily_return = (close_value - pre_value) / pre_value if pre_value != 0 else 0
-                        
-                        result = pd.concat([result, pd.DataFrame({
-                            'Date': [date],
-                            'Strategy': [strategy],
-                            'MarketValue_pre': [pre_value],
-                            'MarketValue_close': [close_value],
-                            'PositionValue': [position_value],
-                            '收益率': [daily_return]
-                        })])
-                    except IndexError:
-                        print(f"警告: {date} 的策略 {strategy} 缺少盘后数据")
+            for part in parts:
+                part['Strategy'] = part['Strategy'].cat.set_categories(strategies)
+            result = pd.concat(parts, ignore_index=True)
+            # 跨分块的重复记录只保留第一条
+            result = result.drop_duplicates(['Date', 'Strategy'], keep='first', ignore_index=True)
+            result['Strategy'] = result['Strategy'].astype(str)
+            # 按日期排序，使同一日期的记录连续存放
+            if not result['Date'].is_monotonic_increasing:
+                result = result.sort_values('Date', kind='stable', ignore_index=True)
             
-            result = result.reset_index(drop=True)
+            unmatched = pending.assign(Strategy=pending['Strategy'].astype(str))
+            # 排除已在其他分块配对成功的重复盘前记录
+            matched = unmatched[['Date', 'Strategy']].merge(
+                result[['Date', 'Strategy']], how='left', indicator=True
+            )['_merge'] == 'both'
+            unmatched = unmatched[~matched.to_numpy()]
+            for date, strategy in unmatched[['Date', 'Strategy']].itertuples(index=False):
+                print(f"警告: {date} 的策略 {strategy} 缺少盘后数据")
+            # 最新日期的盘前记录可能只是盘后数据还没写入，保留下来等待增量读取
+            self._pending_pre = unmatched[unmatched['Date'] >= result['Date'].max()]
             
             # 计算策略净值
-            result['净值'] = result.groupby('Strategy')['收益率'].transform(
-                lambda x: (1 + x).cumprod()
-            )
+            result['净值'] = (1 + result['收益率']).groupby(result['Strategy']).cumprod()
+            self._last_nav = result.groupby('Strategy')['净值'].last()
             
             print(f"数据处理完成，共 {len(result)} 条记录")
             return result
@@ -87,48 +273,372 @@ class DataProcessor:
             print(f"加载数据时出错: {str(e)}")
             return pd.DataFrame()
     
+    @staticmethod
+    def _complete_length(file_path: str, size: int) -> int:
+        """文件中完整行的总字节数，即最后一个换行符之后的位置"""
+        with open(file_path, 'rb') as f:
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                i = f.read(end - start).rfind(b'\n')
+                if i >= 0:
+                    return start + i + 1
+                end = start
+        return 0
+    
+    def _prefix_digest(self, offset: int) -> str:
+        """文件开头（含表头）和 offset 之前各 PREFIX_CHECK_BYTES 字节的哈希
+        
+        与上次读取时的结果不同说明已读取的部分被改写，不能从 offset 继续增量读取。
+        """
+        digest = hashlib.sha1()
+        with open(self.file_path, 'rb') as f:
+            digest.update(f.read(min(offset, PREFIX_CHECK_BYTES)))
+            start = max(0, offset - PREFIX_CHECK_BYTES)
+            f.seek(start)
+            digest.update(f.read(offset - start))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _convert_raw_types(df: pd.DataFrame) -> pd.DataFrame:
+        """原始记录的数据类型转换"""
+        df['Date'] = pd.to_datetime(df['Date'])
+        df['MarketValue'] = pd.to_numeric(df['MarketValue'], errors='coerce').astype('float64')
+        df['PositionValue'] = pd.to_numeric(df['PositionValue'], errors='coerce').astype('float64')
+        return df
+    
+    @staticmethod
+    def _pivot_pre_close(pre_open: pd.DataFrame, close: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """将盘前/盘后记录按 (Date, Strategy) 对齐为一行，一次性计算收益率
+        
+        返回对齐后的记录，以及找不到对应盘后数据的盘前记录。
+        """
+        keys = ['Date', 'Strategy']
+        # 同一日期同一策略有重复记录时只取第一条
+        pre = pre_open.drop_duplicates(keys, keep='first')
+        post = close.drop_duplicates(keys, keep='first')
+        
+        merged = pre[keys + ['MarketValue']].merge(
+            post[keys + ['MarketValue', 'PositionValue']],
+            on=keys,
+            how='left',
+            suffixes=('_pre', '_close'),
+            indicator=True
+        )
+        
+        missing = (merged['_merge'] == 'left_only').to_numpy()
+        unmatched = pre[missing]
+        merged = merged[~missing]
+        
+        # 保持原有顺序：日期按首次出现排序，同一日期内按盘前记录顺序
+        date_order = pd.factorize(merged['Date'])[0]
+        merged = merged.iloc[np.argsort(date_order, kind='stable')]
+        
+        pre_value = merged['MarketValue_pre']
+        close_value = merged['MarketValue_close']
+        daily_return = ((close_value - pre_value) / pre_value).where(pre_value != 0, 0)
+        
+        result = pd.DataFrame({
+            'Date': merged['Date'],
+            'Strategy': merged['Strategy'],
+            'MarketValue_pre': pre_value,
+            'MarketValue_close': close_value,
+            'PositionValue': merged['PositionValue'],
+            '收益率': daily_return
+        }).reset_index(drop=True)
+        return result, unmatched
+    
+    def refresh(self) -> int:
+        """增量读取数据文件新追加的行，返回新增记录数
+        
+        只解析上次读取位置之后的内容，并从上一次的净值和回撤状态继续计算，
+        耗时只与新增行数有关。文件被截断或重写（已读取部分的开头或结尾发生变化、
+        新增行的列数与表头不一致）时退回全量加载。
+        多个页面同时刷新时依次执行，只有第一个调用会读到新增的行。
+        """
+        with self._refresh_lock:
+            return self._refresh()
+    
+    def _refresh(self) -> int:
+        try:
+            if self.df.empty or os.path.getsize(self.file_path) < self._offset \
+                    or self._prefix_digest(self._offset) != self._prefix:
+                self._load()
+                return len(self.df)
+            
+            if self.benchmarks.reload_if_changed():
+                self._reload_benchmarks()
+            else:
+                self._refresh_style_cohort()
+            new_raw = self._read_tail()
+            if new_raw is None:
+                print("数据文件的列与表头不一致，重新全量加载")
+                self._load()
+                return len(self.df)
+            if new_raw.empty:
+                return 0
+            
+            new_rows = self._append_rows(new_raw)
+            if new_rows.empty:
+                return 0
+            
+            self._extend_daily_metrics(new_rows['Date'].min())
+            self.update_drawdown_analysis()
+            self.version += 1
+            # 缓存键只需累积新增内容的哈希，写盘在后台进行
+            key = self._cache_key()
+            if key is not None:
+                self._save_cache(key, background=True)
+            print(f"增量读取完成，新增 {len(new_rows)} 条记录")
+            return len(new_rows)
+        except Exception as e:
+            print(f"增量读取数据时出错: {str(e)}")
+            return 0
+    
+    def _read_tail(self) -> Optional[pd.DataFrame]:
+        """读取上次位置之后新追加的完整行
+        
+        新增行没有表头，按全量加载时记录的表头列名解析后再按名称取出需要的列；
+        列数与表头不一致时返回 None。
+        """
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._offset)
+            content = f.read()
+        end = content.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame(columns=RAW_COLUMNS)
+        
+        try:
+            df = pd.read_csv(io.BytesIO(content[:end]), encoding='ansi', header=None)
+        except pd.errors.ParserError:
+            return None  # 各行的列数不一致
+        if df.shape[1] != len(self._columns):
+            return None
+        df.columns = self._columns
+        self._offset += end
+        if self._digest is not None:
+            self._digest.update(content[:end])
+        self._prefix = self._prefix_digest(self._offset)
+        return self._convert_raw_types(df[RAW_COLUMNS].copy())
+    
+    def _append_rows(self, new_raw: pd.DataFrame) -> pd.DataFrame:
+        """把新读取的原始记录对齐后追加到 df，返回新增的记录"""
+        previous = self._pending_pre
+        pre_open = pd.concat([previous, new_raw[new_raw['Time'] == 'pre_open']])
+        close = new_raw[new_raw['Time'] == 'close']
+        new_rows, pending = self._pivot_pre_close(pre_open, close)
+        self._pending_pre = self._prune_pending(pending, new_rows, previous)
+        if new_rows.empty:
+            return new_rows  # 只有盘前记录，等待盘后数据
+        
+        # 跳过已经处理过的 (Date, Strategy)，与全量加载时只取第一条记录一致
+        existing = self.df.iloc[self.date_index.rows_from(new_rows['Date'].min())][['Date', 'Strategy']]
+        if not existing.empty:
+            seen = new_rows.merge(existing, on=['Date', 'Strategy'], how='left', indicator=True)['_merge']
+            new_rows = new_rows[(seen == 'left_only').to_numpy()].reset_index(drop=True)
+        if new_rows.empty:
+            return new_rows
+        
+        # 从各策略上一次的净值继续累乘
+        last_nav = self._last_nav.reindex(new_rows['Strategy']).fillna(1.0).to_numpy()
+        new_rows['净值'] = last_nav * (1 + new_rows['收益率']).groupby(new_rows['Strategy']).cumprod().to_numpy()
+        self._last_nav = new_rows.groupby('Strategy')['净值'].last().combine_first(self._last_nav)
+        
+        offset = len(self.df)
+        self._append_to_df(new_rows)
+        last_date = self.date_index.last()
+        if new_rows['Date'].is_monotonic_increasing and (last_date is None or new_rows['Date'].iloc[0] >= last_date):
+            self.date_index.extend(new_rows['Date'], offset)
+        else:
+            # 补写了更早日期的数据，重新排序后重建索引，之后各天的净值按新的顺序重新累乘
+            df = self.df.sort_values('Date', kind='stable', ignore_index=True)
+            df['净值'] = (1 + df['收益率']).groupby(df['Strategy']).cumprod()
+            self.df = df
+            self._last_nav = df.groupby('Strategy')['净值'].last()
+            self.date_index.build(self.df['Date'])
+        return new_rows
+    
+    def _append_to_df(self, new_rows: pd.DataFrame):
+        """把新记录追加到 df 末尾
+        
+        df 的各列是 RowBuffer 的视图，新记录写入预留的空间后生成新的 df，
+        耗时只与新增行数有关；之前的 df 对象保持不变。df 被整体替换后（全量加载、
+        读取缓存、重新排序）第一次追加时从当前的 df 建立各列的 RowBuffer。
+        """
+        if self._df_buffers is None or self._df_buffers[0] is not self.df:
+            buffers = {col: RowBuffer(self._column_array(self.df[col])) for col in self.df.columns}
+        else:
+            buffers = self._df_buffers[1]
+        columns = {col: buffer.append(self._column_array(new_rows[col].astype(self.df[col].dtype)))
+                   for col, buffer in buffers.items()}
+        self.df = pd.DataFrame(columns, copy=False)
+        self._df_buffers = (self.df, buffers)
+    
+    @staticmethod
+    def _column_array(column: pd.Series):
+        """列的底层数组：numpy 类型的列为 numpy 数组，其他类型（如字符串列）为 pandas 扩展数组"""
+        return column.to_numpy() if isinstance(column.dtype, np.dtype) else column.array
+    
+    def _prune_pending(self, pending: pd.DataFrame, new_rows: pd.DataFrame,
+                       previous: pd.DataFrame) -> pd.DataFrame:
+        """与全量加载一致地清理仍未配对的盘前记录
+        
+        已有对应记录的重复盘前记录直接丢弃；上次读取后仍在等待（previous 中）且早于最新日期的记录
+        不会再等到盘后数据，提示后丢弃。这次新读到的记录至少等到下次增量读取，
+        补写更早日期时盘后记录可能还没写完。
+        """
+        if pending.empty:
+            return pending
+        keys = ['Date', 'Strategy']
+        existing = self.df.iloc[self.date_index.rows_from(pending['Date'].min())][keys]
+        if not existing.empty:
+            matched = pending[keys].merge(existing, how='left', indicator=True)['_merge'] == 'both'
+            pending = pending[~matched.to_numpy()]
+        
+        latest = [date for date in (self.date_index.last(), new_rows['Date'].max()) if pd.notna(date)]
+        if not latest or previous.empty:
+            return pending
+        waited = pending[keys].merge(previous[keys].drop_duplicates(), how='left', indicator=True)['_merge'] == 'both'
+        stale = (pending['Date'] < max(latest)).to_numpy() & waited.to_numpy()
+        for date, strategy in pending.loc[stale, keys].itertuples(index=False):
+            print(f"警告: {date} 的策略 {strategy} 缺少盘后数据")
+        return pending[~stale]
+    
+    def rows_on(self, date) -> pd.DataFrame:
+        """指定日期的全部记录
+        
+        通过日期索引直接切片，不扫描整张表；没有该日期时返回空表。
+        返回的是 df 的切片，需要修改时请先 copy()。
+        """
+        rows = self.date_index.rows(date)
+        return self.df.iloc[rows] if rows is not None else self.df.iloc[0:0]
+    
     def _calculate_daily_metrics(self):
         """计算当日指标"""
         if self.df.empty:
             self._init_empty_metrics()
             return
-            
-        latest_date = self.df['Date'].max()
-        latest_data = self.df[self.df['Date'] == latest_date]
-        
-        # 计算当日组合收益率（按市值加权）
-        self.daily_return = (
-            latest_data['MarketValue_close'] * latest_data['收益率']
-        ).sum() / latest_data['MarketValue_close'].sum()
-
-        # 计算当日组合盈亏金额（元）
-        self.daily_profit_loss = (
-            latest_data['MarketValue_close'] * latest_data['收益率']
-        ).sum().round(2)
-        
-        # 计算历史累计收益率
-        historical_returns = self.df.groupby('Date').apply(
-            lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-        )
         
-        # 计算组合净值
-        self.daily_net_value = (1 + historical_returns).cumprod()
-        
-        # 计算回撤
-        self.max_drawdown, self.current_drawdown = self.calculate_drawdown(self.daily_net_value)
+        self.date_index = DateIndex()
+        self.date_index.build(self.df['Date'])
+        self.nav_store = NavStore()
+        self.panel = StrategyPanel()
+        self._extend_daily_metrics(self.date_index.first())
         
         # 准备显示数据
         self.display_df = self._prepare_display_data()
     
+    def _extend_daily_metrics(self, from_date):
+        """从 from_date 起重新计算组合收益率、净值和回撤，之前的结果保持不变"""
+        tail = self.df.iloc[self.date_index.rows_from(from_date)]
+        self.nav_store.update(tail)
+        self._sync_daily_metrics(self.panel.update(tail))
+    
+    def _sync_daily_metrics(self, start: int = 0):
+        """从组合净值序列读取最新一天的指标，面板第 start 行起的数据有变化
+        
+        之前的行已处理过时，各策略和风格的回撤状态只从 start 行继续计算。
+        """
+        store = self.nav_store
+        # 当日组合收益率（按市值加权）和盈亏金额（元）
+        self.daily_return = store.returns[-1]
+        self.daily_profit_loss = np.round(store.profit_loss[-1], 2)
+        # 组合净值和回撤
+        self.daily_net_value = store.to_series()
+        self.max_drawdown, self.current_drawdown = store.drawdown_at(len(store) - 1)
+        # 各策略的净值和回撤
+        if start != self._strategy_state.rows:
+            self._strategy_state = DrawdownState()
+        rows = slice(self._strategy_state.rows, None)
+        self._strategy_state.extend(self.panel.returns[rows], self.panel.dates[rows], self.panel.strategies)
+        self.strategy_drawdowns = self._strategy_state.summary()
+        self._extend_style_metrics(start)
+    
+    def _reload_benchmarks(self):
+        """cubevalue.txt 被修改后重新生成沪深300数据和风格指标（组合创建时间可能变化）"""
+        self.csi300_data = self._load_csi300_data()
+        self._update_style_metrics()
+        self.version += 1
+        key = self._cache_key()
+        if key is not None:
+            self._save_cache(key, background=True)
+    
+    def _refresh_style_cohort(self):
+        """"三年以内"的组合有变化（某个组合创建满三年）时重新计算风格指标"""
+        if self.benchmarks.created_within(THREE_YEAR_DAYS) == self._style_cohort:
+            return
+        three_year = self.style_index.three_year
+        self._update_style_metrics()
+        if self.style_index.three_year != three_year:
+            self.version += 1
+    
+    def _update_style_metrics(self):
+        """重新计算全部日期的风格指标"""
+        self._style_cohort = self.benchmarks.created_within(THREE_YEAR_DAYS)
+        self.style_index = StyleIndex(self.STRATEGY_STYLES, self._style_cohort)
+        self._style_nav_state = DrawdownState()
+        self._first_style_state = DrawdownState()
+        self._style_nav_buffer = None
+        self.style_allocation = None
+        self._style_rows = 0
+        self._extend_style_metrics(0)
+    
+    def _extend_style_metrics(self, start: int):
+        """计算面板第 start 行起各风格按市值加权的收益率、净值和回撤
+        
+        两种分组（含有该风格的全部策略 / 只按第一风格）的归属矩阵拼在一起，
+        与 日期×策略 的收益率和市值矩阵做一次矩阵乘法得到所有风格的结果。
+        start 之前的行已计算过时从上次的净值和回撤状态继续，否则全部重新计算。
+        """
+        if start != self._style_rows:
+            self._update_style_metrics()
+            return
+        all_styles = self.style_index.strategies_of
+        first_styles = self.style_index.first_style_groups
+        incidence = np.hstack([
+            StyleIndex.incidence(self.panel.strategies, all_styles),
+            StyleIndex.incidence(self.panel.strategies, first_styles)
+        ])
+        rows = slice(start, None)
+        returns, _ = style_returns(self.panel.returns[rows], self.panel.market_value[rows], incidence)
+        
+        dates = self.panel.dates[rows]
+        nav = self._style_nav_state.extend(returns[:, :len(all_styles)], dates, list(all_styles))
+        if self._style_nav_buffer is None:
+            self._style_nav_buffer = RowBuffer(nav)
+        else:
+            nav = self._style_nav_buffer.append(nav)
+        self.style_nav = pd.DataFrame(  # 日期×风格 净值
+            nav, index=pd.DatetimeIndex(self.panel.dates, name='Date'), columns=list(all_styles), copy=False
+        )
+        self._first_style_state.extend(returns[:, len(all_styles):], dates, list(first_styles))
+        self.first_style_drawdowns = self._first_style_state.summary()
+        # 风格饼图使用的 日期×第一风格 总市值和持仓市值
+        if self.style_allocation is None:
+            self.style_allocation = StyleAllocation(self.panel, self.style_index)
+        else:
+            self.style_allocation.extend(self.panel)
+        self._style_rows = len(self.panel.dates)
+    
     def _init_empty_metrics(self):
         """初始化空指标"""
         self.df = pd.DataFrame(columns=['Date', 'Strategy', 'MarketValue_pre', 'MarketValue_close', 'PositionValue', '收益率', '净值'])
         self.daily_return = None
         self.daily_net_value = pd.Series([1.0])
+        self.date_index = DateIndex()
+        self.nav_store = NavStore()
+        self.panel = StrategyPanel()
+        self._strategy_state = DrawdownState()
+        self.strategy_drawdowns = self._strategy_state.summary()
+        self._update_style_metrics()
         self.max_drawdown = 0.0
         self.current_drawdown = 0.0
         self.display_df = pd.DataFrame(columns=['策略', '最大回撤', '当前回撤'])
         self.daily_profit_loss = None  # 新增 daily_profit_loss 属性
+        self._offset = 0
+        self._prefix = None
+        self._pending_pre = pd.DataFrame(columns=RAW_COLUMNS)
     
     def calculate_drawdown(self, nav_series: pd.Series) -> Tuple[float, float]:
         """计算最大回撤和当前回撤"""
@@ -145,7 +655,7 @@ class DataProcessor:
     def calculate_daily_profit_loss(self, selected_date):
         # 假设已经有一个方法来计算每日盈亏
         # 这里只是一个示例，实际计算逻辑需要根据具体需求实现
-        selected_data = self.df[self.df['Date'] == selected_date]
+        selected_data = self.rows_on(selected_date)
         if not selected_data.empty:
             self.daily_profit_loss = (
                 (selected_data['MarketValue_close'] * selected_data['收益率']).sum()
@@ -155,33 +665,46 @@ class DataProcessor:
     
     def _prepare_display_data(self) -> pd.DataFrame:
         """准备显示用的数据框"""
-        latest_date = self.df['Date'].max()
-        latest_data = self.df[self.df['Date'] == latest_date]
-        strategies = latest_data['Strategy'].unique()
-        
-        display_data = []
-        for strategy in strategies:
-            strategy_data = self.df[self.df['Strategy'] == strategy]
-            latest_strategy_data = latest_data[latest_data['Strategy'] == strategy].iloc[0]
-            strategy_nav = (1 + strategy_data['收益率']).cumprod()
-            max_dd, curr_dd = self.calculate_drawdown(strategy_nav)
-            total_days = (strategy_data['Date'].max() - strategy_data['Date'].min()).days
-            total_return = strategy_nav.iloc[-1] - 1
-            annual_return = (1 + total_return) ** (365 / total_days) - 1 if total_days > 0 else 0.0
-            
-            display_data.append({
-                '策略': self.get_strategy_alias(strategy),
-                '年化收益率': annual_return,
-                '最大回撤': max_dd,
-                '当前回撤': curr_dd,
-                '总市值': latest_strategy_data['MarketValue_close'],
-                '持仓市值': latest_strategy_data['PositionValue'],
-                '仓位': latest_strategy_data['PositionValue'] / latest_strategy_data['MarketValue_close'] if latest_strategy_data['MarketValue_close'] > 0 else 0
-            })
-        
-        df = pd.DataFrame(display_data)
+        df = self._latest_strategy_stats(from_first_nav=False)[
+            ['策略', '年化收益率', '最大回撤', '当前回撤', '总市值', '持仓市值', '仓位']
+        ]
         return df.sort_values('总市值', ascending=False)  # 按总市值降序排序
     
+    def _latest_strategy_stats(self, from_first_nav: bool) -> pd.DataFrame:
+        """最新日期持有的各策略的市值、仓位、年化收益率和回撤
+        
+        回撤和净值取自 strategy_drawdowns，不再逐个策略重新累乘。
+        from_first_nav 含义见 drawdown.annual_return。
+        """
+        latest_data = self.rows_on(self.date_index.last()).drop_duplicates('Strategy')
+        stats = self.strategy_drawdowns.reindex(latest_data['Strategy'])
+        
+        market_value = latest_data['MarketValue_close'].to_numpy(dtype=float)
+        position_value = latest_data['PositionValue'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_ratio = np.where(market_value > 0, position_value / market_value, 0)
+        
+        return pd.DataFrame({
+            '策略': latest_data['Strategy'].map(self.get_strategy_alias).to_numpy(),
+            '总市值': market_value,
+            '持仓市值': position_value,
+            '仓位': position_ratio,
+            '年化收益率': annual_return(stats, from_first_nav).to_numpy(),
+            '最大回撤': stats['max_drawdown'].to_numpy(),
+            '当前回撤': stats['current_drawdown'].to_numpy()
+        })
+    
+    def snapshot(self, date) -> Optional[DaySnapshot]:
+        """指定日期的 DaySnapshot，该日期没有数据时返回 None
+        
+        按 (日期, 数据版本号) 缓存，同一日期的多个回调只计算一次，数据更新后自动失效。
+        """
+        i = self.nav_store.exact(date)
+        if i is None:
+            return None
+        key = (int(self.nav_store.dates[i].view('int64')), self.version)
+        return self._snapshots.get_or_compute(key, lambda: DaySnapshot(self, i))
+    
     def get_strategy_alias(self, strategy: str) -> str:
         """获取策略别名"""
         return self.strategy_aliases.get(strategy, strategy)
@@ -190,8 +713,7 @@ class DataProcessor:
         """初始化所有图表"""
         try:
             # 获取最新日期数据
-            latest_date = self.df['Date'].max()
-            latest_data = self.df[self.df['Date'] == latest_date]
+            latest_data = self.rows_on(self.date_index.last()).copy()
 
             # 计算每日总市值，确保不重复计算
             daily_total_market_value = latest_data.groupby('Date')['MarketValue_close'].sum().reset_index()
@@ -223,31 +745,8 @@ class DataProcessor:
             )
 
             # 3. 风格净值趋势图
-            style_data = []
-            # 从 STRATEGY_STYLES 中获取风格列表
-            all_styles = set()
-            for v in self.STRATEGY_STYLES.values():
-                if 'styles' in v:
-                    all_styles.update(v['styles'])
-            for style in all_styles:
-                style_strategies = [k for k, v in self.STRATEGY_STYLES.items() 
-                                  if 'styles' in v and style in v['styles']]
-                if style_strategies:
-                    style_data_temp = self.df[
-                        self.df['Strategy'].isin(style_strategies)
-                    ].copy()
-                    style_data_temp['风格'] = style
-                    style_data.append(style_data_temp)
-
-            if style_data:
-                style_df = pd.concat(style_data)
-                style_grouped = style_df.groupby(['Date', '风格']).apply(
-                    lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-                ).reset_index(name='收益率')
-                style_grouped['净值'] = style_grouped.groupby('风格')['收益率'].transform(
-                    lambda x: (1 + x).cumprod()
-                )
-
+            style_grouped = self.get_style_nav()
+            if not style_grouped.empty:
                 self.fig_style_nav = px.line(
                     style_grouped,
                     x='Date',
@@ -271,12 +770,9 @@ class DataProcessor:
             self.fig_nav.update_layout(**self.CHART_LAYOUT, showlegend=False)
 
             # 5. 总净值趋势图
-            total_returns = self.df.groupby('Date').apply(
-                lambda x: (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-            )
             total_nav = pd.DataFrame({
-                'Date': total_returns.index,
-                '总净值': (1 + total_returns).cumprod()
+                'Date': self.nav_store.dates,
+                '总净值': self.nav_store.nav
             })
             self.fig_total = px.line(total_nav, x='Date', y='总净值')
             self.fig_total.update_layout(**self.CHART_LAYOUT, showlegend=False)
@@ -287,85 +783,58 @@ class DataProcessor:
     
     def get_daily_details(self, date) -> pd.DataFrame:
         """获取指定日期的各策略盈亏详情"""
-        date_data = self.df[self.df['Date'] == date].copy()
-        if date_data.empty:
+        snapshot = self.snapshot(date)
+        if snapshot is None:
             return pd.DataFrame()
             
-        date_data['Strategy_Alias'] = date_data['Strategy'].map(self.get_strategy_alias)
-        date_data['盈亏金额'] = (date_data['MarketValue_close'] - date_data['MarketValue_pre']).round(2)
-        
+        date_data = snapshot.rows
         result = pd.DataFrame({
             '策略': date_data['Strategy_Alias'],
             '市值': date_data['MarketValue_close'].round(2),
             '收益率': date_data['收益率'],
-            '盈亏金额': date_data['盈亏金额']
+            '盈亏金额': (date_data['MarketValue_close'] - date_data['MarketValue_pre']).round(2)
         })
         
         return result.sort_values('盈亏金额', ascending=False)
     
-    def get_nav_contribution(self) -> pd.DataFrame:
-        """计算各策略对整体收益的贡献度"""
-        contributions = []
-        total_market_value = self.df.groupby('Date')['MarketValue_close'].sum()
-        
-        for strategy in self.df['Strategy'].unique():
-            strategy_data = self.df[self.df['Strategy'] == strategy].copy()
-            strategy_data['weight'] = strategy_data['MarketValue_close'] / \
-                                    total_market_value[strategy_data['Date']].values
-            strategy_data['weighted_return'] = strategy_data['weight'] * strategy_data['收益率']
-            contribution = (1 + strategy_data['weighted_return']).cumprod().iloc[-1] - 1
-            
-            contributions.append({
-                '策略': self.get_strategy_alias(strategy),
-                '净值贡献': contribution
-            })
+    def get_nav_contribution(self, date=None) -> pd.DataFrame:
+        """计算各策略截至 date（默认最新日期）对整体收益的贡献度"""
+        growth, first_row = self._contribution_matrix()
+        i = len(self.nav_store) - 1 if date is None else self.nav_store.locate(date)
+        if i < 0:
+            return pd.DataFrame(columns=['策略', '净值贡献'])
         
-        result = pd.DataFrame(contributions)
+        # 只列出截至该日已经出现过的策略
+        columns = np.flatnonzero(first_row <= i)
+        result = pd.DataFrame({
+            '策略': [self.get_strategy_alias(s) for s in self.panel.strategies[columns]],
+            '净值贡献': growth[i, columns] - 1
+        })
         return result.sort_values('净值贡献', ascending=False)
     
+    def _contribution_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """各策略按市值权重加权收益率的累计乘积（日期×策略）
+        
+        第 i 行减 1 即为截至第 i 个交易日的净值贡献。矩阵一次算出所有日期，
+        并按数据版本号缓存，数据更新前的查询都直接取行。
+        """
+        if self._contribution is None or self._contribution[0] != self.version:
+            market_value = self.panel.market_value
+            present = ~np.isnan(self.panel.returns)
+            total_market_value = np.nansum(market_value, axis=1, keepdims=True)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                weighted_return = market_value / total_market_value * self.panel.returns
+            growth = np.cumprod(np.where(np.isnan(weighted_return), 1.0, 1 + weighted_return), axis=0)
+            first_row = np.full(present.shape[1], len(present))
+            seen = present.any(axis=0)
+            if seen.any():
+                first_row[seen] = present[:, seen].argmax(axis=0)
+            self._contribution = (self.version, growth, first_row)
+        return self._contribution[1], self._contribution[2]
+    
     def update_drawdown_analysis(self) -> None:
         """更新回撤分析，包含年化收益率计算"""
-        strategies_data = []
-        
-        # 获取最新日期的数据
-        latest_date = self.df['Date'].max()
-        latest_data = self.df[self.df['Date'] == latest_date]
-
-        # 获取当前持有的策略
-        current_strategies = latest_data['Strategy'].unique()  # 只获取最新日期中出现的策略
-
-        for strategy in current_strategies:
-            strategy_data = self.df[self.df['Strategy'] == strategy].sort_values('Date')
-            strategy_data.set_index('Date', inplace=True)
-            
-            # 获取最新的市值数据
-            latest_strategy_data = latest_data[latest_data['Strategy'] == strategy].iloc[0]
-            
-            # 计算净值序列
-            nav_series = (1 + strategy_data['收益率']).cumprod()
-            
-            # 计算年化收益率
-            total_days = (nav_series.index.max() - nav_series.index.min()).days
-            total_return = nav_series.iloc[-1] / nav_series.iloc[0] - 1
-            annual_return = float((1 + total_return) ** (365 / total_days) - 1) if total_days > 0 else 0.0
-            
-            # 计算最大回撤和当前回撤
-            running_max = nav_series.expanding().max()
-            drawdown = nav_series / running_max - 1
-            max_dd = float(drawdown.min())
-            curr_dd = float(drawdown.iloc[-1])
-            
-            strategies_data.append({
-                '策略': self.get_strategy_alias(strategy),
-                '总市值': latest_strategy_data['MarketValue_close'],
-                '持仓市值': latest_strategy_data['PositionValue'],
-                '仓位': latest_strategy_data['PositionValue'] / latest_strategy_data['MarketValue_close'] if latest_strategy_data['MarketValue_close'] > 0 else 0,
-                '年化收益率': annual_return,
-                '最大回撤': max_dd,
-                '当前回撤': curr_dd
-            })
-        
-        self.display_df = pd.DataFrame(strategies_data)
+        self.display_df = self._latest_strategy_stats(from_first_nav=True)
         self.display_df = self.display_df.sort_values('总市值', ascending=False)  # 按总市值降序排序
     
     def calculate_annual_return(self, nav_series: pd.Series) -> float:
@@ -375,119 +844,52 @@ class DataProcessor:
         annual_return = (1 + total_return) ** (365 / total_days) - 1 if total_days > 0 else 0
         return float(annual_return)  # 确保返回 float 类型
 
+    def get_style_nav(self) -> pd.DataFrame:
+        """各风格净值的长表（Date、风格、净值），只包含风格内有策略数据的日期"""
+        style_nav = self.style_nav.rename_axis(columns='风格').stack().dropna()
+        return style_nav.reset_index(name='净值').sort_values(['Date', '风格'], ignore_index=True)
+    
     def get_style_drawdowns(self) -> pd.DataFrame:
         """计算各个风格的回撤指标和年化收益率（只考虑第一风格）"""
-        style_data = []
-        
-        # 获取最新日期的数据
-        latest_date = self.df['Date'].max()
-        latest_data = self.df[self.df['Date'] == latest_date]
+        # 获取最新日期的数据，按第一风格汇总市值
+        latest_data = self.rows_on(self.date_index.last())
         total_market_value = latest_data['MarketValue_close'].sum()  # 计算总市值
+        first_style = latest_data['Strategy'].map(self.style_index.first_style_of)
+        latest_style = latest_data[['MarketValue_close', 'PositionValue']].groupby(first_style).sum()
         
-        # 获取所有策略的第一个风格
-        all_styles = set()
-        current_date = pd.Timestamp.now()  # 使用当前日期
-        with open('cubevalue.txt', 'r') as f:
-            cubevalue = json.load(f)
-            
-        # 首次遍历：收集所有风格，包括"三年以内"
-        three_year_strategies = []  # 存储三年内的雪球策略
-        for strategy_id, strategy_info in self.STRATEGY_STYLES.items():
-            if not ('styles' in strategy_info and strategy_info['styles']):
-                continue
-                
-            if '雪球' in strategy_info['styles']:
-                if strategy_id in cubevalue and 'create_time' in cubevalue[strategy_id]:
-                    create_time = pd.Timestamp(cubevalue[strategy_id]['create_time'])
-                    days_diff = (current_date - create_time).days
-                    if days_diff <= 1095:  # 3年 * 365天
-                        all_styles.add('三年以内')
-                        three_year_strategies.append(strategy_id)
-                        continue
-            
-            all_styles.add(strategy_info['styles'][0])
+        # 净值和回撤取自风格矩阵
+        stats = self.first_style_drawdowns
+        latest_style = latest_style.reindex(stats.index, fill_value=0)
+        style_total_value = latest_style['MarketValue_close'].to_numpy(dtype=float)
         
-        # 对每个风格计算指标
-        style_data = []
-        for style in all_styles:
-            if style == '三年以内':
-                style_strategies = three_year_strategies
-            else:
-                # 对于其他风格，只选择不在three_year_strategies中的策略
-                style_strategies = [k for k, v in self.STRATEGY_STYLES.items() 
-                                if 'styles' in v and v['styles'] and v['styles'][0] == style
-                                and k not in three_year_strategies]  # 排除三年内的雪球策略
-            
-            if style_strategies:
-                # 获取该风格的所有策略数据
-                style_df = self.df[self.df['Strategy'].isin(style_strategies)].copy()
-                
-                # 获取该风格的最新市值数据
-                latest_style_data = latest_data[latest_data['Strategy'].isin(style_strategies)]
-                style_total_value = latest_style_data['MarketValue_close'].sum()
-                style_position_value = latest_style_data['PositionValue'].sum()
-                style_ratio = style_total_value / total_market_value if total_market_value > 0 else 0
-                
-                if not style_df.empty:
-                    # 按日期分组计算风格收益率（按市值加权）
-                    daily_data = style_df.groupby('Date').apply(
-                        lambda x: pd.Series({
-                            'return': (x['MarketValue_close'] * x['收益率']).sum() / x['MarketValue_close'].sum()
-                        })
-                    ).reset_index()
-                    
-                    # 计算风格净值序列
-                    daily_data['nav'] = (1 + daily_data['return']).cumprod()
-                    
-                    # 计算年化收益率
-                    total_days = (daily_data['Date'].max() - daily_data['Date'].min()).days
-                    total_return = daily_data['nav'].iloc[-1] - 1
-                    annual_return = float((1 + total_return) ** (365 / total_days) - 1) if total_days > 0 else 0.0
-                    
-                    # 计算最大回撤和当前回撤
-                    nav_series = daily_data['nav']
-                    running_max = nav_series.expanding().max()
-                    drawdown = nav_series / running_max - 1
-                    max_dd = float(drawdown.min())
-                    curr_dd = float(drawdown.iloc[-1])
-                    
-                    style_data.append({
-                        '风格': style,
-                        '总市值': style_total_value,
-                        '持仓市值': style_position_value,
-                        '配置比例': style_ratio,
-                        '年化收益率': annual_return,
-                        '最大回撤': max_dd,
-                        '当前回撤': curr_dd
-                    })
-        
-        # 转换为DataFrame并按总市值降序排序
-        df = pd.DataFrame(style_data)
+        df = pd.DataFrame({
+            '风格': stats.index,
+            '总市值': style_total_value,
+            '持仓市值': latest_style['PositionValue'].to_numpy(dtype=float),
+            '配置比例': style_total_value / total_market_value if total_market_value > 0 else 0.0,
+            '年化收益率': annual_return(stats).to_numpy(),
+            '最大回撤': stats['max_drawdown'].to_numpy(),
+            '当前回撤': stats['current_drawdown'].to_numpy()
+        })
+        # 按总市值降序排序
         return df.sort_values('总市值', ascending=False)
 
     def _load_csi300_data(self) -> pd.DataFrame:
         """加载沪深300指数数据"""
         try:
-            # 读取cubevalue.txt文件
-            with open('cubevalue.txt', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 直接获取CSI300的nav_series数据
-            csi300_data = data.get('CSI300', {}).get('nav_series', {})
+            # cubevalue.txt 中 CSI300 的净值序列，已按日期排序
+            dates, values = self.benchmarks.series('CSI300')
             
-            if not csi300_data:
+            if len(dates) == 0:
                 print("未找到沪深300指数数据")
                 return pd.DataFrame()
             
             # 转换为DataFrame
             csi300_df = pd.DataFrame({
-                'Date': pd.to_datetime(list(csi300_data.keys())),
-                '净值': list(csi300_data.values())
+                'Date': dates,
+                '净值': values
             })
             
-            # 按日期排序
-            csi300_df = csi300_df.sort_values('Date')
-            
             # 仅保留与策略数据相同时间范围内的数据
             if not self.df.empty:
                 first_strategy_date = self.df['Date'].min()
@@ -508,6 +910,27 @@ class DataProcessor:
             print(f"加载沪深300数据时出错: {str(e)}")
             return pd.DataFrame()
     
+    def aligned_benchmark(self, name: str = 'CSI300') -> AlignedSeries:
+        """组合净值与 cubevalue.txt 中 name 的净值在组合日期上对齐的序列，按数据版本号缓存
+        
+        与 csi300_data 相同，基准只保留组合第一个交易日及之后的数据，并以其中第一天的净值归一化为 1。
+        """
+        cached = self._aligned.get(name)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        
+        dates, values = self.benchmarks.series(name)
+        store = self.nav_store
+        if len(store):
+            keep = dates >= store.dates[0]
+            dates, values = dates[keep], values[keep]
+        if len(values):
+            values = values / values[0]
+        aligned = AlignedSeries(store.dates, store.nav, dates, values,
+                                np.timedelta64(BENCHMARK_ASOF_TOLERANCE_DAYS, 'D'))
+        self._aligned[name] = (self.version, aligned)
+        return aligned
+    
     def get_csi300_data(self, start_date=None, end_date=None) -> pd.DataFrame:
         """获取指定时间范围内的沪深300数据"""
         if self.csi300_data.empty:
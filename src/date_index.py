@@ -0,0 +1,74 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .nav_store import to_datetime64
+
+
+class DateIndex:
+    """按日期升序排列的明细表中每个日期所在的行区间
+
+    同一日期的记录在表中连续存放，date -> (start, stop) 保存在字典里，
+    按日期取当天的记录只需一次字典查找和一次切片，不需要扫描整张表。
+    """
+
+    def __init__(self):
+        self.dates = np.array([], dtype='datetime64[ns]')
+        self._rows = {}  # 日期（int64 纳秒）-> (start, stop)
+        self.stop = 0  # 已登记的总行数
+
+    def __len__(self):
+        return len(self.dates)
+
+    def build(self, dates):
+        """根据已按日期排好序的日期列重建索引"""
+        self.dates = np.array([], dtype='datetime64[ns]')
+        self._rows = {}
+        self.stop = 0
+        self.extend(dates, 0)
+
+    def extend(self, dates, offset: int):
+        """登记追加在表尾、从第 offset 行开始的记录
+
+        dates 需按升序排列且不早于已有的最后一个日期；
+        与最后一个日期相同的记录会并入该日期的区间。
+        """
+        values = np.asarray(dates, dtype='datetime64[ns]')
+        if len(values) == 0:
+            return
+        unique, starts = np.unique(values, return_index=True)
+        stops = np.append(starts[1:], len(values))
+        for date, start, stop in zip(unique.view('int64'), starts + offset, stops + offset):
+            start = self._rows.get(int(date), (int(start), None))[0]
+            self._rows[int(date)] = (start, int(stop))
+        if len(self.dates) and unique[0] == self.dates[-1]:
+            unique = unique[1:]
+        self.dates = np.concatenate([self.dates, unique])
+        self.stop = offset + len(values)
+
+    def rows(self, date) -> Optional[slice]:
+        """date 当天记录所在的行区间，没有该日期时返回 None"""
+        try:
+            key = int(to_datetime64(date).view('int64'))
+        except (TypeError, ValueError):
+            return None
+        bounds = self._rows.get(key)
+        return slice(*bounds) if bounds else None
+
+    def rows_from(self, date) -> slice:
+        """不早于 date 的全部记录所在的行区间，date 为空（NaT）时为空区间"""
+        if pd.isna(date):
+            return slice(self.stop, None)
+        i = int(np.searchsorted(self.dates, to_datetime64(date), side='left'))
+        if i == len(self.dates):
+            return slice(self.stop, None)
+        return slice(self._rows[int(self.dates[i].view('int64'))][0], None)
+
+    def first(self) -> Optional[pd.Timestamp]:
+        """最早的日期，索引为空时返回 None"""
+        return pd.Timestamp(self.dates[0]) if len(self.dates) else None
+
+    def last(self) -> Optional[pd.Timestamp]:
+        """最新的日期，索引为空时返回 None"""
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
@@ -0,0 +1,107 @@
+import warnings
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def lttb_matrix(x: np.ndarray, values: np.ndarray, threshold: int) -> np.ndarray:
+    """对共用 x 的多条序列同时做 Largest-Triangle-Three-Buckets 降采样
+
+    x 为递增的一维数组，values 为 len(x)×序列数 的矩阵（NaN 表示该序列在此处没有数据）。
+    返回 threshold×序列数 的行号矩阵；所有序列共用同一组分桶，每个桶内按列各选一个点，
+    逐桶的计算对所有列一次完成。
+    """
+    n, m = values.shape
+    if threshold >= n or threshold < 3:
+        return np.repeat(np.arange(n)[:, None], m, axis=1)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty((threshold, m), dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    columns = np.arange(m)
+    a = np.zeros(m, dtype=np.int64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # 全为 NaN 的桶
+        for i in range(threshold - 2):
+            start = int(i * every) + 1
+            end = int((i + 1) * every) + 1
+            next_end = min(int((i + 2) * every) + 1, n)
+            avg_x = x[end:next_end].mean()
+            avg_y = np.nanmean(values[end:next_end], axis=0)
+
+            x_a = x[a]
+            y_a = values[a, columns]
+            # 上一个点或下一个桶没有数据时（序列尚未开始或已经结束），用另一端代替
+            y_a = np.where(np.isnan(y_a), avg_y, y_a)
+            avg_y = np.where(np.isnan(avg_y), y_a, avg_y)
+
+            area = np.abs((x_a - avg_x) * (values[start:end] - y_a)
+                          - (x_a - x[start:end, None]) * (avg_y - y_a))
+            a = np.argmax(np.where(np.isnan(area), -1.0, area), axis=0) + start
+            selected[i + 1] = a
+    return selected
+
+
+def downsample_series(x: np.ndarray, values: np.ndarray, threshold: int) -> List[np.ndarray]:
+    """每条序列保留的行号（已排序，不含 NaN），总是保留每条序列的第一个和最后一个有效点"""
+    valid = ~np.isnan(values)
+    keep = np.zeros_like(valid)
+    columns = np.arange(values.shape[1])
+    keep[lttb_matrix(x, values, threshold), columns] = True
+    has_data = valid.any(axis=0)
+    keep[valid.argmax(axis=0)[has_data], columns[has_data]] = True
+    keep[len(valid) - 1 - valid[::-1].argmax(axis=0)[has_data], columns[has_data]] = True
+    keep &= valid
+    return [np.flatnonzero(keep[:, j]) for j in columns]
+
+
+def _as_datetime64(x) -> np.ndarray:
+    x = np.asarray(x)
+    if x.dtype.kind != 'M':
+        x = pd.to_datetime(x).to_numpy()
+    return x.astype('datetime64[ns]')
+
+
+def _visible_rows(grid: np.ndarray, x_range: Optional[Sequence]) -> slice:
+    """x_range 内的行，两端各多保留一个点使折线延伸到坐标轴边缘"""
+    if x_range is None:
+        return slice(0, len(grid))
+    lo = np.searchsorted(grid, np.datetime64(pd.Timestamp(x_range[0]), 'ns'), side='left')
+    hi = np.searchsorted(grid, np.datetime64(pd.Timestamp(x_range[1]), 'ns'), side='right')
+    return slice(max(lo - 1, 0), min(hi + 1, len(grid)))
+
+
+def downsample_figure(fig: go.Figure, threshold: int, x_range: Optional[Tuple] = None) -> dict:
+    """把日期为 x 的折线图转为 Scattergl，并按 LTTB 把每条线降采样到约 threshold 个点
+
+    只处理 x_range（默认为全部日期）内的数据，点数不超过 threshold 时保留全部原始数据。
+    返回可直接作为 dcc.Graph figure 的字典；x_range 不为空时固定 x 轴范围。
+    """
+    traces = [trace.to_plotly_json() for trace in fig.data]
+    layout = fig.layout.to_plotly_json()
+    if x_range is not None:
+        layout['xaxis'] = {**layout.get('xaxis', {}), 'range': list(x_range), 'autorange': False}
+    if not traces:
+        return {'data': [], 'layout': layout}
+
+    xs = [_as_datetime64(trace['x']) for trace in traces]
+    grid = np.unique(np.concatenate(xs))
+    grid = grid[_visible_rows(grid, x_range)]
+    values = np.full((len(grid), len(traces)), np.nan)
+    if len(grid):
+        for j, (x, trace) in enumerate(zip(xs, traces)):
+            y = np.asarray(trace['y'], dtype=float)
+            inside = (x >= grid[0]) & (x <= grid[-1])
+            values[np.searchsorted(grid, x[inside]), j] = y[inside]
+
+    offsets = (grid - grid[:1]).astype(np.int64).astype(float)
+    data = []
+    for j, (trace, rows) in enumerate(zip(traces, downsample_series(offsets, values, threshold))):
+        # Scattergl 没有 orientation 属性
+        trace = {key: value for key, value in trace.items() if key != 'orientation'}
+        trace.update(type='scattergl', x=grid[rows], y=values[rows, j])
+        data.append(trace)
+    return {'data': data, 'layout': layout}
@@ -0,0 +1,122 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def drawdown_matrices(returns: np.ndarray, start_nav: np.ndarray = None,
+                      start_peak: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """按列批量计算净值、历史最高净值和回撤序列
+
+    returns 为 日期×策略（或风格）的收益率矩阵，NaN 表示当天没有该列的数据。
+    每列的净值只在有数据的日期上累乘，没有数据的位置结果均为 NaN。
+    start_nav、start_peak 为之前各行累乘到最后一行的净值（还没有数据时为 1）和最高净值，
+    传入时从这一状态继续，结果与把之前的行一起计算时逐位相同。
+    """
+    present = ~np.isnan(returns)
+    growth = np.where(present, 1 + returns, 1.0)
+    if start_nav is not None and len(growth):
+        growth[0] = start_nav * growth[0]
+    nav = np.cumprod(growth, axis=0)
+    nav[~present] = np.nan
+    if start_peak is not None:
+        peak = np.fmax.accumulate(np.vstack([start_peak, nav]), axis=0)[1:]
+    else:
+        peak = np.fmax.accumulate(nav, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = nav / peak - 1
+    return nav, peak, drawdown
+
+
+class DrawdownState:
+    """每列截至最后一行的首末日期、首末净值、最高净值、最大回撤和当前回撤
+
+    按日期顺序分批用 extend 追加收益率矩阵的行，每次只处理新增的行；
+    逐行累乘和取最大值的顺序与一次计算全部行相同，summary() 与 drawdown_summary 的结果一致。
+    """
+
+    def __init__(self):
+        self.rows = 0  # 已处理的行数
+        self.labels = np.array([], dtype=object)
+        self.first_date = np.array([], dtype='datetime64[ns]')
+        self.last_date = np.array([], dtype='datetime64[ns]')
+        self.nav_first = np.array([])
+        self.nav_last = np.array([])
+        self.max_drawdown = np.array([])
+        self.current_drawdown = np.array([])
+        self._product = np.array([])  # 累乘到最后一行的净值，还没有数据的列为 1
+        self._peak = np.array([])  # 截至最后一行的最高净值
+
+    def extend(self, returns: np.ndarray, dates: np.ndarray, labels: Sequence) -> np.ndarray:
+        """追加 returns 的各行（日期晚于已处理的行），返回这些行的净值矩阵
+
+        labels 为 returns 的列，需以之前的列开头，新出现的列追加在后面。
+        """
+        added = len(labels) - len(self.labels)
+        if added > 0:
+            self.labels = np.concatenate([self.labels, np.asarray(labels, dtype=object)[len(self.labels):]])
+            for name in ('first_date', 'last_date'):
+                setattr(self, name, np.append(getattr(self, name), np.full(added, np.datetime64('NaT', 'ns'))))
+            for name in ('nav_first', 'nav_last', 'max_drawdown', 'current_drawdown', '_peak'):
+                setattr(self, name, np.append(getattr(self, name), np.full(added, np.nan)))
+            self._product = np.append(self._product, np.ones(added))
+
+        nav, peak, drawdown = drawdown_matrices(returns, self._product, self._peak)
+        self.rows += len(returns)
+        if not len(returns):
+            return nav
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        last = len(returns) - 1
+
+        # 累乘状态取每列最后一个有收益率的行
+        has_return = ~np.isnan(returns)
+        columns = np.flatnonzero(has_return.any(axis=0))
+        rows = last - has_return[::-1, columns].argmax(axis=0)
+        self._product[columns] = nav[rows, columns]
+        self._peak = peak[last]
+
+        present = ~np.isnan(nav)
+        columns = np.flatnonzero(present.any(axis=0))
+        first_row = present[:, columns].argmax(axis=0)
+        last_row = last - present[::-1, columns].argmax(axis=0)
+        new = np.isnat(self.first_date[columns])
+        self.first_date[columns[new]] = dates[first_row[new]]
+        self.nav_first[columns[new]] = nav[first_row[new], columns[new]]
+        self.last_date[columns] = dates[last_row]
+        self.nav_last[columns] = nav[last_row, columns]
+        self.current_drawdown[columns] = drawdown[last_row, columns]
+        self.max_drawdown = np.fmin(self.max_drawdown, np.fmin.reduce(drawdown, axis=0))
+        return nav
+
+    def summary(self) -> pd.DataFrame:
+        """与 drawdown_summary 相同的结果表，没有任何数据的列不出现在结果中"""
+        columns = np.flatnonzero(~np.isnat(self.first_date))
+        return pd.DataFrame({
+            'first_date': pd.to_datetime(self.first_date[columns]),
+            'last_date': pd.to_datetime(self.last_date[columns]),
+            'nav_first': self.nav_first[columns],
+            'nav_last': self.nav_last[columns],
+            'max_drawdown': self.max_drawdown[columns],
+            'current_drawdown': self.current_drawdown[columns]
+        }, index=pd.Index(self.labels[columns]))
+
+
+def drawdown_summary(returns: np.ndarray, dates: np.ndarray, labels: Sequence) -> pd.DataFrame:
+    """每列的首末日期、首末净值、最大回撤和当前回撤，以 labels 为索引
+
+    没有任何数据的列不出现在结果中。
+    """
+    state = DrawdownState()
+    state.extend(returns, dates, labels)
+    return state.summary()
+
+
+def annual_return(stats: pd.DataFrame, from_first_nav: bool = False) -> pd.Series:
+    """根据 drawdown_summary 的结果计算年化收益率
+
+    from_first_nav 为 True 时总收益率按 末日净值/首日净值-1 计算，否则按 末日净值-1 计算。
+    """
+    total_days = (stats['last_date'] - stats['first_date']).dt.days
+    total_return = stats['nav_last'] / stats['nav_first'] - 1 if from_first_nav else stats['nav_last'] - 1
+    annual = (1 + total_return) ** (365 / total_days.where(total_days > 0)) - 1
+    return annual.where(total_days > 0, 0.0).astype(float)
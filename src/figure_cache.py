@@ -0,0 +1,57 @@
+import json
+import threading
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from .figure_json import figure_to_json
+from .lru import LRUCache
+
+
+class FigureCache:
+    """按 (图表类型, 日期, 数据版本号) 缓存数组已编码为 typed array 的 Plotly 图表字典
+
+    按图表序列化后的 JSON 字节数做 LRU 淘汰；数据版本号变化时清空旧版本的图表。
+    命中时直接返回缓存的字典，不再经过 plotly.express 构建、校验、数组编码和 JSON 解析。
+    返回的字典由各次调用共用，不能修改。
+    """
+
+    def __init__(self, max_bytes: int):
+        self._cache = LRUCache(maxsize=None, weigher=lambda entry: entry[1], max_weight=max_bytes)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, date, version: int, build: Callable[[], Optional[object]]) -> Optional[dict]:
+        """取出缓存的图表，未命中时调用 build() 构建；build 返回 None 表示该日期没有图表"""
+        with self._lock:
+            # 数据版本号只增不减，比缓存更旧的版本号来自刷新前开始的请求，不清空也不写入缓存
+            stale = self._version is not None and version < self._version
+            if not stale and version != self._version:
+                self._cache.clear()
+                self._version = version
+        if stale:
+            return self._pack(build())[0]
+        key = (kind, pd.Timestamp(date).value if date is not None else None, version)
+        figure, _ = self._cache.get_or_compute(key, lambda: self._pack(build()))
+        return figure
+
+    @staticmethod
+    def _pack(figure) -> Tuple[Optional[dict], int]:
+        """(typed array 编码后的图表字典, JSON 字节数)
+
+        构建时序列化一次再解析，缓存的字典只含 JSON 原生类型（没有 numpy 数组），命中后编码最快。
+        """
+        text = 'null' if figure is None else figure_to_json(figure)
+        return json.loads(text), len(text)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def stats(self) -> dict:
+        """命中次数、未命中次数、缓存的图表数和总字节数"""
+        return self._cache.stats()
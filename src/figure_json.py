@@ -0,0 +1,69 @@
+import base64
+from typing import Union
+
+import numpy as np
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+
+# plotly.js typed array 支持的数据类型
+TYPED_ARRAY_DTYPES = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2',
+    'int32': 'i4', 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8'
+}
+# 折线、柱状图中按点给出的数组属性
+ARRAY_KEYS = ('x', 'y', 'customdata')
+
+
+def typed_array(values: np.ndarray) -> Union[dict, np.ndarray]:
+    """把数值数组编码为 plotly.js 的 typed array（{'dtype', 'bdata'}），数据直接取自 numpy 缓冲区
+
+    日期数组编码为距 1970-01-01 的毫秒数（float64），坐标轴需为 date 类型；
+    不支持的数组原样返回，由 JSON 编码器处理。
+    """
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+    elif values.dtype == np.int64 and len(values) and \
+            np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max:
+        values = values.astype(np.int32)
+    dtype = TYPED_ARRAY_DTYPES.get(str(values.dtype))
+    if dtype is None or values.ndim != 1 or len(values) == 0:
+        return values
+    return {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(values)).decode('ascii')}
+
+
+def _axis_key(trace: dict, axis: str) -> str:
+    """trace 所在坐标轴在 layout 中的键，如 'x2' -> 'xaxis2'"""
+    name = trace.get(axis + 'axis') or axis
+    return axis + 'axis' + name[1:]
+
+
+def pack_figure(figure: Union[BaseFigure, dict]) -> dict:
+    """返回各 trace 中 x、y、customdata 数组均为 typed array 的图表字典
+
+    figure 可以是 go.Figure 或已转换为字典的图表；原图表不会被修改。
+    x/y 为日期时把对应坐标轴设为 date 类型。
+    """
+    if isinstance(figure, BaseFigure):
+        figure = figure.to_plotly_json()
+    layout = dict(figure.get('layout') or {})
+    data = []
+    for trace in figure.get('data') or []:
+        trace = dict(trace)
+        for key in ARRAY_KEYS:
+            value = trace.get(key)
+            if value is None or isinstance(value, (dict, str)):
+                continue
+            array = np.asarray(value)
+            if array.dtype == object:
+                continue
+            trace[key] = typed_array(array)
+            if array.dtype.kind == 'M' and key in ('x', 'y'):
+                axis = _axis_key(trace, key)
+                layout[axis] = {**(layout.get(axis) or {}), 'type': 'date'}
+        data.append(trace)
+    return {**figure, 'data': data, 'layout': layout}
+
+
+def figure_to_json(figure: Union[BaseFigure, dict]) -> str:
+    """图表序列化为 JSON，数组使用 typed array；安装了 orjson 时由 plotly 自动使用 orjson 编码"""
+    return pio.to_json(pack_figure(figure), validate=False)
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+from typing import Dict
+
+# 有独立持仓文件的策略（ETF动量策略和月历效应）
+SEPARATE_FILE_STRATEGIES = ('etfdl', 'etfdl2', 'etfdl3', 'ylxy')
+
+
+def source_file(strategy: str) -> str:
+    """策略持仓所在的文件：雪球策略 ZH 开头，果仁策略 8844.R. 开头，其余为聚宽策略"""
+    if strategy.startswith('ZH'):
+        return 'xueqiu.txt'
+    if strategy.startswith('8844.R.'):
+        return 'guoren.txt'
+    if strategy in SEPARATE_FILE_STRATEGIES:
+        return f'{strategy}.txt'
+    return 'joinquant.txt'
+
+
+class HoldingsRepository:
+    """holdings/*.txt 中各来源的持仓，文件的修改时间或大小变化后才重新解析
+
+    每次读取前检查目录，有文件变化时重建索引并递增 version：
+    - quantities: 股票代码（含 .SZ/.SH 后缀）-> 所有账户的合计持仓数量
+    - strategy_holdings: 策略 -> {股票代码: 数量}，策略只从 source_file 对应的文件中读取
+    - names: 去掉后缀的股票代码 -> holding_name 中的股票名称
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.version = 0
+        self._files = {}  # 文件名 -> (修改时间, 大小, 解析结果)，解析失败时为 None
+        self._quantities = {}
+        self._strategy_holdings = {}
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """重新解析有变化的文件，返回索引是否有更新"""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.txt')]
+            except OSError as e:
+                print(f"Error reading {self.directory}: {e}")
+                entries = []
+
+            changed = set(self._files) != {entry.name for entry in entries}
+            files = {}
+            for entry in entries:
+                stat = entry.stat()
+                cached = self._files.get(entry.name)
+                if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                    files[entry.name] = cached
+                    continue
+                files[entry.name] = (stat.st_mtime_ns, stat.st_size, self._parse(entry.path))
+                changed = True
+
+            if changed:
+                self._files = files
+                self._build_indexes()
+                self.version += 1
+            return changed
+
+    @staticmethod
+    def _parse(path: str):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {os.path.basename(path)}: {e}")
+            return None
+
+    def _build_indexes(self):
+        quantities = {}
+        strategy_holdings = {}
+        names = {}
+        for file, (_, _, accounts) in self._files.items():
+            if not isinstance(accounts, dict):
+                continue
+            for strategy, account in accounts.items():
+                if not isinstance(account, dict) or 'holding' not in account:
+                    continue
+                holding_name = account.get('holding_name', {})
+                for code, quantity in account['holding'].items():
+                    quantities[code] = quantities.get(code, 0) + quantity
+                    if code in holding_name:
+                        names[str(code).split('.')[0]] = holding_name[code]
+                if source_file(strategy) == file:
+                    strategy_holdings[strategy] = account['holding']
+        self._quantities = quantities
+        self._strategy_holdings = strategy_holdings
+        self._names = names
+
+    def quantities(self) -> Dict[str, float]:
+        """股票代码 -> 所有账户的合计持仓数量，调用方不应修改返回的字典"""
+        self.refresh()
+        return self._quantities
+
+    def holdings_of(self, strategy: str) -> Dict[str, float]:
+        """策略的持仓 {股票代码: 数量}，没有该策略时为空字典"""
+        self.refresh()
+        return self._strategy_holdings.get(strategy, {})
+
+    def names(self) -> Dict[str, str]:
+        """去掉后缀的股票代码 -> holding_name 中的股票名称"""
+        self.refresh()
+        return self._names
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """容量有限、线程安全的 LRU 缓存，记录命中和未命中次数
+
+    maxsize 限制条目数；同时给出 weigher（值 -> 大小）和 max_weight 时，
+    还会按条目大小之和淘汰最久未使用的条目。
+    Dash 可能在多个线程中同时执行由同一次日期变化触发的回调，
+    get_or_compute 保证同一个键同时只计算一次，其余调用等待并复用结果。
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128, weigher: Callable[[Any], int] = None,
+                 max_weight: Optional[int] = None):
+        self.maxsize = maxsize
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weight = 0  # 当前条目大小之和
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._weights = {}
+        self._lock = threading.Lock()
+        self._pending = {}  # 正在计算的键 -> 锁
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def _lookup(self, key: Hashable):
+        """在持有 self._lock 时查找并计数，返回 (是否命中, 值)"""
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, self._data[key]
+        return False, None
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """命中时直接返回缓存值，否则调用 compute() 计算并写入缓存"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            key_lock = self._pending.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    return value
+                self.misses += 1
+            try:
+                value = compute()
+                self.put(key, value)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._pop(key)
+            self._data[key] = value
+            if self.weigher is not None:
+                self._weights[key] = self.weigher(value)
+                self.weight += self._weights[key]
+            # 至少保留刚写入的条目
+            while len(self._data) > 1 and self._over_capacity():
+                self._pop(next(iter(self._data)))
+
+    def _over_capacity(self) -> bool:
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.max_weight is not None and self.weight > self.max_weight
+
+    def _pop(self, key: Hashable):
+        if key in self._data:
+            del self._data[key]
+            self.weight -= self._weights.pop(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def stats(self) -> dict:
+        """命中次数、未命中次数、当前条目数和大小"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize,
+                'weight': self.weight, 'max_weight': self.max_weight}
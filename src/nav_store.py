@@ -0,0 +1,115 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def to_datetime64(date) -> np.datetime64:
+    """把各种日期表示统一转换为 datetime64[ns]"""
+    return np.datetime64(pd.Timestamp(date), 'ns')
+
+
+class NavStore:
+    """组合按市值加权的每日收益率、盈亏和累计净值
+
+    所有序列都是按日期升序排列的连续 numpy 数组，按日期查询时用二分查找定位，
+    不需要再对明细数据做 groupby。
+    """
+
+    # 随数据一起保存和恢复的数组字段
+    FIELDS = ('dates', 'returns', 'profit_loss', 'nav', 'peak', 'min_drawdown')
+
+    def __init__(self):
+        self.dates = np.array([], dtype='datetime64[ns]')
+        self.returns = np.array([])  # 组合当日收益率
+        self.profit_loss = np.array([])  # 组合当日盈亏金额
+        self.nav = np.array([])  # 组合累计净值
+        self.peak = np.array([])  # 截至当日的最高净值
+        self.min_drawdown = np.array([])  # 截至当日的最大回撤
+
+    def __len__(self):
+        return len(self.dates)
+
+    def update(self, tail: pd.DataFrame):
+        """用明细记录 tail 重新计算其覆盖的日期，更早的日期沿用已有结果
+
+        tail 需包含某个日期及之后的全部记录，全量构建时传入完整数据即可。
+        """
+        if tail.empty:
+            return
+        weighted = tail['MarketValue_close'] * tail['收益率']
+        sums = pd.DataFrame({
+            'Date': tail['Date'],
+            'weighted': weighted,
+            'market_value': tail['MarketValue_close']
+        }).groupby('Date').sum()
+
+        dates = sums.index.to_numpy(dtype='datetime64[ns]')
+        profit_loss = sums['weighted'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = profit_loss / sums['market_value'].to_numpy(dtype=float)
+
+        # 从首个重算日期之前最后一天的净值和回撤状态继续累计
+        keep = int(np.searchsorted(self.dates, dates[0], side='left'))
+        previous = slice(keep - 1, keep) if keep > 0 else slice(0, 0)
+        # 之前几天的净值可能为 NaN（当天没有有效收益率），从最后一个有效净值继续，与全量计算一致
+        finite = np.flatnonzero(~np.isnan(self.nav[:keep]))
+        base_nav = self.nav[finite[-1:]] if len(finite) else np.array([1.0])
+        nav = np.nancumprod(np.concatenate([base_nav, 1 + returns]))[1:]
+        nav[np.isnan(returns)] = np.nan
+        peak = np.fmax.accumulate(np.concatenate([self.peak[previous], nav]))[-len(nav):]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (nav - peak) / peak
+        min_drawdown = np.fmin.accumulate(np.concatenate([self.min_drawdown[previous], drawdown]))[-len(nav):]
+
+        self.dates = np.concatenate([self.dates[:keep], dates])
+        self.returns = np.concatenate([self.returns[:keep], returns])
+        self.profit_loss = np.concatenate([self.profit_loss[:keep], profit_loss])
+        self.nav = np.concatenate([self.nav[:keep], nav])
+        self.peak = np.concatenate([self.peak[:keep], peak])
+        self.min_drawdown = np.concatenate([self.min_drawdown[:keep], min_drawdown])
+
+    def locate(self, date) -> int:
+        """返回不晚于 date 的最后一个交易日的位置，date 早于所有数据时返回 -1"""
+        return int(np.searchsorted(self.dates, to_datetime64(date), side='right')) - 1
+
+    def exact(self, date) -> Optional[int]:
+        """返回 date 所在的位置，该日期没有数据时返回 None"""
+        i = self.locate(date)
+        if i < 0 or self.dates[i] != to_datetime64(date):
+            return None
+        return i
+
+    def nav_as_of(self, date) -> Optional[float]:
+        """截至 date 的组合净值"""
+        i = self.locate(date)
+        return float(self.nav[i]) if i >= 0 else None
+
+    def nav_until(self, date) -> Tuple[np.ndarray, np.ndarray]:
+        """截至 date（含）的日期和净值序列，返回数组视图而非副本"""
+        stop = self.locate(date) + 1
+        return self.dates[:stop], self.nav[:stop]
+
+    def drawdown_at(self, i: int) -> Tuple[float, float]:
+        """第 i 个交易日的最大回撤和当前回撤"""
+        current = (self.nav[i] - self.peak[i]) / self.peak[i]
+        return float(self.min_drawdown[i]), float(current)
+
+    def kpi_arrays(self) -> dict:
+        """按日期排列的当日收益率、盈亏金额和净值，可直接作为 dcc.Store 的数据
+
+        日期为 YYYY-MM-DD 字符串，缺失值为 None。
+        """
+        def to_list(values):
+            return [None if np.isnan(v) else v for v in values.tolist()]
+
+        return {
+            'dates': np.datetime_as_string(self.dates, unit='D').tolist(),
+            'returns': to_list(self.returns),
+            'profit_loss': to_list(np.round(self.profit_loss, 2)),
+            'nav': to_list(self.nav)
+        }
+
+    def to_series(self) -> pd.Series:
+        """以日期为索引的组合净值序列"""
+        return pd.Series(self.nav, index=pd.DatetimeIndex(self.dates, name='Date'))
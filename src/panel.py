@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from .row_buffer import RowBuffer
+
+
+class StrategyPanel:
+    """日期×策略的宽表矩阵
+
+    行为按升序排列的交易日，列为按首次出现顺序排列的策略，
+    当天没有该策略的数据时为 NaN。
+    """
+
+    # 随数据一起保存和恢复的字段
+    FIELDS = ('dates', 'strategies', 'returns', 'market_value', 'position_value')
+
+    def __init__(self):
+        self.dates = np.array([], dtype='datetime64[ns]')
+        self.strategies = np.array([], dtype=object)
+        self.returns = np.empty((0, 0))  # 各策略当日收益率
+        self.market_value = np.empty((0, 0))  # 各策略当日收盘市值
+        self.position_value = np.empty((0, 0))  # 各策略当日持仓市值
+        self._buffers = None  # 字段名 -> RowBuffer，上面的数组是它们的视图
+
+    def update(self, tail: pd.DataFrame) -> int:
+        """用明细记录 tail 重建其覆盖的日期所在的行，更早的行保持不变，返回第一个重建的行号
+
+        tail 需包含某个日期及之后的全部记录，新出现的策略追加为新列。
+        只追加了更晚的日期且没有新策略时，新行写入预留的空间，耗时只与新增日期数有关；
+        否则复制保留的行重建矩阵。两种情况下之前取得的矩阵都保持不变。
+        """
+        if tail.empty:
+            return len(self.dates)
+        dates, row = np.unique(tail['Date'].to_numpy(dtype='datetime64[ns]'), return_inverse=True)
+
+        names = tail['Strategy'].to_numpy(dtype=object)
+        new_strategies = pd.Index(names).unique().difference(self.strategies, sort=False)
+        keep = int(np.searchsorted(self.dates, dates[0], side='left'))
+        appending = self._buffers is not None and keep == len(self.dates) and not len(new_strategies)
+        if len(new_strategies):
+            self.strategies = np.concatenate([self.strategies, new_strategies.to_numpy(dtype=object)])
+        col = self.column_index(names)
+
+        blocks = {'dates': dates}
+        for name, column in (('returns', '收益率'), ('market_value', 'MarketValue_close'),
+                             ('position_value', 'PositionValue')):
+            block = np.full((len(dates), len(self.strategies)), np.nan)
+            block[row, col] = tail[column].to_numpy(dtype=float)
+            blocks[name] = block
+
+        if not appending:
+            buffers = {'dates': RowBuffer(self.dates[:keep])}
+            for name in ('returns', 'market_value', 'position_value'):
+                kept = getattr(self, name)[:keep]
+                if kept.shape[1] < len(self.strategies):
+                    kept = np.hstack([kept, np.full((keep, len(self.strategies) - kept.shape[1]), np.nan)])
+                buffers[name] = RowBuffer(kept)
+            self._buffers = buffers
+        for name, block in blocks.items():
+            setattr(self, name, self._buffers[name].append(block))
+        return keep
+
+    def column_index(self, strategies) -> np.ndarray:
+        """策略所在的列号，不存在的策略返回 -1"""
+        return pd.Index(self.strategies).get_indexer(strategies)
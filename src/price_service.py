@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+# 行情源：股票代码列表 -> {代码: {'name', 'lastPrice', 'changePercent'}}，
+# 与 portfolio.get_stock_prices 的返回格式相同
+PriceSource = Callable[[List[str]], Dict[str, dict]]
+
+
+class XueqiuPriceSource:
+    """通过 portfolio.get_stock_prices 获取雪球实时行情，cookie 文件修改后才重新读取"""
+
+    def __init__(self, get_stock_prices: Callable, cookie_path: str = 'cookies.txt'):
+        self.get_stock_prices = get_stock_prices
+        self.cookie_path = cookie_path
+        self._cookie = None
+        self._cookie_mtime = None
+
+    def _load_cookie(self) -> str:
+        mtime = os.stat(self.cookie_path).st_mtime_ns
+        if mtime != self._cookie_mtime:
+            with open(self.cookie_path, 'r') as f:
+                self._cookie = json.load(f)['xueqiu']  # 获取雪球的cookie
+            self._cookie_mtime = mtime
+        return self._cookie
+
+    def __call__(self, codes: List[str]) -> Dict[str, dict]:
+        return self.get_stock_prices(codes, self._load_cookie())
+
+
+class FakePriceSource:
+    """离线使用的确定性行情，价格和涨跌幅只由股票代码决定，latency 模拟行情接口的延迟（秒）"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, codes: List[str]) -> Dict[str, dict]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prices = {}
+        for code in codes:
+            number = int(code.split('.')[0])
+            prices[code] = {
+                'name': f'股票{number:06d}',
+                'lastPrice': round(5 + number % 997 / 10, 2),
+                'changePercent': round((number % 21 - 10) / 2, 2)
+            }
+        return prices
+
+
+class PriceService:
+    """按股票代码缓存行情，由后台线程定期刷新
+
+    - 每个代码的行情缓存 ttl 秒；过期的行情仍直接返回，同时唤醒后台线程刷新
+    - 从未获取过的代码在请求中获取，最多等待 wait_timeout 秒，超时则先返回已有的行情
+    - 同一代码同时只有一个获取请求，并发的调用等待同一个请求的结果
+    - 后台线程每 refresh_interval 秒刷新所有请求过的、即将过期的代码
+    """
+
+    def __init__(self, source: PriceSource, ttl: float = 60, refresh_interval: float = 30,
+                 wait_timeout: float = 5):
+        self.source = source
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.wait_timeout = wait_timeout
+        self.fetches = 0  # 调用行情源的次数
+        self.errors = 0
+        self._quotes = {}  # 代码 -> (获取时间, 行情)
+        self._watched = set()  # 需要后台刷新的代码
+        self._pending = {}  # 正在获取的代码 -> 完成事件
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, codes: Iterable[str]) -> Dict[str, dict]:
+        """返回已缓存的行情，没有行情的代码不出现在结果中"""
+        codes = list(dict.fromkeys(codes))
+        now = time.monotonic()
+        with self._lock:
+            self._watched.update(codes)
+            missing = [code for code in codes if code not in self._quotes]
+            stale = any(now - self._quotes[code][0] > self.ttl for code in codes if code in self._quotes)
+        self.start()
+        if stale:
+            self._wake.set()
+        if missing:
+            self._fetch(missing, self.wait_timeout)
+        with self._lock:
+            return {code: self._quotes[code][1] for code in codes if code in self._quotes}
+
+    def cached(self, codes: Iterable[str]) -> Dict[str, dict]:
+        """只读取已缓存的行情，不请求行情源"""
+        with self._lock:
+            return {code: self._quotes[code][1] for code in codes if code in self._quotes}
+
+    def _fetch(self, codes: List[str], timeout: float = None):
+        """获取 codes 的行情，已在获取中的代码不重复请求；等待所有相关请求完成或超时"""
+        with self._lock:
+            events = {self._pending[code] for code in codes if code in self._pending}
+            new_codes = [code for code in codes if code not in self._pending]
+            if new_codes:
+                event = threading.Event()
+                events.add(event)
+                for code in new_codes:
+                    self._pending[code] = event
+        if new_codes:
+            threading.Thread(target=self._run_fetch, args=(new_codes, event), daemon=True).start()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in events:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            event.wait(remaining)
+
+    def _run_fetch(self, codes: List[str], event: threading.Event):
+        try:
+            prices = self.source(codes)
+            fetched_at = time.monotonic()
+            with self._lock:
+                for code in codes:
+                    # 行情源没有返回的代码记为空行情，在 ttl 内不再重复请求
+                    self._quotes[code] = (fetched_at, prices.get(code, {}))
+                self.fetches += 1
+        except Exception as e:
+            print(f"Error fetching stock prices: {e}")
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                for code in codes:
+                    if self._pending.get(code) is event:
+                        del self._pending[code]
+            event.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            now = time.monotonic()
+            with self._lock:
+                # 下一轮刷新之前就会过期的代码提前刷新
+                due = [code for code in self._watched
+                       if code not in self._quotes
+                       or now - self._quotes[code][0] >= self.ttl - self.refresh_interval]
+            if due:
+                self._fetch(due)
+
+    def start(self):
+        """启动后台刷新线程（首次调用 get 时自动启动）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name='price-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """缓存的代码数、调用行情源的次数和失败次数"""
+        with self._lock:
+            return {'quotes': len(self._quotes), 'watched': len(self._watched),
+                    'fetches': self.fetches, 'errors': self.errors}
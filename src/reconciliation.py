@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import List
+
+import pandas as pd
+
+from .holdings import HoldingsRepository
+
+COLUMNS = ['股票代码', '股票名称', '账户持仓', '实际持仓', '差异']
+
+
+def base_code(codes: pd.Index) -> pd.Index:
+    """去掉 .SZ/.SH 等后缀的股票代码"""
+    return pd.Index(codes.astype(str).str.split('.').str[0])
+
+
+class HoldingsReconciler:
+    """账户持仓（holdings/*.txt）与实际持仓（holdings.tsv）的对账
+
+    两边按去掉后缀的股票代码对齐后做一次外连接，差异 = 账户持仓 - 实际持仓。
+    结果缓存到 holdings.tsv 或任一 holdings/*.txt 变化为止；holdings.tsv 不存在或读取出错时
+    打印错误并返回空结果。
+    """
+
+    def __init__(self, tsv_path: str, holdings_repository: HoldingsRepository):
+        self.tsv_path = tsv_path
+        self.holdings_repository = holdings_repository
+        self._key = None
+        self._records = []
+        self._lock = threading.Lock()
+
+    def key(self) -> tuple:
+        """持仓文件的当前状态，任一文件变化时改变；holdings.tsv 不存在时其状态为 None"""
+        self.holdings_repository.refresh()
+        try:
+            stat = os.stat(self.tsv_path)
+            tsv = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            print(f"Error reading {os.path.basename(self.tsv_path)}: {e}")
+            tsv = None
+        return self.holdings_repository.version, tsv
+
+    def differences(self) -> List[dict]:
+        """有差异的股票，按代码排序，列为 COLUMNS"""
+        with self._lock:
+            key = self.key()
+            if key != self._key:
+                if key[1] is None:
+                    records = []
+                else:
+                    try:
+                        records = self._reconcile()
+                    except Exception as e:
+                        # 文件可能正在被替换，不缓存，下次调用时重新读取
+                        print(f"Error reading {os.path.basename(self.tsv_path)}: {e}")
+                        return []
+                self._records = records
+                self._key = key
+            return list(self._records)
+
+    def _account_positions(self) -> pd.Series:
+        """去掉后缀的代码 -> 所有账户的合计持仓"""
+        quantities = self.holdings_repository.quantities()
+        account = pd.Series(list(quantities.values()), index=pd.Index(list(quantities), dtype=object),
+                            dtype=None if quantities else 'int64')
+        return account.groupby(base_code(account.index)).sum()
+
+    def _reconcile(self) -> List[dict]:
+        account = self._account_positions()
+
+        actual_df = pd.read_csv(self.tsv_path, sep='\t', dtype=str)
+        codes = base_code(pd.Index(actual_df['证券代码']))
+        # 同一代码出现多次时以最后一行为准
+        keep = ~codes.duplicated(keep='last')
+        actual = pd.Series(
+            actual_df['当前拥股'].astype(str).str.replace(r'[^\d]', '', regex=True).astype(int).to_numpy()[keep],
+            index=codes[keep]
+        )
+        tsv_names = pd.Series(actual_df['证券名称'].to_numpy()[keep], index=codes[keep]) \
+            if '证券名称' in actual_df.columns else pd.Series(dtype=object)
+
+        merged = pd.concat({'账户持仓': account, '实际持仓': actual}, axis=1).sort_index()
+        merged['账户持仓'] = merged['账户持仓'].fillna(0).astype(account.dtype)
+        merged['实际持仓'] = merged['实际持仓'].fillna(0).astype(actual.dtype)
+        merged['差异'] = merged['账户持仓'] - merged['实际持仓']
+        merged = merged[merged['差异'] != 0]
+
+        # 名称优先取 holdings.tsv，其次取 holding_name
+        holding_names = pd.Series(self.holdings_repository.names(), dtype=object)
+        names = tsv_names.reindex(merged.index)
+        names = names.where(names.index.isin(tsv_names.index), holding_names.reindex(merged.index))
+        merged['股票名称'] = names.fillna('')
+
+        merged.index.name = '股票代码'
+        return merged.reset_index()[COLUMNS].to_dict('records')
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class RowBuffer:
+    """按行追加的数组，预留空间不足时按两倍扩容
+
+    data 可以是 numpy 数组（一维或二维）或 pandas 扩展数组（如字符串列）。
+    view() 是前 n 行的视图；追加只写入之前视图以外的行（扩容时复制到新数组），
+    已经取得的视图内容不会改变，可以继续交给后台写缓存等仍在使用旧结果的代码。
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._length = len(data)
+
+    def __len__(self):
+        return self._length
+
+    def view(self):
+        """已写入的前 n 行"""
+        return self._data[:self._length]
+
+    def append(self, rows):
+        """在末尾追加 rows，返回追加后的视图"""
+        stop = self._length + len(rows)
+        if stop > len(self._data):
+            grown = self._allocate(max(stop, 2 * len(self._data)))
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+        self._data[self._length:stop] = rows
+        self._length = stop
+        return self.view()
+
+    def _allocate(self, capacity: int):
+        if isinstance(self._data, np.ndarray):
+            return np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+        # pandas 扩展数组没有 empty，按同一类型取出全部为缺失值的数组
+        return self._data.take(np.full(capacity, -1), allow_fill=True)
@@ -0,0 +1,32 @@
+import pandas as pd
+
+
+class DaySnapshot:
+    """某个交易日的汇总数据，由日期选择器触发的各个回调共用
+
+    - rows: 当天各策略的记录，附带 Strategy_Alias 列
+    - daily_return / profit_loss / nav: 组合当日收益率、盈亏金额和截至当日的净值
+    - top_5 / bottom_5: 当日收益率最高和最低的 5 个策略
+    - style_market_value / style_position_value: 按第一风格汇总的总市值和持仓市值，
+      列为 Style、MarketValue，风格按 STRATEGY_STYLES 中的顺序排列
+
+    快照创建后不应再修改，回调需要改动数据时请先 copy()。
+    """
+
+    def __init__(self, data_processor, i: int):
+        store = data_processor.nav_store
+        self.date = pd.Timestamp(store.dates[i])
+        self.daily_return = float(store.returns[i])
+        self.profit_loss = float(store.profit_loss[i])
+        self.nav = float(store.nav[i])
+
+        rows = data_processor.rows_on(self.date).copy()
+        rows['Strategy_Alias'] = rows['Strategy'].map(data_processor.get_strategy_alias)
+        self.rows = rows
+
+        ranked = rows.sort_values('收益率', ascending=False)
+        self.top_5 = ranked.head()
+        self.bottom_5 = ranked.tail()
+
+        # 直接取 日期×风格 汇总矩阵中当天的一行
+        self.style_market_value, self.style_position_value = data_processor.style_allocation.on(self.date)
@@ -0,0 +1,59 @@
+import os
+import threading
+from typing import Dict, Iterable
+
+from .holdings import HoldingsRepository
+from .price_service import PriceService
+
+
+class StockNameIndex:
+    """股票代码 -> 股票名称，按去掉 .SZ/.SH 后缀的代码查找
+
+    名称依次取自 holdings.tsv（文件变化后重新读取）、holdings/*.txt 中的 holding_name
+    和行情缓存中的名称，都没有时返回代码本身。
+    """
+
+    def __init__(self, tsv_path: str, holdings_repository: HoldingsRepository = None,
+                 price_service: PriceService = None):
+        self.tsv_path = tsv_path
+        self.holdings_repository = holdings_repository
+        self.price_service = price_service
+        self._tsv_names = {}
+        self._tsv_stat = None
+        self._lock = threading.Lock()
+
+    def _load_tsv(self) -> Dict[str, str]:
+        """读取 holdings.tsv 的证券代码和证券名称两列，同一代码以第一次出现的名称为准"""
+        with self._lock:
+            try:
+                stat = os.stat(self.tsv_path)
+                key = (stat.st_mtime_ns, stat.st_size)
+                if key != self._tsv_stat:
+                    names = {}
+                    with open(self.tsv_path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            fields = line.rstrip('\r\n').split('\t')
+                            if len(fields) > 8:
+                                names.setdefault(fields[7], fields[8])
+                    self._tsv_names = names
+                    self._tsv_stat = key
+            except Exception as e:
+                print(f"Error reading {os.path.basename(self.tsv_path)}: {e}")
+            return self._tsv_names
+
+    def lookup(self, codes: Iterable[str]) -> Dict[str, str]:
+        """批量查找名称，返回 代码 -> 名称（键为传入的原始代码）"""
+        codes = list(codes)
+        tsv_names = self._load_tsv()
+        holding_names = self.holdings_repository.names() if self.holdings_repository is not None else {}
+        quotes = self.price_service.cached(codes) if self.price_service is not None else {}
+
+        names = {}
+        for code in codes:
+            base = str(code).split('.')[0]
+            name = tsv_names.get(base) or holding_names.get(base) or quotes.get(code, {}).get('name')
+            names[code] = name or code
+        return names
+
+    def name(self, code: str) -> str:
+        return self.lookup([code])[code]
@@ -0,0 +1,148 @@
+from typing import Collection, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .row_buffer import RowBuffer
+
+THREE_YEAR_STYLE = '三年以内'  # 创建不满三年的雪球策略单独归为一组
+THREE_YEAR_DAYS = 1095  # 3年 * 365天
+
+
+class StyleIndex:
+    """由 STRATEGY_STYLES 推导出的风格倒排索引
+
+    - styles_of: 策略 -> 风格列表
+    - strategies_of: 风格 -> 含有该风格的全部策略（策略可属于多个风格）
+    - first_style_of: 策略 -> 第一风格，recent_strategies 中（创建不满三年）的雪球策略归入"三年以内"
+    - first_style_groups: 第一风格 -> 策略，每个策略只属于一组
+    - primary_style_of: 策略 -> 配置中的第一风格（不做"三年以内"划分），用于风格饼图
+    - primary_style_groups: 配置中的第一风格 -> 策略，风格按第一次出现的顺序排列
+    """
+
+    def __init__(self, strategy_styles: dict, recent_strategies: Collection[str] = ()):
+        self.styles_of = {}
+        self.strategies_of = {}
+        self.first_style_of = {}
+        self.first_style_groups = {}
+        self.primary_style_of = {}
+        self.primary_style_groups = {}
+        self.three_year = []  # 创建不满三年的雪球策略
+        for strategy, info in strategy_styles.items():
+            if 'styles' not in info:
+                continue
+            styles = list(info['styles'])
+            self.styles_of[strategy] = styles
+            for style in styles:
+                self.strategies_of.setdefault(style, []).append(strategy)
+            if not styles:
+                continue
+
+            self.primary_style_of[strategy] = styles[0]
+            self.primary_style_groups.setdefault(styles[0], []).append(strategy)
+            first_style = styles[0]
+            if '雪球' in styles and strategy in recent_strategies:
+                first_style = THREE_YEAR_STYLE
+                self.three_year.append(strategy)
+            self.first_style_of[strategy] = first_style
+            self.first_style_groups.setdefault(first_style, []).append(strategy)
+
+    def members(self, style: str) -> List[str]:
+        """风格详情中列出的策略：三年以内为新雪球策略，其他风格为含有该风格的全部策略"""
+        if style == THREE_YEAR_STYLE:
+            return list(self.three_year)
+        return list(self.strategies_of.get(style, []))
+
+    @staticmethod
+    def incidence(strategies: Sequence, groups: Dict[str, List[str]]) -> np.ndarray:
+        """策略×风格的 0/1 归属矩阵，行顺序与 strategies 一致，列顺序与 groups 一致"""
+        row = pd.Index(strategies)
+        matrix = np.zeros((len(row), len(groups)))
+        for j, members in enumerate(groups.values()):
+            i = row.get_indexer(members)
+            matrix[i[i >= 0], j] = 1.0
+        return matrix
+
+
+def style_returns(returns: np.ndarray, market_value: np.ndarray,
+                  incidence: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按市值加权的 日期×风格 收益率矩阵和风格总市值矩阵
+
+    returns、market_value 为 日期×策略 矩阵（NaN 表示当天没有该策略），
+    通过与归属矩阵相乘一次得到所有风格的结果；当天风格内没有任何策略时为 NaN。
+    """
+    present = ~np.isnan(returns)
+    value = np.where(present, market_value, 0.0)
+    weighted = np.where(present, value * returns, 0.0) @ incidence
+    total_value = value @ incidence
+    has_data = (present @ incidence) > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(has_data, weighted / total_value, np.nan)
+    return result, np.where(has_data, total_value, np.nan)
+
+
+class StyleAllocation:
+    """按配置中的第一风格汇总的 日期×风格 总市值和持仓市值矩阵，风格饼图按日期直接取一行
+
+    由 日期×策略 的市值和持仓市值矩阵与归属矩阵相乘得到，面板追加日期后用 extend 只计算新增的行。
+    order 记录每天每个风格中有数据的策略在配置中的最小序号，饼图中的风格按它排序，
+    当天没有任何策略的风格为 inf，不出现在饼图中。
+    """
+
+    def __init__(self, panel, style_index: StyleIndex):
+        self._groups = style_index.primary_style_groups
+        self._position = {strategy: n for n, strategy in enumerate(style_index.primary_style_of)}
+        self.styles = np.array(list(self._groups), dtype=object)
+        self.dates = panel.dates[:0]
+        self._buffers = None  # market_value、position_value、order 各自的 RowBuffer
+        self.extend(panel)
+
+    def extend(self, panel):
+        """计算 panel 中新增日期的行，之前的行需与上次计算时相同"""
+        start = len(self.dates)
+        incidence = StyleIndex.incidence(panel.strategies, self._groups)
+        market_value = panel.market_value[start:]
+        position_value = panel.position_value[start:]
+        present = ~(np.isnan(market_value) & np.isnan(position_value))
+
+        strategy_order = np.array([self._position.get(strategy, np.inf) for strategy in panel.strategies], dtype=float)
+        ranked = np.where(present, strategy_order, np.inf)
+        order = np.full((len(ranked), len(self.styles)), np.inf)
+        for j in range(len(self.styles)):
+            members = incidence[:, j] > 0
+            if members.any():
+                order[:, j] = ranked[:, members].min(axis=1)
+        blocks = {
+            'market_value': np.nan_to_num(market_value) @ incidence,
+            'position_value': np.nan_to_num(position_value) @ incidence,
+            'order': order
+        }
+        if self._buffers is None:
+            self._buffers = {name: RowBuffer(block) for name, block in blocks.items()}
+            for name, block in blocks.items():
+                setattr(self, name, block)
+        else:
+            for name, block in blocks.items():
+                setattr(self, name, self._buffers[name].append(block))
+        self.dates = panel.dates
+
+    def on(self, date) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """date 当天按风格汇总的总市值和持仓市值，列为 Style、MarketValue；没有该日期时为空表"""
+        date = np.datetime64(pd.Timestamp(date), 'ns')
+        i = int(np.searchsorted(self.dates, date))
+        if i < len(self.dates) and self.dates[i] == date:
+            columns = np.flatnonzero(np.isfinite(self.order[i]))
+            columns = columns[np.argsort(self.order[i, columns], kind='stable')]
+        else:
+            columns = np.array([], dtype=int)
+
+        def frame(matrix):
+            values = matrix[i, columns] if len(columns) else np.array([], dtype=float)
+            return pd.DataFrame({'Style': self.styles[columns], 'MarketValue': values})
+
+        return frame(self.market_value), frame(self.position_value)
+
+    def totals(self) -> Tuple[pd.Series, pd.Series]:
+        """各风格在全部日期上累加的总市值和持仓市值，按风格在配置中第一次出现的顺序排列"""
+        return (pd.Series(self.market_value.sum(axis=0), index=self.styles),
+                pd.Series(self.position_value.sum(axis=0), index=self.styles))